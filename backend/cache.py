@@ -0,0 +1,341 @@
+"""Content-addressed cache for model responses.
+
+Responses are keyed by (provider, model, normalized messages, sampling
+params), so identical prompts reaching any council stage are answered from
+the cache instead of the upstream API.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator
+
+from .config import get_cache_config
+
+# Request parameters that do not change the model output
+_NON_SAMPLING_PARAMS = {"timeout"}
+
+# Per-request bypass flag, inherited by tasks created while it is set
+_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+
+def set_cache_bypass(bypass: bool) -> None:
+    """Skip cache reads and writes for the current request context."""
+    _bypass.set(bypass)
+
+
+def is_cache_bypassed() -> bool:
+    """Whether the current request context bypasses the cache."""
+    return _bypass.get()
+
+
+def _normalize_messages(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Normalize messages so trivially different prompts share a key."""
+    return [
+        {
+            "role": message.get("role", "").strip().lower(),
+            "content": (message.get("content") or "").replace("\r\n", "\n").strip()
+        }
+        for message in messages
+    ]
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        provider: Provider name
+        model: Model identifier
+        messages: Messages sent to the model
+        params: Extra request parameters; non-sampling ones are ignored
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    sampling_params = {
+        name: value for name, value in (params or {}).items()
+        if name not in _NON_SAMPLING_PARAMS and value is not None
+    }
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "messages": _normalize_messages(messages),
+        "params": sampling_params
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """In-process LRU cache with a per-entry TTL."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache in a single SQLite file, shared across restarts."""
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str = "data/cache/responses.sqlite3",
+        max_entries: int = 100000,
+        ttl_seconds: Optional[float] = None
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_stored_at ON responses(stored_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, stored_at = row
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+            # Evict the oldest entries beyond the size limit
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_BACKENDS = {
+    "memory": MemoryCache,
+    "sqlite": SQLiteCache,
+}
+
+_cache = None
+_stats = {"hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+
+
+def register_cache_backend(name: str, backend_cls) -> None:
+    """Register an additional cache backend class under a config name."""
+    _BACKENDS[name] = backend_cls
+
+
+def get_response_cache():
+    """
+    Get the configured response cache backend.
+
+    Returns:
+        Cache backend instance, or None if caching is disabled
+    """
+    global _cache
+
+    cache_config = get_cache_config()
+    if not cache_config.get("enabled", False):
+        return None
+
+    if _cache is None:
+        backend_name = cache_config.get("backend", "memory")
+        if backend_name not in _BACKENDS:
+            raise ValueError(f"Unknown cache backend '{backend_name}'")
+
+        options = {
+            name: value for name, value in cache_config.items()
+            if name not in ("enabled", "backend", "coalesce")
+        }
+        _cache = _BACKENDS[backend_name](**options)
+
+    return _cache
+
+
+def record(event: str) -> None:
+    """Count a cache event ('hits', 'misses', 'stores' or 'bypassed')."""
+    _stats[event] += 1
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get cache hit/miss statistics.
+
+    Returns:
+        Dict with event counters, hit rate, backend name and entry count
+    """
+    cache = get_response_cache()
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        "enabled": cache is not None,
+        "backend": get_cache_config().get("backend", "memory") if cache is not None else None,
+        "entries": len(cache) if cache is not None else 0
+    }
+
+
+async def _cache_get(cache, key: str) -> Optional[Dict[str, Any]]:
+    """Read from the cache, off the event loop for disk-backed backends."""
+    if cache.blocking:
+        return await asyncio.to_thread(cache.get, key)
+    return cache.get(key)
+
+
+async def _cache_set(cache, key: str, value: Dict[str, Any]) -> None:
+    """Write to the cache, off the event loop for disk-backed backends."""
+    if cache.blocking:
+        await asyncio.to_thread(cache.set, key, value)
+    else:
+        cache.set(key, value)
+    record("stores")
+
+
+def cached_query(provider_name: str, query_fn: Callable) -> Callable:
+    """Wrap a provider query function with the response cache."""
+
+    @functools.wraps(query_fn)
+    async def query_model(
+        model: str,
+        messages: List[Dict[str, str]],
+        api_url: str,
+        api_key: str,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        cache = get_response_cache()
+        if cache is None:
+            return await query_fn(model, messages, api_url, api_key, **kwargs)
+        if is_cache_bypassed():
+            record("bypassed")
+            return await query_fn(model, messages, api_url, api_key, **kwargs)
+
+        key = make_cache_key(provider_name, model, messages, kwargs)
+        cached = await _cache_get(cache, key)
+        if cached is not None:
+            record("hits")
+            # Usage is that of the original call; flag it so it is not counted twice
+            return dict(cached, cached=True)
+
+        record("misses")
+        response = await query_fn(model, messages, api_url, api_key, **kwargs)
+        if response is not None and response.get('content'):
+            # 'coalesced' describes this call only, not the stored answer
+            await _cache_set(cache, key, {k: v for k, v in response.items() if k != 'coalesced'})
+        return response
+
+    return query_model
+
+
+def cached_stream(provider_name: str, stream_fn: Callable) -> Callable:
+    """Wrap a provider stream function with the response cache.
+
+    A hit is replayed as a single chunk; a completed miss is stored under
+    the same key as the non-streaming query, so both paths share entries.
+    """
+
+    @functools.wraps(stream_fn)
+    async def stream_model(
+        model: str,
+        messages: List[Dict[str, str]],
+        api_url: str,
+        api_key: str,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        cache = get_response_cache()
+        if cache is None or is_cache_bypassed():
+            if cache is not None:
+                record("bypassed")
+            async for chunk in stream_fn(model, messages, api_url, api_key, **kwargs):
+                yield chunk
+            return
+
+        key = make_cache_key(provider_name, model, messages, kwargs)
+        cached = await _cache_get(cache, key)
+        if cached is not None:
+            from .providers.base import reasoning_text
+
+            record("hits")
+            # Entries stored by cached_query keep the provider's structured reasoning
+            yield dict(cached, cached=True, reasoning_details=reasoning_text(cached.get('reasoning_details')))
+            return
+
+        record("misses")
+        content_parts = []
+        reasoning_parts = []
+        usage = None
+        async for chunk in stream_fn(model, messages, api_url, api_key, **kwargs):
+            if chunk.get('content'):
+                content_parts.append(chunk['content'])
+            if chunk.get('reasoning_details'):
+                reasoning_parts.append(chunk['reasoning_details'])
+            if chunk.get('usage'):
+                usage = chunk['usage']
+            yield chunk
+
+        if content_parts:
+            await _cache_set(cache, key, {
+                'content': "".join(content_parts),
+                'reasoning_details': "".join(reasoning_parts) or None,
+                'usage': usage
+            })
+
+    return stream_model
@@ -12,7 +12,7 @@ API keys are always read from environment variables for security.
 import os
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, NamedTuple, Tuple, Union
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -157,27 +157,121 @@ def _get_provider_config(provider_name: str) -> Dict[str, Any]:
 
 
 # ============================================================================
-# Legacy API - Backward compatibility with existing code
+# Model References - Each council seat names its own provider
 # ============================================================================
 
-# OpenRouter configuration
-_provider_config = _get_provider_config("openrouter")
-OPENROUTER_API_URL = _provider_config["api_url"]
-OPENROUTER_API_KEY = os.getenv(_provider_config["api_key_env"])
+class ModelRef(NamedTuple):
+    """A model served by a specific provider."""
+    provider: str
+    model: str
+
+
+def resolve_model_ref(entry: Union[str, Dict[str, str]], default_provider: str) -> ModelRef:
+    """Resolve a model entry from the configuration.
+
+    Args:
+        entry: Either a model name (served by default_provider) or a dict
+               with 'model' and optional 'provider'
+        default_provider: Provider used when the entry does not name one
+
+    Returns:
+        ModelRef for the entry
+    """
+    if isinstance(entry, dict):
+        return ModelRef(entry.get("provider", default_provider), entry["model"])
+    return ModelRef(default_provider, entry)
+
+
+class Seat(NamedTuple):
+    """A council seat (or the chairman, title generator, ...).
+
+    Results are reported under ``model``; the call itself goes to one of the
+    interchangeable ``backends``, chosen by the router (see providers/router.py).
+    """
+    model: str
+    backends: Tuple[ModelRef, ...]
+
+
+def resolve_seat(entry: Union[str, Dict[str, Any]], default_provider: str) -> Seat:
+    """Resolve a seat entry from the configuration.
+
+    Args:
+        entry: A model entry accepted by resolve_model_ref, or a dict with
+               'backends' (a list of such entries) and an optional 'name'
+               (default: the first backend's model)
+        default_provider: Provider used when an entry does not name one
+
+    Returns:
+        Seat for the entry
+    """
+    if isinstance(entry, dict) and "backends" in entry:
+        backends = tuple(resolve_model_ref(backend, default_provider) for backend in entry["backends"])
+        if not backends:
+            raise ValueError(f"Seat {entry.get('name')!r} has no backends")
+        return Seat(entry.get("name", backends[0].model), backends)
+
+    ref = resolve_model_ref(entry, default_provider)
+    return Seat(ref.model, (ref,))
+
+
+def _resolve_seats(active_provider: str) -> Tuple[List[Seat], Seat, Seat]:
+    """Resolve the council seats, chairman and title generator.
 
-if not OPENROUTER_API_KEY:
-    raise ValueError(
-        f"API key not found. Please set environment variable: "
-        f"{_provider_config['api_key_env']}"
+    Seats are read from the active provider's 'models' section; entries that
+    name another provider, or list several backends, are routed there.
+
+    Args:
+        active_provider: Name of the active provider
+
+    Returns:
+        Tuple of (council seats, chairman seat, title generator seat)
+
+    Raises:
+        ValueError: If a referenced provider is missing, disabled or has no
+                    API key, or two council seats share a name
+    """
+    models_config = _get_provider_config(active_provider)["models"]
+    council = [resolve_seat(entry, active_provider) for entry in models_config["council"]]
+    chairman = resolve_seat(models_config["chairman"], active_provider)
+    title_generator = resolve_seat(
+        models_config.get("title_generator", "google/gemini-2.5-flash"), active_provider
     )
 
+    # Results are keyed by model name throughout the council
+    seat_models = [seat.model for seat in council]
+    if len(set(seat_models)) != len(seat_models):
+        raise ValueError(f"Council seats must have distinct names: {seat_models}")
+
+    seats = [*council, chairman, title_generator]
+    for provider_name in {backend.provider for seat in seats for backend in seat.backends}:
+        provider_config = _get_provider_config(provider_name)
+        if not os.getenv(provider_config["api_key_env"]):
+            raise ValueError(
+                f"API key not found. Please set environment variable: "
+                f"{provider_config['api_key_env']}"
+            )
+
+    return council, chairman, title_generator
+
+
+# ============================================================================
+# Legacy API - Backward compatibility with existing code
+# ============================================================================
+
+# OpenRouter configuration (used by the legacy backend/openrouter.py client)
+_openrouter_config = _config.get("providers", {}).get("openrouter", {})
+OPENROUTER_API_URL: Optional[str] = _openrouter_config.get("api_url")
+OPENROUTER_API_KEY: Optional[str] = os.getenv(_openrouter_config.get("api_key_env", "OPENROUTER_API_KEY"))
+
 # Council models configuration
-_models_config = _provider_config["models"]
-COUNCIL_MODELS: List[str] = _models_config["council"]
-CHAIRMAN_MODEL: str = _models_config["chairman"]
+COUNCIL_SEATS, CHAIRMAN_SEAT, TITLE_GENERATOR_SEAT = _resolve_seats(
+    _config.get("active_provider", "openrouter")
+)
+COUNCIL_MODELS: List[str] = [seat.model for seat in COUNCIL_SEATS]
+CHAIRMAN_MODEL: str = CHAIRMAN_SEAT.model
 
 # Title generator model (previously hardcoded in council.py)
-TITLE_GENERATOR_MODEL = _models_config.get("title_generator", "google/gemini-2.5-flash")
+TITLE_GENERATOR_MODEL: str = TITLE_GENERATOR_SEAT.model
 
 # Storage configuration
 _storage_config = _config.get("storage", {})
@@ -237,6 +331,62 @@ def get_storage_config() -> Dict[str, Any]:
     return _config.get("storage", {})
 
 
+def get_cache_config() -> Dict[str, Any]:
+    """Get response cache configuration.
+
+    Returns:
+        Dict with 'enabled', 'backend' and backend-specific options
+    """
+    return _config.get("cache", {})
+
+
+def get_semantic_cache_config() -> Dict[str, Any]:
+    """Get semantic (near-duplicate query) cache configuration.
+
+    Returns:
+        Dict with 'enabled', 'threshold', 'max_entries', 'index' and 'dim'
+    """
+    return _config.get("semantic_cache", {})
+
+
+def get_council_config() -> Dict[str, Any]:
+    """Get council orchestration configuration.
+
+    Returns:
+        Dict with optional 'quorum' settings
+    """
+    return _config.get("council", {})
+
+
+def get_timeouts_config() -> Dict[str, Any]:
+    """Get model call timeout configuration.
+
+    Returns:
+        Dict with 'adaptive', 'percentile', 'factor', 'min_seconds',
+        'max_seconds', 'window', 'min_samples' and 'path'
+    """
+    return _config.get("timeouts", {})
+
+
+def get_retry_config() -> Dict[str, Any]:
+    """Get model call retry configuration.
+
+    Returns:
+        Dict with 'enabled', 'max_attempts', 'base_delay', 'max_delay',
+        'deadline_seconds' and optional 'hedge' settings
+    """
+    return _config.get("retry", {})
+
+
+def get_router_config() -> Dict[str, Any]:
+    """Get backend routing configuration for seats with several backends.
+
+    Returns:
+        Dict with 'error_window', 'failure_threshold' and 'cooldown_seconds'
+    """
+    return _config.get("router", {})
+
+
 def get_active_provider() -> str:
     """Get the currently active provider name.
 
@@ -279,21 +429,22 @@ def reload_config() -> None:
     Useful for development when config file changes.
     In production, restart is recommended.
     """
-    global _config, _provider_config, _models_config, _storage_config, _server_config
+    global _config, _openrouter_config, _storage_config, _server_config
     global OPENROUTER_API_URL, OPENROUTER_API_KEY, COUNCIL_MODELS, CHAIRMAN_MODEL
+    global COUNCIL_SEATS, CHAIRMAN_SEAT, TITLE_GENERATOR_SEAT
     global TITLE_GENERATOR_MODEL, DATA_DIR, SERVER_HOST, SERVER_PORT, CORS_ORIGINS
 
     _config = _load_config()
 
     # Re-update global variables
-    _provider_config = _get_provider_config("openrouter")
-    OPENROUTER_API_URL = _provider_config["api_url"]
-    OPENROUTER_API_KEY = os.getenv(_provider_config["api_key_env"])
-
-    _models_config = _provider_config["models"]
-    COUNCIL_MODELS = _models_config["council"]
-    CHAIRMAN_MODEL = _models_config["chairman"]
-    TITLE_GENERATOR_MODEL = _models_config.get("title_generator", "google/gemini-2.5-flash")
+    _openrouter_config = _config.get("providers", {}).get("openrouter", {})
+    OPENROUTER_API_URL = _openrouter_config.get("api_url")
+    OPENROUTER_API_KEY = os.getenv(_openrouter_config.get("api_key_env", "OPENROUTER_API_KEY"))
+
+    COUNCIL_SEATS, CHAIRMAN_SEAT, TITLE_GENERATOR_SEAT = _resolve_seats(get_active_provider())
+    COUNCIL_MODELS = [seat.model for seat in COUNCIL_SEATS]
+    CHAIRMAN_MODEL = CHAIRMAN_SEAT.model
+    TITLE_GENERATOR_MODEL = TITLE_GENERATOR_SEAT.model
 
     _storage_config = _config.get("storage", {})
     DATA_DIR = _storage_config.get("data_dir", "data/conversations")
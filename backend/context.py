@@ -0,0 +1,243 @@
+"""Multi-turn conversation context for the council stages.
+
+Earlier turns reach the models as a rolling summary plus as many of the
+most recent exchanges as fit in a per-stage token budget, so follow-up
+questions work without the prompt growing with the whole history.
+
+The summary is maintained incrementally: after each turn the summarizer
+model folds only that turn into the previous summary, and the result is
+stored with the conversation (see council.summarize_turns).
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from .config import get_council_config
+from .tokens import estimate_tokens, truncate_to_tokens
+
+DEFAULT_BUDGETS = {
+    "stage1": 2000,
+    "stage2": 600,
+    "stage3": 1200
+}
+
+DEFAULT_SUMMARY_TOKENS = 400
+
+
+def get_context_config() -> Dict[str, Any]:
+    """Get the council.context configuration section."""
+    return get_council_config().get("context", {})
+
+
+def is_context_enabled() -> bool:
+    """Whether earlier turns are passed to the council."""
+    return get_context_config().get("enabled", True)
+
+
+def is_summary_enabled() -> bool:
+    """Whether a rolling summary is maintained after each turn (opt-in: it costs a model call per turn)."""
+    return is_context_enabled() and get_context_config().get("summarize", False)
+
+
+def completed_turns(conversation: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Pair each user message with the council's final answer to it.
+
+    Args:
+        conversation: Conversation dict with stage3 texts resolved
+
+    Returns:
+        List of (user question, final answer) in order; questions that
+        never got an answer, or whose final answer is an error, are skipped
+    """
+    turns = []
+    pending_question = None
+    for message in conversation["messages"]:
+        if message.get("role") == "user":
+            pending_question = message.get("content", "")
+        elif message.get("role") == "assistant" and pending_question is not None:
+            stage3 = message.get("stage3") or {}
+            if not stage3.get("error"):
+                turns.append((pending_question, stage3.get("response", "")))
+            pending_question = None
+    return turns
+
+
+def turns_to_summarize(
+    conversation: Dict[str, Any],
+    new_turn: Tuple[str, str],
+    max_turns: int = 4
+) -> Tuple[Optional[str], List[Tuple[str, str]], int]:
+    """
+    Work out the incremental summary update after a turn.
+
+    Args:
+        conversation: Conversation as loaded before the turn, with stage3
+            texts resolved
+        new_turn: The (question, final answer) just completed
+        max_turns: Cap on turns folded in at once when the summary lags
+            behind (older ones are skipped rather than re-summarized)
+
+    Returns:
+        (previous summary text or None, turns to fold in, number of turns the
+        updated summary will cover)
+    """
+    turns = completed_turns(conversation) + [new_turn]
+    summary = conversation.get("summary") or {}
+    covered = min(summary.get("turns", 0), len(turns) - 1) if summary.get("text") else 0
+    return summary.get("text"), turns[covered:][-max_turns:], len(turns)
+
+
+class ConversationContext:
+    """
+    Earlier turns of a conversation, packed into per-stage token budgets.
+
+    Args:
+        turns: Completed (question, answer) turns, oldest first
+        summary: Rolling summary text, if any
+        summary_turns: Number of leading turns the summary covers
+        budgets: Token budget per stage ('stage1', 'stage2', 'stage3')
+    """
+
+    def __init__(
+        self,
+        turns: List[Tuple[str, str]],
+        summary: Optional[str] = None,
+        summary_turns: int = 0,
+        budgets: Optional[Dict[str, int]] = None
+    ):
+        self.turns = turns
+        self.summary = summary or None
+        self.summary_turns = summary_turns if self.summary else 0
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self._packed: Dict[str, Tuple[Optional[str], List[Tuple[str, str]], int]] = {}
+
+    @classmethod
+    def from_conversation(cls, conversation: Dict[str, Any]) -> Optional["ConversationContext"]:
+        """
+        Build the context for the next turn of a stored conversation.
+
+        Args:
+            conversation: Conversation dict with stage3 texts resolved
+
+        Returns:
+            ConversationContext, or None if context is disabled or there are
+            no earlier turns
+        """
+        if not is_context_enabled():
+            return None
+
+        turns = completed_turns(conversation)
+        if not turns:
+            return None
+
+        summary = conversation.get("summary") or {}
+        return cls(
+            turns,
+            summary=summary.get("text"),
+            summary_turns=min(summary.get("turns", 0), len(turns)),
+            budgets=get_context_config().get("budgets")
+        )
+
+    def _pack(self, stage: str) -> Tuple[Optional[str], List[Tuple[str, str]], int]:
+        """
+        Choose what fits in a stage's budget.
+
+        The summary goes first (capped at half the budget); the remaining
+        budget takes the most recent turns verbatim, newest first. The
+        oldest turn that only partly fits has its answer truncated.
+
+        Returns:
+            (summary or None, verbatim turns oldest first, estimated tokens)
+        """
+        if stage in self._packed:
+            return self._packed[stage]
+
+        budget = self.budgets.get(stage, 0)
+        used = 0
+
+        summary = None
+        if self.summary:
+            summary = truncate_to_tokens(self.summary, budget // 2)
+            used = estimate_tokens(summary)
+
+        selected: List[Tuple[str, str]] = []
+        for question, answer in reversed(self.turns):
+            cost = estimate_tokens(question) + estimate_tokens(answer)
+            if used + cost <= budget:
+                selected.append((question, answer))
+                used += cost
+                continue
+
+            # Keep a shortened answer if at least the question fits
+            remaining = budget - used - estimate_tokens(question)
+            if remaining > 50:
+                answer = truncate_to_tokens(answer, remaining)
+                selected.append((question, answer))
+                used += estimate_tokens(question) + estimate_tokens(answer)
+            break
+
+        packed = (summary, list(reversed(selected)), used)
+        self._packed[stage] = packed
+        return packed
+
+    def stage1_messages(self) -> List[Dict[str, str]]:
+        """
+        Chat messages that precede the new question in Stage 1.
+
+        Returns:
+            A system message with the summary (if any) followed by the
+            recent turns as user/assistant messages
+        """
+        summary, turns, _ = self._pack("stage1")
+
+        messages = []
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation with the user:\n{summary}"
+            })
+        for question, answer in turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def prompt_block(self, stage: str) -> str:
+        """
+        Plain-text rendering of the context for a single-prompt stage.
+
+        Args:
+            stage: 'stage2' or 'stage3'
+
+        Returns:
+            Text block, or an empty string if nothing fits the budget
+        """
+        summary, turns, _ = self._pack(stage)
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        if turns:
+            parts.append("Most recent exchanges:\n" + "\n\n".join(
+                f"User: {question}\nCouncil answer: {answer}" for question, answer in turns
+            ))
+        return "\n\n".join(parts)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the context sent with this turn, for response metadata.
+
+        Returns:
+            Dict with total turns, turns covered by the summary and, per
+            stage, the verbatim turns and estimated context tokens
+        """
+        return {
+            "turns": len(self.turns),
+            "summary_turns": self.summary_turns,
+            "stages": {
+                stage: {
+                    "verbatim_turns": len(self._pack(stage)[1]),
+                    "tokens": self._pack(stage)[2]
+                }
+                for stage in DEFAULT_BUDGETS
+            }
+        }
@@ -1,83 +1,329 @@
 """3-stage LLM Council orchestration."""
 
-import os
-from typing import List, Dict, Any, Tuple
-from .providers import get_provider
+import math
+import time
+import asyncio
+from typing import List, Dict, Any, Tuple, Callable, Optional, AsyncIterator
+from .providers import iter_as_completed, route_query, route_stream
+from .cache import is_cache_bypassed
+from .semantic_cache import get_semantic_cache
+from .context import ConversationContext, get_context_config, DEFAULT_SUMMARY_TOKENS
+from .tokens import estimate_tokens, estimate_message_tokens, truncate_to_tokens
+from .usage import call_usage, aggregate_usage, as_cached
+from .metrics import stage_span
+from .prompt_budget import (
+    get_ranking_prompt_config, get_chairman_prompt_config, allocate_budget,
+    condense_texts, condense_critique, DEFAULT_RANKING_MAX_TOKENS,
+    DEFAULT_CONDENSE_MODE, DEFAULT_CHAIRMAN_TOP_K, DEFAULT_CHAIRMAN_MAX_TOKENS,
+    DEFAULT_CRITIQUE_SHARE
+)
 from .config import (
-    COUNCIL_MODELS, CHAIRMAN_MODEL, TITLE_GENERATOR_MODEL,
-    get_active_provider, get_provider_config
+    COUNCIL_MODELS, COUNCIL_SEATS, CHAIRMAN_SEAT, TITLE_GENERATOR_SEAT, Seat,
+    resolve_seat, get_active_provider, get_council_config
 )
 
 
-def _get_active_provider_functions() -> Dict[str, Any]:
-    """Get the currently active provider's function set.
+def _configured_seat(entry: Any, default: Seat) -> Seat:
+    """Resolve an optional model setting such as 'summary_model'.
+
+    Args:
+        entry: Seat entry as accepted by resolve_seat (on the active
+            provider by default), or None
+        default: Seat used when the setting is absent
+
+    Returns:
+        Seat for the setting
+    """
+    if entry is None:
+        return default
+    return resolve_seat(entry, get_active_provider())
+
+
+async def _query_seat(
+    seat: Seat,
+    messages: List[Dict[str, str]],
+    on_delta: Optional[Callable[[str, str], None]] = None,
+    **kwargs
+) -> Optional[Dict[str, Any]]:
+    """Query a seat through the router, which picks one of its backends.
+
+    Args:
+        seat: Seat to query
+        messages: Messages to send
+        on_delta: Optional callback invoked with (seat model, text_delta);
+            when given the answer is streamed
+        **kwargs: Extra arguments for the provider's query function, e.g. timeout
 
     Returns:
-        Dict with provider name, api_url, api_key, and query functions
+        Response dict with the serving 'provider' and 'model', or None if
+        every backend failed
     """
-    provider_name = get_active_provider()
-    provider_config = get_provider_config(provider_name)
+    if on_delta is not None:
+        return await _query_model_streaming(seat, messages, on_delta, **kwargs)
+
+    return await route_query(seat.backends, messages, **kwargs)
+
+
+async def _query_model_streaming(
+    seat: Seat,
+    messages: List[Dict[str, str]],
+    on_delta: Callable[[str, str], None],
+    **kwargs
+) -> Optional[Dict[str, Any]]:
+    """Query a seat, forwarding content deltas to on_delta as they arrive.
+
+    The router falls back to a single non-streaming query (emitted as one
+    delta) if the chosen provider does not register a stream function.
+
+    Args:
+        seat: Seat to query
+        messages: Messages to send
+        on_delta: Callback invoked with (seat model, text_delta)
 
-    provider_fns = get_provider(provider_name)
+    Returns:
+        Response dict with 'content', 'reasoning_details', 'usage',
+        'cached', 'coalesced' and the serving 'provider' and 'model', or
+        None if failed
+    """
+    content_parts = []
+    reasoning_parts = []
+    usage = None
+    cached = False
+    coalesced = False
+    provider_name = model = None
+
+    try:
+        async for chunk in route_stream(seat.backends, messages, **kwargs):
+            if chunk.get('content'):
+                content_parts.append(chunk['content'])
+                on_delta(seat.model, chunk['content'])
+            if chunk.get('reasoning_details'):
+                reasoning_parts.append(chunk['reasoning_details'])
+            if chunk.get('usage'):
+                usage = chunk['usage']
+            cached = cached or bool(chunk.get('cached'))
+            coalesced = coalesced or bool(chunk.get('coalesced'))
+            provider_name, model = chunk['provider'], chunk['model']
+    except Exception as e:
+        print(f"Error streaming model {seat.model}: {e}")
+        return None
 
     return {
-        "name": provider_name,
-        "api_url": provider_config["api_url"],
-        "api_key": os.getenv(provider_config["api_key_env"]),
-        "query_model": provider_fns["query_model"],
-        "query_models_parallel": provider_fns["query_models_parallel"]
+        'content': "".join(content_parts),
+        'reasoning_details': "".join(reasoning_parts) or None,
+        'usage': usage,
+        'cached': cached,
+        'coalesced': coalesced,
+        'provider': provider_name,
+        'model': model
     }
 
 
-async def stage1_collect_responses(user_query: str) -> List[Dict[str, Any]]:
+class QuorumTracker:
+    """Decide when a fan-out stage may stop waiting for slow models.
+
+    A stage advances as soon as either condition holds:
+    - ``min_responses`` successful responses have arrived, or
+    - at least half the council has answered and the remaining models are
+      more than ``straggler_seconds`` behind the median arrival.
+
+    With neither option set the stage waits for every model, as before.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        min_responses: Optional[int] = None,
+        straggler_seconds: Optional[float] = None
+    ):
+        self.total = total
+        self.min_responses = min_responses
+        self.straggler_seconds = straggler_seconds
+        self.started_at = time.monotonic()
+        self.arrivals: List[float] = []
+
+    @classmethod
+    def from_config(cls, total: int) -> "QuorumTracker":
+        """Build a tracker from the ``council.quorum`` config section."""
+        quorum_config = get_council_config().get("quorum", {})
+        if not quorum_config.get("enabled", False):
+            return cls(total)
+
+        return cls(
+            total,
+            min_responses=quorum_config.get("min_responses"),
+            straggler_seconds=quorum_config.get("straggler_seconds")
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the stage may stop before every model has answered."""
+        return self.min_responses is not None or self.straggler_seconds is not None
+
+    def record(self) -> None:
+        """Record one successful response arriving now."""
+        self.arrivals.append(time.monotonic() - self.started_at)
+
+    def time_left(self) -> Optional[float]:
+        """Seconds still worth waiting, None for no limit, <= 0 to stop now."""
+        if self.min_responses is not None and len(self.arrivals) >= self.min_responses:
+            return 0.0
+
+        median_index = math.ceil(self.total / 2)
+        if self.straggler_seconds is not None and len(self.arrivals) >= median_index:
+            median_arrival = self.arrivals[median_index - 1]
+            elapsed = time.monotonic() - self.started_at
+            return median_arrival + self.straggler_seconds - elapsed
+
+        return None
+
+
+def _report_stage_outcome(stage: str, quorum: QuorumTracker, answered: List[str], failed: List[str]) -> None:
+    """Log council models that failed, and those the quorum policy stopped waiting for.
+
+    Args:
+        stage: Stage name for the log
+        quorum: The stage's quorum tracker
+        answered: Models whose call finished, successfully or not
+        failed: Models whose call finished without a response
+    """
+    if failed:
+        print(f"{stage}: models failed {failed}")
+
+    # Only the quorum policy ends a stage before every call has finished
+    pending = [model for model in COUNCIL_MODELS if model not in answered]
+    if pending and quorum.enabled:
+        print(f"{stage}: quorum reached, dropped stragglers {pending}")
+
+
+def _in_council_order(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort per-model results back into COUNCIL_MODELS order.
+
+    Results arrive in completion order; a stable order keeps the anonymized
+    labels and downstream prompts independent of upstream timing.
+    """
+    order = {model: index for index, model in enumerate(COUNCIL_MODELS)}
+    return sorted(results, key=lambda result: order.get(result['model'], len(order)))
+
+
+async def stage1_iter_responses(
+    user_query: str,
+    on_delta: Optional[Callable[[str, str], None]] = None,
+    context: Optional[ConversationContext] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stage 1, incrementally: yield each council model's response as soon as it lands.
+
+    Args:
+        user_query: The user's question
+        on_delta: Optional callback invoked with (model, text_delta) as each
+            model streams its answer
+        context: Earlier turns of the conversation, if any
+
+    Yields:
+        Dicts with 'model', 'response' and 'usage' keys, in completion order.
+        Failed models are skipped.
+    """
+    messages = context.stage1_messages() if context is not None else []
+    messages.append({"role": "user", "content": user_query})
+    prompt_tokens = estimate_message_tokens(messages)
+
+    # Stop waiting for stragglers once the configured quorum is met
+    quorum = QuorumTracker.from_config(len(COUNCIL_SEATS))
+
+    # Query every seat in parallel, each through its own provider; with
+    # on_delta the answers are streamed and tokens forwarded as they arrive
+    completed = iter_as_completed({
+        seat.model: _query_seat(seat, messages, on_delta)
+        for seat in COUNCIL_SEATS
+    }, time_left_fn=quorum.time_left)
+
+    answered = []
+    failed = []
+    async for model, response in completed:
+        answered.append(model)
+        if response is None:
+            failed.append(model)
+        else:  # Only include successful responses
+            quorum.record()
+            yield {
+                "model": model,
+                "response": response.get('content', ''),
+                "usage": call_usage(prompt_tokens, response)
+            }
+
+    _report_stage_outcome("Stage 1", quorum, answered, failed)
+
+
+async def stage1_collect_responses(
+    user_query: str,
+    on_delta: Optional[Callable[[str, str], None]] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    context: Optional[ConversationContext] = None
+) -> List[Dict[str, Any]]:
     """
     Stage 1: Collect individual responses from all council models.
 
     Args:
         user_query: The user's question
+        on_delta: Optional callback invoked with (model, text_delta) as each
+            model streams its answer
+        on_result: Optional callback invoked with each model's result as
+            soon as that model finishes
+        context: Earlier turns of the conversation, if any
 
     Returns:
         List of dicts with 'model' and 'response' keys
     """
-    messages = [{"role": "user", "content": user_query}]
+    stage1_results = []
+    with stage_span("stage1"):
+        async for result in stage1_iter_responses(user_query, on_delta=on_delta, context=context):
+            stage1_results.append(result)
+            if on_result is not None:
+                on_result(result)
 
-    # Get the active provider and its configuration
-    provider = _get_active_provider_functions()
+    return _in_council_order(stage1_results)
 
-    # Query all models in parallel using the active provider
-    responses = await provider["query_models_parallel"](
-        models=COUNCIL_MODELS,
-        messages=messages,
-        api_url=provider["api_url"],
-        api_key=provider["api_key"]
-    )
 
-    # Format results
-    stage1_results = []
-    for model, response in responses.items():
-        if response is not None:  # Only include successful responses
-            stage1_results.append({
-                "model": model,
-                "response": response.get('content', '')
-            })
+def _context_section(context: Optional[ConversationContext], stage: str) -> str:
+    """Conversation context block for a single-prompt stage, or '' without history."""
+    if context is None:
+        return ""
 
-    return stage1_results
+    block = context.prompt_block(stage)
+    if not block:
+        return ""
 
+    return f"""
+This question is a follow-up in an ongoing conversation. Earlier context:
 
-async def stage2_collect_rankings(
+{block}
+"""
+
+
+def build_ranking_prompt(
     user_query: str,
-    stage1_results: List[Dict[str, Any]]
-) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    stage1_results: List[Dict[str, Any]],
+    context: Optional[ConversationContext] = None,
+    responses: Optional[List[str]] = None
+) -> Tuple[str, Dict[str, str]]:
     """
-    Stage 2: Each model ranks the anonymized responses.
+    Build the anonymized Stage 2 ranking prompt.
 
     Args:
         user_query: The original user query
         stage1_results: Results from Stage 1
+        context: Earlier turns of the conversation, if any
+        responses: Texts to show instead of the full responses (condensed
+            versions, in the order of stage1_results)
 
     Returns:
-        Tuple of (rankings list, label_to_model mapping)
+        Tuple of (ranking prompt, label_to_model mapping)
     """
+    full_responses = [result['response'] for result in stage1_results]
+    if responses is None:
+        responses = full_responses
+
     # Create anonymized labels for responses (Response A, Response B, etc.)
     labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
 
@@ -89,16 +335,22 @@ async def stage2_collect_rankings(
 
     # Build the ranking prompt
     responses_text = "\n\n".join([
-        f"Response {label}:\n{result['response']}"
-        for label, result in zip(labels, stage1_results)
+        f"Response {label}:\n{response}"
+        for label, response in zip(labels, responses)
     ])
 
-    ranking_prompt = f"""You are evaluating different responses to the following question:
+    condensed_note = ""
+    if responses != full_responses:
+        condensed_note = "\nLong responses have been condensed to fit; [...] marks omitted text. Do not penalize a response for the omissions.\n"
 
+    context_section = _context_section(context, "stage2")
+
+    ranking_prompt = f"""You are evaluating different responses to the following question:
+{context_section}
 Question: {user_query}
 
 Here are the responses from different models (anonymized):
-
+{condensed_note}
 {responses_text}
 
 Your task:
@@ -124,51 +376,195 @@ FINAL RANKING:
 
 Now provide your evaluation and ranking:"""
 
-    messages = [{"role": "user", "content": ranking_prompt}]
+    return ranking_prompt, label_to_model
 
-    # Get the active provider and its configuration
-    provider = _get_active_provider_functions()
 
-    # Get rankings from all council models in parallel
-    responses = await provider["query_models_parallel"](
-        models=COUNCIL_MODELS,
-        messages=messages,
-        api_url=provider["api_url"],
-        api_key=provider["api_key"]
+async def _digest_response(
+    user_query: str,
+    response: str,
+    max_tokens: int,
+    seat: Seat,
+    calls: List[Dict[str, Any]]
+) -> Optional[str]:
+    """Have a cheap model condense one Stage 1 response for a later-stage prompt; its usage is appended to calls."""
+    digest_prompt = f"""Condense the following answer to the question below to at most {max_tokens} tokens.
+Keep its main claims, reasoning steps, structure and any mistakes exactly as they are; do not correct, judge or add anything.
+Reply with the condensed answer only.
+
+Question: {user_query}
+
+Answer:
+{response}
+
+Condensed answer:"""
+
+    messages = [{"role": "user", "content": digest_prompt}]
+
+    result = await _query_seat(seat, messages, timeout=60.0)
+
+    if result is None:
+        return None
+    calls.append({"model": seat.model, "usage": call_usage(estimate_message_tokens(messages), result)})
+    return result.get('content', '').strip() or None
+
+
+async def prepare_ranking_prompt(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    context: Optional[ConversationContext] = None
+) -> Tuple[str, Dict[str, str], Optional[Dict[str, Any]]]:
+    """
+    Build the Stage 2 ranking prompt within the configured token budget.
+
+    With ``council.ranking_prompt`` enabled, the responses are condensed
+    (truncated, extracted or digested by a cheap model) so that together they
+    fit ``max_tokens``.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Results from Stage 1
+        context: Earlier turns of the conversation, if any
+
+    Returns:
+        Tuple of (ranking prompt, label_to_model mapping, prompt_info); the
+        prompt_info dict reports the condensed responses, the prompt tokens
+        saved and the digest model calls ('calls'), and is None when
+        budgeting is disabled
+    """
+    budget_config = get_ranking_prompt_config()
+    if not budget_config.get("enabled", False):
+        ranking_prompt, label_to_model = build_ranking_prompt(user_query, stage1_results, context)
+        return ranking_prompt, label_to_model, None
+
+    mode = budget_config.get("mode", DEFAULT_CONDENSE_MODE)
+    max_tokens = budget_config.get("max_tokens", DEFAULT_RANKING_MAX_TOKENS)
+
+    full_prompt, label_to_model = build_ranking_prompt(user_query, stage1_results, context)
+    digest_seat = _configured_seat(budget_config.get("digest_model"), TITLE_GENERATOR_SEAT)
+    digest_calls: List[Dict[str, Any]] = []
+    responses = await condense_texts(
+        [result['response'] for result in stage1_results],
+        max_tokens,
+        mode=mode,
+        digest=lambda response, budget: _digest_response(user_query, response, budget, digest_seat, digest_calls)
     )
+    ranking_prompt, _ = build_ranking_prompt(user_query, stage1_results, context, responses)
+
+    full_tokens = estimate_tokens(full_prompt)
+    prompt_tokens = estimate_tokens(ranking_prompt)
+    saved = max(full_tokens - prompt_tokens, 0)
+
+    prompt_info = {
+        "mode": mode,
+        "max_tokens": max_tokens,
+        "condensed": [
+            label for label, result, response in zip(label_to_model, stage1_results, responses)
+            if response != result['response']
+        ],
+        "full_prompt_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": saved,
+        # The prompt goes to every council model
+        "saved_tokens_total": saved * len(COUNCIL_MODELS),
+        "calls": digest_calls
+    }
+
+    return ranking_prompt, label_to_model, prompt_info
 
-    # Format results
-    stage2_results = []
-    for model, response in responses.items():
-        if response is not None:
+
+async def stage2_iter_rankings(ranking_prompt: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stage 2, incrementally: yield each council model's ranking as soon as it lands.
+
+    Args:
+        ranking_prompt: Prompt built by prepare_ranking_prompt
+
+    Yields:
+        Dicts with 'model', 'ranking', 'parsed_ranking' and 'usage' keys, in
+        completion order. Failed models are skipped.
+    """
+    messages = [{"role": "user", "content": ranking_prompt}]
+    prompt_tokens = estimate_message_tokens(messages)
+
+    # Stop waiting for stragglers once the configured quorum is met
+    quorum = QuorumTracker.from_config(len(COUNCIL_SEATS))
+
+    # Get rankings from all council seats in parallel
+    completed = iter_as_completed({
+        seat.model: _query_seat(seat, messages)
+        for seat in COUNCIL_SEATS
+    }, time_left_fn=quorum.time_left)
+
+    answered = []
+    failed = []
+    async for model, response in completed:
+        answered.append(model)
+        if response is None:
+            failed.append(model)
+        else:
+            quorum.record()
             full_text = response.get('content', '')
             parsed = parse_ranking_from_text(full_text)
-            stage2_results.append({
+            yield {
                 "model": model,
                 "ranking": full_text,
-                "parsed_ranking": parsed
-            })
+                "parsed_ranking": parsed,
+                "usage": call_usage(prompt_tokens, response)
+            }
 
-    return stage2_results, label_to_model
+    _report_stage_outcome("Stage 2", quorum, answered, failed)
 
 
-async def stage3_synthesize_final(
+async def stage2_collect_rankings(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
-    stage2_results: List[Dict[str, Any]]
-) -> Dict[str, Any]:
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    context: Optional[ConversationContext] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, str], Optional[Dict[str, Any]]]:
     """
-    Stage 3: Chairman synthesizes final response.
+    Stage 2: Each model ranks the anonymized responses.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Results from Stage 1
+        on_result: Optional callback invoked with each model's ranking as
+            soon as that model finishes
+        context: Earlier turns of the conversation, if any
+
+    Returns:
+        Tuple of (rankings list, label_to_model mapping, ranking prompt_info
+        or None; see prepare_ranking_prompt)
+    """
+    with stage_span("stage2"):
+        ranking_prompt, label_to_model, prompt_info = await prepare_ranking_prompt(user_query, stage1_results, context)
+
+        stage2_results = []
+        async for result in stage2_iter_rankings(ranking_prompt):
+            stage2_results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return _in_council_order(stage2_results), label_to_model, prompt_info
+
+
+def build_chairman_prompt(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    context: Optional[ConversationContext] = None
+) -> str:
+    """
+    Build the full Stage 3 chairman prompt with every response and ranking.
 
     Args:
         user_query: The original user query
         stage1_results: Individual model responses from Stage 1
         stage2_results: Rankings from Stage 2
+        context: Earlier turns of the conversation, if any
 
     Returns:
-        Dict with 'model' and 'response' keys
+        Chairman prompt
     """
-    # Build comprehensive context for chairman
     stage1_text = "\n\n".join([
         f"Model: {result['model']}\nResponse: {result['response']}"
         for result in stage1_results
@@ -179,8 +575,10 @@ async def stage3_synthesize_final(
         for result in stage2_results
     ])
 
-    chairman_prompt = f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+    context_section = _context_section(context, "stage3")
 
+    return f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+{context_section}
 Original Question: {user_query}
 
 STAGE 1 - Individual Responses:
@@ -189,37 +587,207 @@ STAGE 1 - Individual Responses:
 STAGE 2 - Peer Rankings:
 {stage2_text}
 
-Your task as Chairman is to synthesize all of this information into a single, comprehensive, accurate answer to the user's original question. Consider:
+{_CHAIRMAN_TASK}"""
+
+
+_CHAIRMAN_TASK = """Your task as Chairman is to synthesize all of this information into a single, comprehensive, accurate answer to the user's original question. Consider:
 - The individual responses and their insights
 - The peer rankings and what they reveal about response quality
 - Any patterns of agreement or disagreement
 
 Provide a clear, well-reasoned final answer that represents the council's collective wisdom:"""
 
-    messages = [{"role": "user", "content": chairman_prompt}]
 
-    # Get the active provider and its configuration
-    provider = _get_active_provider_functions()
+async def prepare_chairman_prompt(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    label_to_model: Optional[Dict[str, str]] = None,
+    context: Optional[ConversationContext] = None
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Build the Stage 3 chairman prompt within the configured token budget.
+
+    With ``council.chairman_prompt`` enabled, the chairman sees only the
+    top-K responses by aggregate peer ranking, condensed to fit
+    ``max_tokens``, plus each reviewer's condensed critique of those
+    responses and its full ranking order.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+        stage2_results: Rankings from Stage 2
+        label_to_model: Mapping from anonymous labels to model names
+            (required for budgeting)
+        context: Earlier turns of the conversation, if any
+
+    Returns:
+        Tuple of (chairman prompt, selection); the selection dict lists the
+        selected and omitted models, the prompt tokens saved and the digest
+        model calls ('calls'), and is None when budgeting is disabled
+    """
+    full_prompt = build_chairman_prompt(user_query, stage1_results, stage2_results, context)
+
+    budget_config = get_chairman_prompt_config()
+    if not budget_config.get("enabled", False) or label_to_model is None:
+        return full_prompt, None
+
+    top_k = budget_config.get("top_k", DEFAULT_CHAIRMAN_TOP_K)
+    max_tokens = budget_config.get("max_tokens", DEFAULT_CHAIRMAN_MAX_TOKENS)
+    critique_tokens = budget_config.get("critique_tokens", int(max_tokens * DEFAULT_CRITIQUE_SHARE))
+    mode = budget_config.get("mode", DEFAULT_CONDENSE_MODE)
+    digest_seat = _configured_seat(budget_config.get("digest_model"), TITLE_GENERATOR_SEAT)
+
+    model_to_label = {model: label for label, model in label_to_model.items()}
+    responses = {result['model']: result['response'] for result in stage1_results}
 
-    # Query the chairman model
-    response = await provider["query_model"](
-        model=CHAIRMAN_MODEL,
-        messages=messages,
-        api_url=provider["api_url"],
-        api_key=provider["api_key"]
+    # Best first by aggregate rank; responses nobody ranked go last
+    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+    average_rank = {entry['model']: entry['average_rank'] for entry in aggregate_rankings}
+    ranked = [entry['model'] for entry in aggregate_rankings if entry['model'] in responses]
+    ranked += [result['model'] for result in stage1_results if result['model'] not in average_rank]
+    selected = ranked[:top_k]
+
+    # Critiques are condensed first, to at most the whole budget; the
+    # responses get what they leave over
+    keep_labels = [model_to_label[model] for model in selected]
+    critique_budgets = allocate_budget(
+        [estimate_tokens(result['ranking']) for result in stage2_results], min(critique_tokens, max_tokens)
+    )
+    critiques = []
+    for result, budget in zip(stage2_results, critique_budgets):
+        critique = condense_critique(result['ranking'], keep_labels, budget)
+        order = " > ".join(
+            f"{label} ({label_to_model[label]})"
+            for label in result['parsed_ranking'] if label in label_to_model
+        )
+        critiques.append(f"Reviewer: {result['model']}\n{critique}\nRanking: {order}".replace("\n\n", "\n"))
+    stage2_text = "\n\n".join(critiques)
+
+    digest_calls: List[Dict[str, Any]] = []
+    texts = await condense_texts(
+        [responses[model] for model in selected],
+        max(0, max_tokens - estimate_tokens(stage2_text)),
+        mode=mode,
+        digest=lambda response, budget: _digest_response(user_query, response, budget, digest_seat, digest_calls)
     )
 
+    stage1_text = "\n\n".join([
+        f"{model_to_label[model]} (model: {model}, average peer rank: {average_rank.get(model, 'unranked')}):\n{text}"
+        for model, text in zip(selected, texts)
+    ])
+
+    context_section = _context_section(context, "stage3")
+
+    chairman_prompt = f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+{context_section}
+Original Question: {user_query}
+
+STAGE 1 - Top {len(selected)} of {len(stage1_results)} Responses, best first by aggregate peer ranking (long texts are condensed; [...] marks omitted text):
+{stage1_text}
+
+STAGE 2 - Peer Critiques (condensed; each ranking covers all responses):
+{stage2_text}
+
+{_CHAIRMAN_TASK}"""
+
+    full_tokens = estimate_tokens(full_prompt)
+    prompt_tokens = estimate_tokens(chairman_prompt)
+
+    selection = {
+        "top_k": top_k,
+        "selected": selected,
+        "omitted": ranked[top_k:],
+        "condensed": [model for model, text in zip(selected, texts) if text != responses[model]],
+        "max_tokens": max_tokens,
+        "full_prompt_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "saved_tokens": max(full_tokens - prompt_tokens, 0),
+        "calls": digest_calls
+    }
+
+    return chairman_prompt, selection
+
+
+async def stage3_synthesize_final(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    on_delta: Optional[Callable[[str, str], None]] = None,
+    context: Optional[ConversationContext] = None,
+    label_to_model: Optional[Dict[str, str]] = None,
+    cancelled_calls: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Stage 3: Chairman synthesizes final response.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Individual model responses from Stage 1
+        stage2_results: Rankings from Stage 2
+        on_delta: Optional callback invoked with (model, text_delta) as the
+            chairman streams its answer
+        context: Earlier turns of the conversation, if any
+        label_to_model: Mapping from anonymous labels to model names; needed
+            for the budgeted chairman prompt
+        cancelled_calls: Optional list that receives the usage of the model
+            calls made so far if the synthesis is cancelled: the prompt
+            digests, and the chairman call estimated from its prompt and the
+            text streamed until then
+
+    Returns:
+        Dict with 'model', 'response' and 'usage' keys, plus 'selection' (see
+        prepare_chairman_prompt) when the prompt was budgeted; callers move
+        it into the response metadata. If the chairman fails, 'response' is an
+        error message and 'error' is True
+    """
+    selection = None
+    messages = None
+    streamed: List[str] = []
+
+    def forward_delta(model: str, delta: str) -> None:
+        streamed.append(delta)
+        on_delta(model, delta)
+
+    try:
+        with stage_span("stage3"):
+            chairman_prompt, selection = await prepare_chairman_prompt(
+                user_query, stage1_results, stage2_results, label_to_model, context
+            )
+
+            messages = [{"role": "user", "content": chairman_prompt}]
+
+            # Query the chairman model through its own provider
+            response = await _query_seat(CHAIRMAN_SEAT, messages, forward_delta if on_delta is not None else None)
+    except asyncio.CancelledError:
+        if cancelled_calls is not None:
+            if selection is not None:
+                cancelled_calls.extend(selection["calls"])
+            if messages is not None:
+                # The prompt was sent: count it and whatever was generated so far
+                cancelled_calls.append({
+                    "model": CHAIRMAN_SEAT.model,
+                    "usage": call_usage(estimate_message_tokens(messages), {"content": "".join(streamed)})
+                })
+        raise
+
     if response is None:
         # Fallback if chairman fails
-        return {
-            "model": CHAIRMAN_MODEL,
-            "response": "Error: Unable to generate final synthesis."
+        result = {
+            "model": CHAIRMAN_SEAT.model,
+            "response": "Error: Unable to generate final synthesis.",
+            "error": True
+        }
+    else:
+        result = {
+            "model": CHAIRMAN_SEAT.model,
+            "response": response.get('content', ''),
+            "usage": call_usage(estimate_message_tokens(messages), response)
         }
 
-    return {
-        "model": CHAIRMAN_MODEL,
-        "response": response.get('content', '')
-    }
+    if selection is not None:
+        result["selection"] = selection
+    return result
 
 
 def parse_ranking_from_text(ranking_text: str) -> List[str]:
@@ -303,12 +871,175 @@ def calculate_aggregate_rankings(
     return aggregate
 
 
-async def generate_conversation_title(user_query: str) -> str:
+def is_pipeline_enabled() -> bool:
+    """Whether stage 3 should start speculatively on a ranking quorum."""
+    return get_council_config().get("pipeline", {}).get("enabled", False)
+
+
+def _top_k_models(aggregate_rankings: List[Dict[str, Any]], top_k: int) -> List[str]:
+    """Model names of the top_k aggregate ranking entries, best first."""
+    return [entry['model'] for entry in aggregate_rankings[:top_k]]
+
+
+class _DeltaGate:
+    """Hold back speculative chairman deltas until the speculation is kept."""
+
+    def __init__(self, on_delta: Callable[[str, str], None]):
+        self.on_delta = on_delta
+        self.buffer: List[Tuple[str, str]] = []
+        self.released = False
+
+    def __call__(self, model: str, delta: str) -> None:
+        if self.released:
+            self.on_delta(model, delta)
+        else:
+            self.buffer.append((model, delta))
+
+    def release(self) -> None:
+        """Flush buffered deltas and pass any further ones straight through."""
+        self.released = True
+        for model, delta in self.buffer:
+            self.on_delta(model, delta)
+        self.buffer.clear()
+
+
+async def _discard_speculation(task: asyncio.Task, calls: List[Dict[str, Any]]) -> None:
+    """Cancel a speculative chairman run that is not kept, adding the calls it made to calls."""
+    task.cancel()
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+        # stage3_synthesize_final added the calls made so far (cancelled_calls)
+        return
+    # Finished before it could be cancelled
+    if result.get("selection") is not None:
+        calls.extend(result["selection"]["calls"])
+    calls.append({"model": result["model"], "usage": result.get("usage")})
+
+
+async def run_pipelined_stages(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    on_stage2_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_stage2_complete: Optional[Callable[[List[Dict[str, Any]], Dict[str, str], List[Dict[str, Any]]], None]] = None,
+    on_stage3_delta: Optional[Callable[[str, str], None]] = None,
+    context: Optional[ConversationContext] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, str], List[Dict[str, Any]], Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Run Stage 2 and Stage 3 with a speculative chairman start.
+
+    As soon as ``council.pipeline.min_rankings`` rankings have arrived, the
+    chairman starts on those partial rankings while the remaining rankings
+    are still being collected. Once Stage 2 finishes, the speculative answer
+    is kept if the aggregate top ``council.pipeline.top_k`` order is
+    unchanged and the speculative chairman call succeeded; otherwise it is
+    cancelled and Stage 3 restarts on the full rankings. Speculative
+    chairman deltas are only forwarded once kept. The model calls of a
+    discarded speculation are listed in pipeline_info ('calls') so that
+    their tokens are still accounted for.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Results from Stage 1
+        on_stage2_result: Optional callback invoked with each model's ranking
+        on_stage2_complete: Optional callback invoked with (stage2_results,
+            label_to_model, aggregate_rankings) once Stage 2 finishes
+        on_stage3_delta: Optional callback invoked with (model, text_delta)
+            as the chairman streams its answer
+        context: Earlier turns of the conversation, if any
+
+    Returns:
+        Tuple of (stage2_results, label_to_model, aggregate_rankings,
+        stage3_result, pipeline_info, ranking prompt_info or None)
+    """
+    pipeline_config = get_council_config().get("pipeline", {})
+    min_rankings = pipeline_config.get("min_rankings", math.ceil(len(COUNCIL_MODELS) / 2))
+    top_k = pipeline_config.get("top_k", 1)
+
+    gate = _DeltaGate(on_stage3_delta) if on_stage3_delta is not None else None
+    speculative_task = None
+    speculative_top = None
+    speculative_calls: List[Dict[str, Any]] = []
+    rankings_at_start = 0
+
+    try:
+        # Speculative chairman runs report their own stage3 span
+        with stage_span("stage2"):
+            ranking_prompt, label_to_model, prompt_info = await prepare_ranking_prompt(user_query, stage1_results, context)
+
+            stage2_results = []
+            async for result in stage2_iter_rankings(ranking_prompt):
+                stage2_results.append(result)
+                if on_stage2_result is not None:
+                    on_stage2_result(result)
+
+                if (
+                    speculative_task is None
+                    and len(stage2_results) >= min_rankings
+                    and len(stage2_results) < len(COUNCIL_MODELS)
+                ):
+                    partial_results = _in_council_order(stage2_results)
+                    partial_aggregate = calculate_aggregate_rankings(partial_results, label_to_model)
+                    speculative_top = _top_k_models(partial_aggregate, top_k)
+                    rankings_at_start = len(partial_results)
+                    speculative_task = asyncio.create_task(stage3_synthesize_final(
+                        user_query, stage1_results, partial_results, on_delta=gate, context=context,
+                        label_to_model=label_to_model, cancelled_calls=speculative_calls
+                    ))
+
+        stage2_results = _in_council_order(stage2_results)
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        if on_stage2_complete is not None:
+            on_stage2_complete(stage2_results, label_to_model, aggregate_rankings)
+
+        kept = (
+            speculative_task is not None
+            and _top_k_models(aggregate_rankings, top_k) == speculative_top
+        )
+
+        stage3_result = None
+        if kept:
+            if gate is not None:
+                gate.release()
+            stage3_result = await speculative_task
+            if stage3_result.get("error"):
+                # The speculative chairman failed: try again on the full rankings
+                kept = False
+                stage3_result = None
+                await _discard_speculation(speculative_task, speculative_calls)
+        elif speculative_task is not None:
+            # Late rankings changed the top-K order: restart on full rankings
+            await _discard_speculation(speculative_task, speculative_calls)
+
+        if stage3_result is None:
+            stage3_result = await stage3_synthesize_final(
+                user_query, stage1_results, stage2_results, on_delta=on_stage3_delta, context=context,
+                label_to_model=label_to_model
+            )
+    finally:
+        # A failing ranking stream or callback, or cancellation, must not leave the chairman running
+        if speculative_task is not None and not speculative_task.done():
+            speculative_task.cancel()
+
+    pipeline_info = {
+        "speculative": speculative_task is not None,
+        "kept": kept,
+        "rankings_at_start": rankings_at_start,
+        "calls": speculative_calls
+    }
+
+    return stage2_results, label_to_model, aggregate_rankings, stage3_result, pipeline_info, prompt_info
+
+
+async def generate_conversation_title(user_query: str, calls: Optional[List[Dict[str, Any]]] = None) -> str:
     """
     Generate a short title for a conversation based on the first user message.
 
     Args:
         user_query: The first user message
+        calls: Optional list that receives the usage of the title model call
 
     Returns:
         A short title (3-5 words)
@@ -322,21 +1053,14 @@ Title:"""
 
     messages = [{"role": "user", "content": title_prompt}]
 
-    # Get the active provider and its configuration
-    provider = _get_active_provider_functions()
-
     # Use configured title generator model (fast and cheap)
-    response = await provider["query_model"](
-        model=TITLE_GENERATOR_MODEL,
-        messages=messages,
-        api_url=provider["api_url"],
-        api_key=provider["api_key"],
-        timeout=30.0
-    )
+    response = await _query_seat(TITLE_GENERATOR_SEAT, messages, timeout=30.0)
 
     if response is None:
         # Fallback to a generic title
         return "New Conversation"
+    if calls is not None:
+        calls.append({"model": TITLE_GENERATOR_SEAT.model, "usage": call_usage(estimate_message_tokens(messages), response)})
 
     title = response.get('content', 'New Conversation').strip()
 
@@ -350,43 +1074,213 @@ Title:"""
     return title
 
 
-async def run_full_council(user_query: str) -> Tuple[List, List, Dict, Dict]:
+async def summarize_turns(
+    previous_summary: Optional[str],
+    turns: List[Tuple[str, str]],
+    calls: Optional[List[Dict[str, Any]]] = None
+) -> Optional[str]:
+    """
+    Fold new turns into a conversation's rolling summary.
+
+    Only the previous summary and the new turns are sent, so the cost of an
+    update does not grow with the length of the conversation.
+
+    Args:
+        previous_summary: Summary of the turns so far, or None
+        turns: New (question, final answer) turns, oldest first
+        calls: Optional list that receives the usage of the summarizer call
+
+    Returns:
+        The updated summary, or None if the summarizer failed
+    """
+    context_config = get_context_config()
+    summary_tokens = context_config.get("summary_tokens", DEFAULT_SUMMARY_TOKENS)
+    turn_tokens = context_config.get("summary_turn_tokens", 1500)
+
+    exchanges = "\n\n".join(
+        f"User: {truncate_to_tokens(question, turn_tokens)}\nCouncil answer: {truncate_to_tokens(answer, turn_tokens)}"
+        for question, answer in turns
+    )
+
+    summary_prompt = f"""You maintain a running summary of a conversation between a user and an AI council.
+Update the summary so it also covers the new exchange. Keep the facts, decisions, user preferences and open questions that later questions may refer to, and drop details that no longer matter.
+Keep it under {summary_tokens} tokens. Reply with the updated summary only.
+
+Current summary:
+{previous_summary or "(none yet)"}
+
+New exchange:
+{exchanges}
+
+Updated summary:"""
+
+    messages = [{"role": "user", "content": summary_prompt}]
+
+    summary_seat = _configured_seat(context_config.get("summary_model"), TITLE_GENERATOR_SEAT)
+    response = await _query_seat(summary_seat, messages, timeout=60.0)
+
+    if response is None:
+        return None
+    if calls is not None:
+        calls.append({"model": summary_seat.model, "usage": call_usage(estimate_message_tokens(messages), response)})
+
+    summary = response.get('content', '').strip()
+    return truncate_to_tokens(summary, summary_tokens) if summary else None
+
+
+def overhead_calls(
+    ranking_prompt_info: Optional[Dict[str, Any]],
+    chairman_selection: Optional[Dict[str, Any]],
+    pipeline_info: Optional[Dict[str, Any]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Model calls of a council run outside its three stages, by usage line item (see aggregate_usage)."""
+    return {
+        "digest": (ranking_prompt_info or {}).get("calls", []) + (chairman_selection or {}).get("calls", []),
+        "speculation": (pipeline_info or {}).get("calls", [])
+    }
+
+
+def lookup_semantic_cache(
+    user_query: str,
+    context: Optional[ConversationContext] = None
+) -> Optional[Tuple[List, List, Dict, Dict]]:
+    """
+    Look up a stored council result for a semantically similar query.
+
+    Follow-up questions (with conversation context) are never served from
+    the cache: their meaning depends on the earlier turns.
+
+    Args:
+        user_query: The user's question
+        context: Earlier turns of the conversation, if any
+
+    Returns:
+        (stage1_results, stage2_results, stage3_result, metadata) with
+        'semantic_cache' details added to metadata, or None on a miss. The
+        results' usage is flagged as cached, since a hit makes no model
+        calls, and metadata['usage'] is recomputed to match
+    """
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is None or is_cache_bypassed() or context is not None:
+        return None
+
+    match = semantic_cache.lookup(user_query)
+    if match is None:
+        return None
+
+    stage1_results, stage2_results, stage3_result, metadata = match["bundle"]
+    stage1_results = [as_cached(result) for result in stage1_results]
+    stage2_results = [as_cached(result) for result in stage2_results]
+    stage3_result = as_cached(stage3_result)
+    metadata = {
+        **metadata,
+        "usage": aggregate_usage(stage1_results, stage2_results, stage3_result),
+        "semantic_cache": {
+            "hit": True,
+            "similarity": match["similarity"],
+            "matched_query": match["matched_query"]
+        }
+    }
+    return stage1_results, stage2_results, stage3_result, metadata
+
+
+def store_semantic_cache(
+    user_query: str,
+    bundle: Tuple[List, List, Dict, Dict],
+    context: Optional[ConversationContext] = None
+) -> None:
+    """Store a full council result in the semantic cache, if enabled and not a follow-up.
+
+    Failed runs (no Stage 1 responses, or a chairman error) are not stored, so
+    they are never served for a later question.
+    """
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is None or is_cache_bypassed() or context is not None:
+        return
+
+    stage1_results, _, stage3_result, _ = bundle
+    if not stage1_results or not stage3_result or stage3_result.get("error"):
+        return
+
+    semantic_cache.store(user_query, bundle)
+
+
+async def run_full_council(
+    user_query: str,
+    context: Optional[ConversationContext] = None
+) -> Tuple[List, List, Dict, Dict]:
     """
     Run the complete 3-stage council process.
 
     Args:
         user_query: The user's question
+        context: Earlier turns of the conversation, if any
 
     Returns:
         Tuple of (stage1_results, stage2_results, stage3_result, metadata)
     """
+    # Serve paraphrases of already answered questions from the semantic cache
+    cached = lookup_semantic_cache(user_query, context)
+    if cached is not None:
+        return cached
+
     # Stage 1: Collect individual responses
-    stage1_results = await stage1_collect_responses(user_query)
+    stage1_results = await stage1_collect_responses(user_query, context=context)
 
     # If no models responded successfully, return error
     if not stage1_results:
         return [], [], {
             "model": "error",
-            "response": "All models failed to respond. Please try again."
+            "response": "All models failed to respond. Please try again.",
+            "error": True
         }, {}
 
-    # Stage 2: Collect rankings
-    stage2_results, label_to_model = await stage2_collect_rankings(user_query, stage1_results)
-
-    # Calculate aggregate rankings
-    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-
-    # Stage 3: Synthesize final answer
-    stage3_result = await stage3_synthesize_final(
-        user_query,
-        stage1_results,
-        stage2_results
-    )
+    if is_pipeline_enabled():
+        # Stages 2 and 3 overlap: the chairman starts on a ranking quorum
+        (
+            stage2_results, label_to_model, aggregate_rankings,
+            stage3_result, pipeline_info, ranking_prompt_info
+        ) = await run_pipelined_stages(user_query, stage1_results, context=context)
+    else:
+        # Stage 2: Collect rankings
+        stage2_results, label_to_model, ranking_prompt_info = await stage2_collect_rankings(
+            user_query, stage1_results, context=context
+        )
+
+        # Calculate aggregate rankings
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+
+        # Stage 3: Synthesize final answer
+        stage3_result = await stage3_synthesize_final(
+            user_query,
+            stage1_results,
+            stage2_results,
+            context=context,
+            label_to_model=label_to_model
+        )
+        pipeline_info = None
+
+    # The chairman's response selection belongs in the metadata
+    chairman_selection = stage3_result.pop("selection", None)
 
     # Prepare metadata
     metadata = {
         "label_to_model": label_to_model,
         "aggregate_rankings": aggregate_rankings
     }
+    if pipeline_info is not None:
+        metadata["pipeline"] = pipeline_info
+    if ranking_prompt_info is not None:
+        metadata["ranking_prompt"] = ranking_prompt_info
+    if chairman_selection is not None:
+        metadata["chairman_prompt"] = chairman_selection
+    metadata["usage"] = aggregate_usage(
+        stage1_results, stage2_results, stage3_result,
+        overhead_calls(ranking_prompt_info, chairman_selection, pipeline_info)
+    )
+    if context is not None:
+        metadata["context"] = context.info()
+
+    store_semantic_cache(user_query, (stage1_results, stage2_results, stage3_result, metadata), context)
 
     return stage1_results, stage2_results, stage3_result, metadata
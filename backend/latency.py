@@ -0,0 +1,282 @@
+"""Adaptive per-model timeouts from observed latencies.
+
+Every real model call reports its latency here (see
+providers.base.RequestTimer). For each (provider, model) a rolling window of
+recent latencies is kept, separately for:
+
+- ``total``: duration of non-streaming calls
+- ``ttfb``: time to the first event of streaming calls; the timeout of a
+  stream bounds the wait between reads, and the first one is the longest
+
+Once a window holds ``min_samples`` latencies, the timeout of the next call
+is the configured percentile times ``factor``, clamped to
+``[min_seconds, max_seconds]``. The timeout a caller passes (such as the
+30 seconds for title generation) is an upper bound; calls without one are
+bounded by ``max_seconds``. A call that runs into its timeout counts as a
+sample of that length, so a timeout that is too tight widens again. A call
+cancelled while it was already slower than the median (a hedge loser, a
+quorum straggler) counts with the time it ran.
+
+The windows are saved to a JSON file, so the learned timeouts survive
+restarts. Recording a sample never touches the disk: run_latency_saver()
+writes the file periodically in a worker thread, and the server saves once
+more on shutdown.
+"""
+
+import os
+import json
+import math
+import asyncio
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional, Deque, Tuple
+
+from .config import get_timeouts_config
+
+DEFAULT_PERCENTILE = 99
+DEFAULT_FACTOR = 2.0
+DEFAULT_MIN_SECONDS = 10.0
+DEFAULT_MAX_SECONDS = 120.0
+DEFAULT_WINDOW = 200
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_PATH = "data/latency.json"
+# Seconds between periodic saves
+DEFAULT_SAVE_INTERVAL = 60.0
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        samples: Non-empty list of values
+        p: Percentile in (0, 100]
+
+    Returns:
+        The smallest sample that at least p percent of the samples do not exceed
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyTracker:
+    """
+    Rolling latency windows per (provider, model, kind), persisted as JSON.
+
+    Args:
+        window: Number of recent latencies kept per series
+        path: JSON file to load from and save to (None: not persisted)
+        save_interval: Seconds between saves by run_latency_saver()
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        path: Optional[str] = None,
+        save_interval: float = DEFAULT_SAVE_INTERVAL
+    ):
+        self.window = window
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], Deque[float]] = {}
+        self._dirty = False
+
+        if path:
+            self.load()
+
+    def observe(self, provider: str, model: str, kind: str, seconds: float) -> None:
+        """Add one latency; the windows are saved later by run_latency_saver()."""
+        with self._lock:
+            key = (provider, model, kind)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = deque(maxlen=self.window)
+            series.append(seconds)
+            self._dirty = True
+
+    def samples(self, provider: str, model: str, kind: str) -> List[float]:
+        """Latencies in the window, oldest first."""
+        with self._lock:
+            return list(self._series.get((provider, model, kind), ()))
+
+    def load(self) -> None:
+        """Load saved windows; a missing or unreadable file leaves them empty."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load latency stats from {self.path}: {e}")
+            return
+
+        with self._lock:
+            for provider, models in data.get("samples", {}).items():
+                for model, kinds in models.items():
+                    for kind, values in kinds.items():
+                        self._series[(provider, model, kind)] = deque(
+                            (float(value) for value in values), maxlen=self.window
+                        )
+
+    def save(self) -> None:
+        """Write the windows to the JSON file if anything changed (blocking)."""
+        from .storage.base import write_atomic
+
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            samples: Dict[str, Dict[str, Dict[str, List[float]]]] = {}
+            for (provider, model, kind), series in self._series.items():
+                samples.setdefault(provider, {}).setdefault(model, {})[kind] = [
+                    round(value, 3) for value in series
+                ]
+            self._dirty = False
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            write_atomic(self.path, json.dumps({"samples": samples}), fsync=False)
+        except OSError as e:
+            print(f"Warning: could not save latency stats to {self.path}: {e}")
+
+    def keys(self) -> List[Tuple[str, str, str]]:
+        """All (provider, model, kind) series with samples."""
+        with self._lock:
+            return sorted(self._series)
+
+
+_tracker: Optional[LatencyTracker] = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the process-wide tracker, loading saved windows on first use."""
+    global _tracker
+
+    if _tracker is None:
+        config = get_timeouts_config()
+        _tracker = LatencyTracker(
+            window=config.get("window", DEFAULT_WINDOW),
+            path=config.get("path", DEFAULT_PATH),
+            save_interval=config.get("save_interval_seconds", DEFAULT_SAVE_INTERVAL)
+        )
+
+    return _tracker
+
+
+def save_latency_stats() -> None:
+    """Save the latency windows now (blocking; called off the event loop)."""
+    if _tracker is not None:
+        _tracker.save()
+
+
+async def run_latency_saver() -> None:
+    """Save the latency windows every save interval in a worker thread.
+
+    Runs until cancelled; the server cancels it on shutdown and saves once more.
+    """
+    tracker = get_latency_tracker()
+    if not tracker.path:
+        return
+
+    while True:
+        await asyncio.sleep(tracker.save_interval)
+        await asyncio.to_thread(tracker.save)
+
+
+def _derive(samples: List[float], config: Dict[str, Any]) -> Optional[float]:
+    """Timeout suggested by the samples before the caller's bound, or None if too few."""
+    if len(samples) < config.get("min_samples", DEFAULT_MIN_SAMPLES):
+        return None
+    derived = percentile(samples, config.get("percentile", DEFAULT_PERCENTILE)) * config.get("factor", DEFAULT_FACTOR)
+    return max(config.get("min_seconds", DEFAULT_MIN_SECONDS), derived)
+
+
+def adaptive_timeout(provider: str, model: str, timeout: Optional[float], kind: str = "total") -> Optional[float]:
+    """
+    Timeout for the next call of a model.
+
+    Args:
+        provider: Provider name
+        model: Model identifier
+        timeout: Timeout requested by the caller, used as the upper bound
+            (None: timeouts.max_seconds)
+        kind: 'total' for a non-streaming call, 'ttfb' for a stream
+
+    Returns:
+        Timeout in seconds
+    """
+    config = get_timeouts_config()
+    bound = timeout if timeout is not None else config.get("max_seconds", DEFAULT_MAX_SECONDS)
+    if not config.get("adaptive", True):
+        return bound
+
+    derived = _derive(get_latency_tracker().samples(provider, model, kind), config)
+    if derived is None:
+        return bound
+    return min(bound, derived) if bound is not None else derived
+
+
+def record_latency(provider: str, model: str, kind: str, seconds: float) -> None:
+    """
+    Add an observed latency (or the length of a timeout that was hit).
+
+    Args:
+        provider: Provider name
+        model: Model identifier
+        kind: 'total' or 'ttfb'
+        seconds: Latency in seconds
+    """
+    if get_timeouts_config().get("adaptive", True):
+        get_latency_tracker().observe(provider, model, kind, seconds)
+
+
+def record_latency_lower_bound(provider: str, model: str, kind: str, seconds: float) -> None:
+    """
+    Add a call that was cancelled after ``seconds`` without a latency to report.
+
+    The call would have taken at least that long. It is counted (as
+    ``seconds``) only when it was already slower than the median: dropping
+    the slow calls that hedging and quorum cut short would bias the window
+    low, while a call cancelled early says nothing about its latency.
+
+    Args:
+        provider: Provider name
+        model: Model identifier
+        kind: 'total' or 'ttfb'
+        seconds: Time the call ran before it was cancelled
+    """
+    if not get_timeouts_config().get("adaptive", True):
+        return
+    tracker = get_latency_tracker()
+    samples = tracker.samples(provider, model, kind)
+    if samples and seconds >= percentile(samples, 50):
+        tracker.observe(provider, model, kind, seconds)
+
+
+def get_timeout_stats() -> Dict[str, Any]:
+    """
+    Current latency percentiles and derived timeouts.
+
+    Returns:
+        Dict provider -> model -> kind -> {samples, p50, the configured
+        percentile (e.g. p99), timeout}; timeout is None until the window
+        has min_samples latencies
+    """
+    config = get_timeouts_config()
+    tracker = get_latency_tracker()
+    p = config.get("percentile", DEFAULT_PERCENTILE)
+
+    stats: Dict[str, Any] = {}
+    for provider, model, kind in tracker.keys():
+        samples = tracker.samples(provider, model, kind)
+        derived = _derive(samples, config)
+        if derived is not None:
+            derived = round(min(derived, config.get("max_seconds", DEFAULT_MAX_SECONDS)), 3)
+        stats.setdefault(provider, {}).setdefault(model, {})[kind] = {
+            "samples": len(samples),
+            "p50": round(percentile(samples, 50), 3),
+            f"p{p:g}": round(percentile(samples, p), 3),
+            "timeout": derived
+        }
+    return stats
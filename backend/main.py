@@ -1,19 +1,46 @@
 """FastAPI backend for LLM Council."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Set, Tuple
+from contextlib import asynccontextmanager, suppress
 import uuid
 import json
 import asyncio
 
-from . import storage
-from .council import run_full_council, generate_conversation_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings
+from .storage import aio as storage
+from .storage.compact import STAGE_KEYS
+from .cache import set_cache_bypass, get_cache_stats
+from .semantic_cache import get_semantic_cache
+from .council import run_full_council, generate_conversation_title, summarize_turns, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings, is_pipeline_enabled, run_pipelined_stages, lookup_semantic_cache, store_semantic_cache, overhead_calls
+from .usage import aggregate_usage, add_call_usage
+from .metrics import start_run_timings, render_metrics
+from .latency import get_timeout_stats, save_latency_stats, run_latency_saver
+from .context import ConversationContext, is_context_enabled, is_summary_enabled, turns_to_summarize
 from .config import SERVER_HOST, SERVER_PORT, CORS_ORIGINS
+from .providers import (
+    list_providers, open_http_clients, close_http_clients, set_fair_share_key,
+    get_scheduler_stats, get_singleflight_stats, get_router_stats
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled provider HTTP clients and save latency stats periodically; on shutdown close the clients, flush storage and save once more."""
+    await open_http_clients(list_providers())
+    latency_saver = asyncio.create_task(run_latency_saver())
+    yield
+    latency_saver.cancel()
+    with suppress(asyncio.CancelledError):
+        await latency_saver
+    await close_http_clients()
+    await storage.close()
+    await asyncio.to_thread(save_latency_stats)
+
 
-app = FastAPI(title="LLM Council API")
+app = FastAPI(title="LLM Council API", lifespan=lifespan)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -33,6 +60,7 @@ class CreateConversationRequest(BaseModel):
 class SendMessageRequest(BaseModel):
     """Request to send a message in a conversation."""
     content: str
+    bypass_cache: bool = False
 
 
 class ConversationMetadata(BaseModel):
@@ -57,71 +85,331 @@ async def root():
     return {"status": "ok", "service": "LLM Council API"}
 
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Response, semantic and conversation cache statistics, and model calls in flight."""
+    semantic_cache = get_semantic_cache()
+    return {
+        **get_cache_stats(),
+        "semantic": semantic_cache.stats if semantic_cache is not None else None,
+        "storage": storage.get_stats(),
+        "in_flight": get_singleflight_stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency histograms for model calls, council stages and storage, in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/timeouts")
+async def timeouts():
+    """Observed latency percentiles and the adaptive timeout derived for each model."""
+    return get_timeout_stats()
+
+
+@app.get("/api/scheduler")
+async def scheduler():
+    """Concurrency slots in use, queued calls and Retry-After pauses per provider and model."""
+    return get_scheduler_stats()
+
+
+@app.get("/api/router")
+async def router():
+    """Recent error rate, circuit state and typical latency per backend."""
+    return get_router_stats()
+
+
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
-    return storage.list_conversations()
+async def list_conversations(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    before: Optional[str] = None,
+    before_id: Optional[str] = None
+):
+    """
+    List conversations (metadata only), newest first.
+
+    Pass the created_at and id of the last item as `before` and `before_id`
+    to fetch the next page.
+    """
+    return await storage.list_conversations(limit=limit, before=before, before_id=before_id)
 
 
 @app.post("/api/conversations", response_model=Conversation)
 async def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
-    conversation = storage.create_conversation(conversation_id)
+    conversation = await storage.create_conversation(conversation_id)
     return conversation
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
-    """Get a specific conversation with all its messages."""
-    conversation = storage.get_conversation(conversation_id)
+async def get_conversation(conversation_id: str, include: Optional[str] = None):
+    """
+    Get a specific conversation with all its messages.
+
+    `include` is a comma-separated list of stages (stage1, stage2, stage3) to
+    keep in assistant messages; by default all stages are returned.
+    """
+    stages = None
+    if include is not None:
+        stages = {stage.strip() for stage in include.split(",") if stage.strip()}
+        unknown = stages - set(STAGE_KEYS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown stages in include: {', '.join(sorted(unknown))}")
+
+    conversation = await storage.get_conversation(conversation_id, include=stages)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conversation
 
 
+def _context_include() -> Tuple[str, ...]:
+    """Stages to load from earlier turns: final answers when context is on, nothing otherwise."""
+    return ("stage3",) if is_context_enabled() else ()
+
+
+# Running summary updates, referenced so they are not garbage collected
+_summary_tasks: Set[asyncio.Task] = set()
+
+
+def _schedule_summary_update(
+    conversation_id: str,
+    conversation: Dict[str, Any],
+    user_query: str,
+    stage3_result: Dict[str, Any]
+):
+    """
+    Fold a finished turn into the conversation's rolling summary in the background.
+
+    Args:
+        conversation_id: Conversation identifier
+        conversation: Conversation as loaded before the turn
+        user_query: The user's question
+        stage3_result: The chairman's final answer
+    """
+    if not is_summary_enabled() or stage3_result.get("error"):
+        # Failed turns are left out of the summary, as they are of the context
+        return
+
+    previous, new_turns, covered = turns_to_summarize(
+        conversation, (user_query, stage3_result.get("response", ""))
+    )
+
+    async def update():
+        try:
+            calls = []
+            summary = await summarize_turns(previous, new_turns, calls)
+            if summary is not None:
+                # The summary record keeps the running usage of all summarizer calls
+                usage = add_call_usage((conversation.get("summary") or {}).get("usage"), {"summary": calls})
+                await storage.update_conversation_summary(
+                    conversation_id, {"text": summary, "turns": covered, "usage": usage}
+                )
+        except Exception as e:
+            print(f"Error updating summary of conversation {conversation_id}: {e}")
+
+    task = asyncio.create_task(update())
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+
+
 @app.post("/api/conversations/{conversation_id}/message")
 async def send_message(conversation_id: str, request: SendMessageRequest):
     """
     Send a message and run the 3-stage council process.
     Returns the complete response with all stages.
     """
-    # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
+    # Time this request's stages, model calls and storage operations
+    timings = start_run_timings()
+
+    # Check if conversation exists (only final answers are needed, for context)
+    conversation = await storage.get_conversation(conversation_id, include=_context_include())
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
     is_first_message = len(conversation["messages"]) == 0
 
+    # Earlier turns, packed into per-stage token budgets
+    context = ConversationContext.from_conversation(conversation)
+
+    # Skip the response cache for this request if asked to
+    set_cache_bypass(request.bypass_cache)
+    # Queue this conversation's model calls fairly against other conversations
+    set_fair_share_key(conversation_id)
+
     # Add user message
-    storage.add_user_message(conversation_id, request.content)
+    await storage.add_user_message(conversation_id, request.content)
 
     # If this is the first message, generate a title
+    title_calls = []
     if is_first_message:
-        title = await generate_conversation_title(request.content)
-        storage.update_conversation_title(conversation_id, title)
+        title = await generate_conversation_title(request.content, title_calls)
+        await storage.update_conversation_title(conversation_id, title)
 
     # Run the 3-stage council process
     stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-        request.content
+        request.content, context=context
     )
+    if title_calls:
+        metadata = {**metadata, "usage": add_call_usage(metadata.get("usage"), {"title": title_calls})}
 
     # Add assistant message with all stages
-    storage.add_assistant_message(
+    await storage.add_assistant_message(
         conversation_id,
         stage1_results,
         stage2_results,
-        stage3_result
+        stage3_result,
+        metadata.get("usage")
     )
+    if stage1_results:
+        _schedule_summary_update(conversation_id, conversation, request.content, stage3_result)
 
-    # Return the complete response with metadata
+    # Return the complete response with metadata (copied: it may be shared with the semantic cache)
     return {
         "stage1": stage1_results,
         "stage2": stage2_results,
         "stage3": stage3_result,
-        "metadata": metadata
+        "metadata": {**metadata, "timings": timings.summary()}
+    }
+
+
+async def _drain_task_events(task: asyncio.Task, queue: asyncio.Queue) -> AsyncIterator[Dict[str, Any]]:
+    """Yield events pushed onto queue until task finishes, then flush the rest."""
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+
+        while not queue.empty():
+            yield queue.get_nowait()
+    finally:
+        # Client went away mid-stage: stop the upstream work too
+        if not task.done():
+            task.cancel()
+
+
+async def _stream_council_events(
+    user_query: str,
+    outcome: Dict[str, Any],
+    context: Optional[ConversationContext] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the 3-stage council live, yielding SSE events as work progresses.
+
+    Final results are written to outcome ('stage1', 'stage2', 'stage3',
+    'metadata') since an async generator cannot return a value.
+    """
+    context_metadata = {'context': context.info()} if context is not None else {}
+
+    # Token deltas and per-model results are pushed here by the stage callbacks
+    delta_queue: asyncio.Queue = asyncio.Queue()
+
+    def on_stage1_delta(model: str, delta: str):
+        delta_queue.put_nowait({'type': 'stage1_delta', 'model': model, 'delta': delta})
+
+    def on_stage3_delta(model: str, delta: str):
+        delta_queue.put_nowait({'type': 'stage3_delta', 'model': model, 'delta': delta})
+
+    def on_stage1_result(result: Dict[str, Any]):
+        delta_queue.put_nowait({'type': 'stage1_model_complete', 'data': result})
+
+    def on_stage2_result(result: Dict[str, Any]):
+        delta_queue.put_nowait({'type': 'stage2_model_complete', 'data': result})
+
+    # Stage 1: Collect responses
+    yield {'type': 'stage1_start'}
+    stage1_task = asyncio.create_task(
+        stage1_collect_responses(user_query, on_delta=on_stage1_delta, on_result=on_stage1_result, context=context)
+    )
+    async for event in _drain_task_events(stage1_task, delta_queue):
+        yield event
+    stage1_results = stage1_task.result()
+    yield {'type': 'stage1_complete', 'data': stage1_results}
+
+    # Stage 2: Collect rankings
+    yield {'type': 'stage2_start'}
+    pipeline_info = None
+    if is_pipeline_enabled():
+        # Stages 2 and 3 overlap: the chairman starts on a ranking quorum
+        def on_stage2_complete(stage2_results, label_to_model, aggregate_rankings):
+            delta_queue.put_nowait({'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings, **context_metadata}})
+            delta_queue.put_nowait({'type': 'stage3_start'})
+
+        pipeline_task = asyncio.create_task(run_pipelined_stages(
+            user_query,
+            stage1_results,
+            on_stage2_result=on_stage2_result,
+            on_stage2_complete=on_stage2_complete,
+            on_stage3_delta=on_stage3_delta,
+            context=context
+        ))
+        async for event in _drain_task_events(pipeline_task, delta_queue):
+            yield event
+        stage2_results, label_to_model, aggregate_rankings, stage3_result, pipeline_info, ranking_prompt_info = pipeline_task.result()
+    else:
+        stage2_task = asyncio.create_task(
+            stage2_collect_rankings(user_query, stage1_results, on_result=on_stage2_result, context=context)
+        )
+        async for event in _drain_task_events(stage2_task, delta_queue):
+            yield event
+        stage2_results, label_to_model, ranking_prompt_info = stage2_task.result()
+        aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+        yield {'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings, **context_metadata}}
+
+        # Stage 3: Synthesize final answer
+        yield {'type': 'stage3_start'}
+        stage3_task = asyncio.create_task(
+            stage3_synthesize_final(
+                user_query, stage1_results, stage2_results,
+                on_delta=on_stage3_delta, context=context, label_to_model=label_to_model
+            )
+        )
+        async for event in _drain_task_events(stage3_task, delta_queue):
+            yield event
+        stage3_result = stage3_task.result()
+
+    # The chairman's response selection belongs in the metadata
+    chairman_selection = stage3_result.pop("selection", None)
+    yield {'type': 'stage3_complete', 'data': stage3_result}
+
+    metadata = {
+        "label_to_model": label_to_model,
+        "aggregate_rankings": aggregate_rankings
     }
+    if pipeline_info is not None:
+        metadata["pipeline"] = pipeline_info
+    if ranking_prompt_info is not None:
+        metadata["ranking_prompt"] = ranking_prompt_info
+    if chairman_selection is not None:
+        metadata["chairman_prompt"] = chairman_selection
+    metadata["usage"] = aggregate_usage(
+        stage1_results, stage2_results, stage3_result,
+        overhead_calls(ranking_prompt_info, chairman_selection, pipeline_info)
+    )
+    metadata.update(context_metadata)
+
+    outcome.update(stage1=stage1_results, stage2=stage2_results, stage3=stage3_result, metadata=metadata)
+
+    # Remember this result for paraphrased questions (skipped for failed runs)
+    store_semantic_cache(user_query, (stage1_results, stage2_results, stage3_result, metadata), context)
+
+
+async def _replay_council_events(cached: Tuple[List, List, Dict, Dict], outcome: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the stage events for a council result served from the semantic cache."""
+    stage1_results, stage2_results, stage3_result, metadata = cached
+
+    yield {'type': 'stage1_complete', 'data': stage1_results}
+    yield {'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata}
+    yield {'type': 'stage3_complete', 'data': stage3_result}
+
+    outcome.update(stage1=stage1_results, stage2=stage2_results, stage3=stage3_result, metadata=metadata)
 
 
 @app.post("/api/conversations/{conversation_id}/message/stream")
@@ -130,56 +418,72 @@ async def send_message_stream(conversation_id: str, request: SendMessageRequest)
     Send a message and stream the 3-stage council process.
     Returns Server-Sent Events as each stage completes.
     """
-    # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
+    # Check if conversation exists (only final answers are needed, for context)
+    conversation = await storage.get_conversation(conversation_id, include=_context_include())
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
     is_first_message = len(conversation["messages"]) == 0
 
+    # Earlier turns, packed into per-stage token budgets
+    context = ConversationContext.from_conversation(conversation)
+
     async def event_generator():
         try:
+            # Time this request's stages, model calls and storage operations
+            timings = start_run_timings()
+
+            # Skip the response cache for this request if asked to
+            set_cache_bypass(request.bypass_cache)
+            # Queue this conversation's model calls fairly against other conversations
+            set_fair_share_key(conversation_id)
+
             # Add user message
-            storage.add_user_message(conversation_id, request.content)
+            await storage.add_user_message(conversation_id, request.content)
 
             # Start title generation in parallel (don't await yet)
             title_task = None
+            title_calls = []
             if is_first_message:
-                title_task = asyncio.create_task(generate_conversation_title(request.content))
+                title_task = asyncio.create_task(generate_conversation_title(request.content, title_calls))
 
-            # Stage 1: Collect responses
-            yield f"data: {json.dumps({'type': 'stage1_start'})}\n\n"
-            stage1_results = await stage1_collect_responses(request.content)
-            yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
+            # Replay a semantically matching council result, or run the stages live
+            outcome: Dict[str, Any] = {}
+            cached = lookup_semantic_cache(request.content, context)
+            if cached is not None:
+                events = _replay_council_events(cached, outcome)
+            else:
+                events = _stream_council_events(request.content, outcome, context)
 
-            # Stage 2: Collect rankings
-            yield f"data: {json.dumps({'type': 'stage2_start'})}\n\n"
-            stage2_results, label_to_model = await stage2_collect_rankings(request.content, stage1_results)
-            aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-            yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}})}\n\n"
+            async for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
 
-            # Stage 3: Synthesize final answer
-            yield f"data: {json.dumps({'type': 'stage3_start'})}\n\n"
-            stage3_result = await stage3_synthesize_final(request.content, stage1_results, stage2_results)
-            yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
+            stage1_results = outcome["stage1"]
+            stage2_results = outcome["stage2"]
+            stage3_result = outcome["stage3"]
+            usage = outcome["metadata"].get("usage")
 
             # Wait for title generation if it was started
             if title_task:
                 title = await title_task
-                storage.update_conversation_title(conversation_id, title)
+                await storage.update_conversation_title(conversation_id, title)
                 yield f"data: {json.dumps({'type': 'title_complete', 'data': {'title': title}})}\n\n"
+                usage = add_call_usage(usage, {"title": title_calls})
 
             # Save complete assistant message
-            storage.add_assistant_message(
+            await storage.add_assistant_message(
                 conversation_id,
                 stage1_results,
                 stage2_results,
-                stage3_result
+                stage3_result,
+                usage
             )
+            if stage1_results:
+                _schedule_summary_update(conversation_id, conversation, request.content, stage3_result)
 
             # Send completion event
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+            yield f"data: {json.dumps({'type': 'complete', 'timings': timings.summary()})}\n\n"
 
         except Exception as e:
             # Send error event
@@ -0,0 +1,320 @@
+"""Latency metrics for model calls, council stages and storage.
+
+Timings are recorded twice:
+
+- into process-wide histograms, served in the Prometheus text format at
+  ``/metrics`` (render_metrics)
+- into the RunTimings of the current request, if one was started with
+  start_run_timings(), so a single council run can report where its time
+  went (the SSE ``complete`` event and the response metadata)
+
+The current request and stage are tracked in context variables, so tasks
+created while they are set (parallel model calls, the speculative
+chairman) report into the right run and stage.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+# Upper bounds in seconds, from fast storage reads to slow reasoning models
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+# Phases of a model call, see providers.base.RequestTimer
+MODEL_CALL_PHASES = ("queue", "connect", "ttfb", "total")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    """
+    Prometheus histogram with labels.
+
+    Args:
+        name: Metric name
+        help_text: Metric description
+        labelnames: Label names, in order
+        buckets: Bucket upper bounds in seconds
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """Lines of the Prometheus text format for this histogram."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                for bound, bucket_count in zip(self.buckets, counts):
+                    bucket_labels = _format_labels({**labels, "le": repr(float(bound))})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    """
+    Prometheus counter with labels.
+
+    Args:
+        name: Metric name (should end in _total)
+        help_text: Metric description
+        labelnames: Label names, in order
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        """Lines of the Prometheus text format for this counter."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {value}")
+        return lines
+
+
+MODEL_CALL_SECONDS = Histogram(
+    "llm_council_model_call_seconds",
+    "Model call latency by phase: queue (waiting for a pooled connection), connect, ttfb and total",
+    ("provider", "model", "phase")
+)
+MODEL_CALL_ERRORS = Counter(
+    "llm_council_model_call_errors_total",
+    "Failed model calls",
+    ("provider", "model")
+)
+MODEL_CALL_CANCELLATIONS = Counter(
+    "llm_council_model_call_cancellations_total",
+    "Model calls cancelled before they finished (hedge losers, quorum stragglers, closed streams)",
+    ("provider", "model")
+)
+MODEL_CALL_RETRIES = Counter(
+    "llm_council_model_call_retries_total",
+    "Model call retries by the error that caused them",
+    ("provider", "model", "reason")
+)
+MODEL_CALL_HEDGES = Counter(
+    "llm_council_model_call_hedges_total",
+    "Hedged duplicate model requests by which request answered first (primary, hedge or none)",
+    ("provider", "model", "winner")
+)
+COALESCED_CALLS = Counter(
+    "llm_council_coalesced_calls_total",
+    "Model calls that joined an identical call already in flight instead of going upstream",
+    ("provider", "model", "kind")
+)
+MODEL_CALL_FAILOVERS = Counter(
+    "llm_council_model_call_failovers_total",
+    "Calls moved to another backend of the same seat after this backend failed",
+    ("provider", "model")
+)
+SCHEDULER_WAIT_SECONDS = Histogram(
+    "llm_council_scheduler_wait_seconds",
+    "Time model calls waited in the scheduler for concurrency slots and rate limits",
+    ("provider", "model")
+)
+STAGE_SECONDS = Histogram(
+    "llm_council_stage_seconds",
+    "Council stage duration",
+    ("stage",)
+)
+STORAGE_SECONDS = Histogram(
+    "llm_council_storage_seconds",
+    "Storage operation duration",
+    ("operation",)
+)
+
+_METRICS = [
+    MODEL_CALL_SECONDS, MODEL_CALL_ERRORS, MODEL_CALL_CANCELLATIONS, MODEL_CALL_RETRIES, MODEL_CALL_HEDGES,
+    COALESCED_CALLS, MODEL_CALL_FAILOVERS, SCHEDULER_WAIT_SECONDS, STAGE_SECONDS,
+    STORAGE_SECONDS
+]
+
+
+def register_metric(metric) -> None:
+    """Add a Histogram or Counter to the /metrics output."""
+    _METRICS.append(metric)
+
+
+def render_metrics() -> str:
+    """
+    Render all metrics.
+
+    Returns:
+        Text in the Prometheus exposition format
+    """
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _round(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds, 3) if seconds is not None else None
+
+
+class RunTimings:
+    """Timings of one council run (one request)."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.stages: Dict[str, float] = {}
+        # stage -> model -> phase -> seconds
+        self.models: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+        self.storage: Dict[str, Dict[str, float]] = {}
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Timings recorded so far, in seconds.
+
+        Returns:
+            Dict with 'total', per-stage durations ('stages'), per-stage
+            per-model call phases ('models') and storage time per operation
+            ('storage')
+        """
+        return {
+            "total": _round(time.monotonic() - self.started_at),
+            "stages": {stage: _round(seconds) for stage, seconds in self.stages.items()},
+            "models": {
+                stage: {
+                    model: {
+                        phase: _round(value) if isinstance(value, float) else value
+                        for phase, value in phases.items()
+                    }
+                    for model, phases in models.items()
+                }
+                for stage, models in self.models.items()
+            },
+            "storage": {
+                operation: {"count": entry["count"], "seconds": _round(entry["seconds"])}
+                for operation, entry in self.storage.items()
+            }
+        }
+
+
+_run_timings: ContextVar[Optional[RunTimings]] = ContextVar("run_timings", default=None)
+_current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+
+def start_run_timings() -> RunTimings:
+    """Start collecting the timings of the current request."""
+    timings = RunTimings()
+    _run_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def stage_span(stage: str) -> Iterator[None]:
+    """
+    Time a council stage; model calls made inside are attributed to it.
+
+    Args:
+        stage: Stage name ('stage1', 'stage2', 'stage3')
+    """
+    token = _current_stage.set(stage)
+    started_at = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - started_at
+        _current_stage.reset(token)
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _run_timings.get()
+        if timings is not None:
+            timings.stages[stage] = elapsed
+
+
+def record_model_call(
+    provider: str,
+    model: str,
+    phases: Dict[str, Optional[float]],
+    error: bool = False,
+    cancelled: bool = False
+) -> None:
+    """
+    Record the phases of one model call.
+
+    Args:
+        provider: Provider name
+        model: Model identifier
+        phases: Seconds per phase (None for phases that could not be measured)
+        error: Whether the call failed
+        cancelled: Whether the call was cancelled before it finished
+    """
+    for phase, seconds in phases.items():
+        if seconds is not None:
+            MODEL_CALL_SECONDS.observe(seconds, provider=provider, model=model, phase=phase)
+    if error:
+        MODEL_CALL_ERRORS.inc(provider=provider, model=model)
+    if cancelled:
+        MODEL_CALL_CANCELLATIONS.inc(provider=provider, model=model)
+
+    timings = _run_timings.get()
+    if timings is not None:
+        stage = _current_stage.get() or "other"
+        entry = dict(phases)
+        if error:
+            entry["error"] = True
+        if cancelled:
+            entry["cancelled"] = True
+        timings.models.setdefault(stage, {})[model] = entry
+
+
+def record_storage(operation: str, seconds: float) -> None:
+    """
+    Record the duration of one storage operation.
+
+    Args:
+        operation: Backend method name
+        seconds: Duration including the wait for a storage thread
+    """
+    STORAGE_SECONDS.observe(seconds, operation=operation)
+
+    timings = _run_timings.get()
+    if timings is not None:
+        entry = timings.storage.setdefault(operation, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
@@ -0,0 +1,143 @@
+"""Token budgets for the prompts that embed other models' answers.
+
+The ranking prompt carries every Stage 1 answer and is sent to every council
+model, so its cost grows with the square of the council size. With
+``council.ranking_prompt`` enabled, the answers are condensed to fit a token
+budget before the prompt is built. Answers that already fit keep their full
+text; the budget they leave over is shared by the longer ones.
+
+Condensing modes:
+
+- ``truncate``: keep the beginning of the answer
+- ``extract``: keep the lead sentence of each paragraph, then further
+  sentences while the budget lasts (see tokens.extract_to_tokens)
+- ``digest``: have a cheap model condense the answer, falling back to
+  ``extract`` if it fails
+
+The chairman prompt embeds every answer and every full ranking text. With
+``council.chairman_prompt`` enabled, the chairman sees only the top-K answers
+by aggregate ranking, condensed the same way, plus condensed critiques.
+"""
+
+import asyncio
+import re
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+from .config import get_council_config
+from .tokens import estimate_tokens, truncate_to_tokens, extract_to_tokens
+
+CONDENSE_MODES = ("truncate", "extract", "digest")
+
+DEFAULT_RANKING_MAX_TOKENS = 6000
+DEFAULT_CONDENSE_MODE = "extract"
+
+DEFAULT_CHAIRMAN_TOP_K = 3
+DEFAULT_CHAIRMAN_MAX_TOKENS = 6000
+# Share of the chairman budget given to critiques when not configured
+DEFAULT_CRITIQUE_SHARE = 0.25
+
+_RESPONSE_LABEL = re.compile(r"Response [A-Z]")
+
+# Async function (text, max_tokens) -> condensed text, or None on failure
+DigestFn = Callable[[str, int], Awaitable[Optional[str]]]
+
+
+def get_ranking_prompt_config() -> Dict[str, Any]:
+    """Get the council.ranking_prompt configuration section."""
+    return get_council_config().get("ranking_prompt", {})
+
+
+def get_chairman_prompt_config() -> Dict[str, Any]:
+    """Get the council.chairman_prompt configuration section."""
+    return get_council_config().get("chairman_prompt", {})
+
+
+def allocate_budget(costs: List[int], total: int) -> List[int]:
+    """
+    Split a token budget across texts.
+
+    Texts that fit their equal share keep their full size and the budget
+    they leave over goes to the longer ones, which end up with equal shares.
+
+    Args:
+        costs: Estimated tokens of each text
+        total: Total budget
+
+    Returns:
+        Budget per text, in the order of costs
+    """
+    budgets = [0] * len(costs)
+    remaining = max(total, 0)
+    by_cost = sorted(range(len(costs)), key=lambda i: costs[i])
+    for position, index in enumerate(by_cost):
+        share = remaining // (len(by_cost) - position)
+        budgets[index] = min(costs[index], share)
+        remaining -= budgets[index]
+    return budgets
+
+
+async def condense_texts(
+    texts: List[str],
+    max_tokens: int,
+    mode: str = DEFAULT_CONDENSE_MODE,
+    digest: Optional[DigestFn] = None
+) -> List[str]:
+    """
+    Condense texts so that together they fit a token budget.
+
+    Args:
+        texts: Texts to condense
+        max_tokens: Budget for all texts together
+        mode: 'truncate', 'extract' or 'digest'
+        digest: Condenses one text with a model (required for 'digest')
+
+    Returns:
+        Condensed texts, in order; texts within their share are unchanged
+    """
+    if mode not in CONDENSE_MODES:
+        raise ValueError(f"Unknown condense mode '{mode}'")
+
+    costs = [estimate_tokens(text) for text in texts]
+    budgets = allocate_budget(costs, max_tokens)
+
+    if mode == "truncate":
+        return [truncate_to_tokens(text, budget) for text, budget in zip(texts, budgets)]
+
+    condensed = [extract_to_tokens(text, budget) for text, budget in zip(texts, budgets)]
+    if mode == "extract" or digest is None:
+        return condensed
+
+    over = [i for i, (cost, budget) in enumerate(zip(costs, budgets)) if cost > budget]
+    digests = await asyncio.gather(*(digest(texts[i], budgets[i]) for i in over))
+    for i, text in zip(over, digests):
+        # Failed digests keep the extract
+        if text:
+            condensed[i] = truncate_to_tokens(text, budgets[i])
+    return condensed
+
+
+def condense_critique(ranking_text: str, keep_labels: List[str], max_tokens: int) -> str:
+    """
+    Condense a Stage 2 evaluation for the chairman.
+
+    The FINAL RANKING section is dropped (callers show the parsed ranking
+    instead), as are paragraphs that only discuss responses outside
+    keep_labels. What remains is extracted down to the budget.
+
+    Args:
+        ranking_text: Full ranking text of one council model
+        keep_labels: Labels of the responses the chairman will see
+        max_tokens: Budget for the condensed critique
+
+    Returns:
+        Condensed critique text (may be empty)
+    """
+    evaluation = ranking_text.split("FINAL RANKING:")[0].strip()
+
+    kept = []
+    for paragraph in re.split(r"\n\s*\n", evaluation):
+        labels = set(_RESPONSE_LABEL.findall(paragraph))
+        if not labels or labels & set(keep_labels):
+            kept.append(paragraph.strip())
+
+    return extract_to_tokens("\n\n".join(kept), max_tokens)
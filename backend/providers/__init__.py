@@ -2,9 +2,16 @@
 Provider注册表和工厂
 使用函数式策略模式，每个provider导出标准签名的函数
 """
-from typing import Callable, Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, AsyncIterator, Tuple
 import importlib
 
+from .base import get_http_client, open_http_clients, close_http_clients, iter_as_completed
+from .retry import with_retry, with_stream_retry
+from .scheduler import with_scheduler, with_stream_scheduler, set_fair_share_key, get_scheduler_stats
+from .singleflight import with_singleflight, with_stream_singleflight, get_singleflight_stats
+from .router import rank_backends, route_query, route_stream, get_router_stats
+from ..cache import cached_query, cached_stream
+
 # Provider函数注册表
 _provider_registry: Dict[str, Dict[str, Callable]] = {}
 
@@ -13,16 +20,59 @@ def register_provider(
     name: str,
     query_fn: Callable,
     query_parallel_fn: Callable,
-    supports_reasoning: bool = False
+    supports_reasoning: bool = False,
+    stream_fn: Optional[Callable] = None
 ) -> None:
-    """注册provider及其函数"""
+    """注册provider及其函数
+
+    query_fn返回{'content', 'reasoning_details', 'usage'}，usage为服务端报告的token用量（可能为None），出错时抛出异常；
+    stream_fn为可选的流式查询函数，签名与query_fn相同，
+    返回逐块产出{'content', 'reasoning_details'}增量的异步迭代器，用量以{'usage'}块产出
+
+    query_fn和stream_fn会由内到外依次包装上调度（并发与速率限制，见scheduler.py）、重试（见retry.py）、
+    相同请求合并（见singleflight.py）和响应缓存（见backend/cache.py），注册后的query_model在重试用尽时返回None；
+    两者的timeout参数（默认None）是超时上限，实际超时由该模型的历史延迟推导（见backend/latency.py）
+
+    席位配置了多个可互换的后端时，由route_query/route_stream选择后端并在失败时转移（见router.py）
+    """
+    query_fn = with_scheduler(name, query_fn)
+    query_fn = cached_query(name, with_singleflight(name, with_retry(name, query_fn)))
+    if stream_fn is not None:
+        stream_fn = with_stream_scheduler(name, stream_fn)
+        stream_fn = cached_stream(name, with_stream_singleflight(name, with_stream_retry(name, stream_fn)))
+
     _provider_registry[name] = {
         "query_model": query_fn,
         "query_models_parallel": query_parallel_fn,
+        "query_models_as_completed": _make_as_completed_fn(query_fn),
+        "stream_model": stream_fn,
         "supports_reasoning": supports_reasoning
     }
 
 
+def _make_as_completed_fn(query_fn: Callable) -> Callable:
+    """基于query_fn构造按完成顺序产出结果的并行查询函数"""
+
+    def query_models_as_completed(
+        models: List[str],
+        messages: List[Dict[str, str]],
+        api_url: str,
+        api_key: str,
+        time_left_fn: Optional[Callable[[], Optional[float]]] = None,
+        **kwargs
+    ) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """并行查询多个模型，每个模型返回后立即产出(model, response)
+
+        time_left_fn见iter_as_completed，用于提前结束并丢弃慢模型
+        """
+        return iter_as_completed({
+            model: query_fn(model, messages, api_url, api_key, **kwargs)
+            for model in models
+        }, time_left_fn=time_left_fn)
+
+    return query_models_as_completed
+
+
 def get_provider(name: str) -> Dict[str, Callable]:
     """获取provider的函数集合"""
     if name not in _provider_registry:
@@ -41,7 +91,7 @@ def _autoload_providers() -> None:
     import pathlib
 
     providers_dir = pathlib.Path(__file__).parent
-    excluded = {"__init__.py", "base.py"}  # 排除的文件
+    excluded = {"__init__.py", "base.py", "retry.py", "scheduler.py", "singleflight.py", "router.py"}  # 排除的文件
 
     for module_file in providers_dir.glob("*.py"):
         if module_file.name in excluded:
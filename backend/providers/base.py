@@ -0,0 +1,290 @@
+"""
+Provider共享基础设施
+按provider维护长连接的httpx.AsyncClient连接池，生命周期由FastAPI应用管理
+"""
+import json
+import time
+import asyncio
+import httpx
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Hashable, Tuple
+
+# 连接池默认参数，可在provider配置的"http"段中覆盖
+DEFAULT_HTTP_CONFIG: Dict[str, Any] = {
+    "http2": False,
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "connect_timeout": 10.0,
+}
+
+# provider名称 -> 共享的AsyncClient
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def reasoning_text(reasoning: Any) -> Optional[str]:
+    """把reasoning_details统一成文本
+
+    流式增量是字符串；OpenRouter非流式响应是结构化列表（reasoning.text条目带text，reasoning.summary条目带summary，
+    加密的reasoning.encrypted条目没有可读文本，跳过）。把非流式响应当作流式块产出前需要先转换，
+    否则拼接各块的文本时会出错
+    """
+    if reasoning is None or isinstance(reasoning, str):
+        return reasoning
+    if isinstance(reasoning, list):
+        parts = [item.get("text") or item.get("summary") for item in reasoning if isinstance(item, dict)]
+        return "".join(part for part in parts if isinstance(part, str)) or None
+    return str(reasoning)
+
+
+def _get_http_config(provider_name: str) -> Dict[str, Any]:
+    """合并默认值与provider配置中的http段"""
+    from ..config import get_config
+
+    provider_config = get_config().get("providers", {}).get(provider_name, {})
+    return {**DEFAULT_HTTP_CONFIG, **provider_config.get("http", {})}
+
+
+def _http2_available() -> bool:
+    """HTTP/2需要可选依赖h2 (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _create_client(provider_name: str) -> httpx.AsyncClient:
+    """根据provider配置创建连接池客户端"""
+    http_config = _get_http_config(provider_name)
+
+    http2 = bool(http_config["http2"])
+    if http2 and not _http2_available():
+        print(f"Warning: http2 enabled for {provider_name} but 'h2' is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=http_config["max_connections"],
+        max_keepalive_connections=http_config["max_keepalive_connections"],
+        keepalive_expiry=http_config["keepalive_expiry"],
+    )
+
+    # 读取超时由每次请求的timeout参数决定，这里只设置连接超时
+    timeout = httpx.Timeout(None, connect=http_config["connect_timeout"])
+
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+
+
+def get_http_client(provider_name: str) -> httpx.AsyncClient:
+    """获取provider共享的AsyncClient，未初始化时惰性创建
+
+    Args:
+        provider_name: Provider名称 (e.g., 'openrouter', 'siliconflow')
+
+    Returns:
+        该provider的共享httpx.AsyncClient
+    """
+    client = _clients.get(provider_name)
+    if client is None or client.is_closed:
+        client = _create_client(provider_name)
+        _clients[provider_name] = client
+    return client
+
+
+def request_timeout(provider_name: str, timeout: Optional[float]) -> httpx.Timeout:
+    """构造单次请求的超时，保留连接池配置的连接超时"""
+    connect_timeout = _get_http_config(provider_name)["connect_timeout"]
+    return httpx.Timeout(timeout, connect=connect_timeout)
+
+
+async def open_http_clients(provider_names) -> None:
+    """应用启动时为给定的providers预先创建连接池"""
+    for name in provider_names:
+        get_http_client(name)
+
+
+async def close_http_clients() -> None:
+    """应用关闭时释放所有连接池"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+class RequestTimer:
+    """记录单次模型请求各阶段的耗时，并上报到backend.metrics
+
+    阶段：
+    - queue: 等待连接池分配连接
+    - connect: 建立TCP/TLS连接（复用长连接时为0）
+    - ttfb: 收到首字节（流式请求为首个SSE事件，否则为响应头）
+    - total: 请求总耗时
+
+    通过httpx的trace扩展获取连接事件：把trace方法作为extensions={"trace": timer.trace}传入请求
+
+    同时为backend.latency提供延迟样本，用于推导该模型的自适应超时（见request_timeout方法）
+    """
+
+    def __init__(self, provider_name: str, model: str):
+        self.provider_name = provider_name
+        self.model = model
+        self.started_at = time.monotonic()
+        self.first_byte_at: Optional[float] = None
+        self._events: Dict[str, float] = {}
+        # 本次请求实际使用的超时及其对应的延迟类型（'total'或'ttfb'）
+        self.timeout: Optional[float] = None
+        self.latency_kind = "total"
+        self._finished = False
+
+    def request_timeout(self, timeout: Optional[float], stream: bool = False) -> httpx.Timeout:
+        """构造本次请求的超时，读取超时由该模型的历史延迟推导
+
+        Args:
+            timeout: 调用方要求的超时，作为上限（None表示使用timeouts.max_seconds）
+            stream: 是否为流式请求；流式请求按首字节延迟推导
+        """
+        from ..latency import adaptive_timeout
+
+        self.latency_kind = "ttfb" if stream else "total"
+        self.timeout = adaptive_timeout(self.provider_name, self.model, timeout, self.latency_kind)
+        return request_timeout(self.provider_name, self.timeout)
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace回调，记录每类事件首次出现的时间"""
+        # 去掉"connection."/"http11."/"http2."前缀
+        self._events.setdefault(event_name.split(".", 1)[-1], time.monotonic())
+
+    def mark_first_byte(self) -> None:
+        """标记收到首个数据块"""
+        if self.first_byte_at is None:
+            self.first_byte_at = time.monotonic()
+
+    def phases(self) -> Dict[str, Optional[float]]:
+        """各阶段耗时（秒），无法测量的阶段为None"""
+        now = time.monotonic()
+        connect_started = self._events.get("connect_tcp.started")
+        request_sent = self._events.get("send_request_headers.started")
+
+        queue = connect = None
+        if connect_started is not None or request_sent is not None:
+            queue = (connect_started or request_sent) - self.started_at
+            connected = self._events.get("start_tls.complete") or self._events.get("connect_tcp.complete")
+            connect = connected - connect_started if connect_started is not None and connected else 0.0
+
+        first_byte = self.first_byte_at or self._events.get("receive_response_headers.complete")
+        return {
+            "queue": queue,
+            "connect": connect,
+            "ttfb": first_byte - self.started_at if first_byte is not None else None,
+            "total": now - self.started_at,
+        }
+
+    def finish(self, error: bool = False, cancelled: bool = False) -> None:
+        """请求结束时调用，上报各阶段耗时和延迟样本；只有第一次调用生效，可以放在finally中兜底
+
+        失败的请求只有在耗尽超时时才作为样本（记为超时时长），使过紧的超时能重新放宽；
+        被取消的请求（对冲落败、被quorum丢弃、流被提前关闭）已收到首个事件的流式请求记录真实的首字节延迟，
+        其余的只知道延迟不短于已耗时间（见backend.latency.record_latency_lower_bound）
+        """
+        from ..metrics import record_model_call
+        from ..latency import record_latency, record_latency_lower_bound
+
+        if self._finished:
+            return
+        self._finished = True
+
+        phases = self.phases()
+        record_model_call(self.provider_name, self.model, phases, error=error, cancelled=cancelled)
+
+        if cancelled:
+            if self.latency_kind == "ttfb" and self.first_byte_at is not None:
+                record_latency(self.provider_name, self.model, self.latency_kind, phases["ttfb"])
+            else:
+                record_latency_lower_bound(self.provider_name, self.model, self.latency_kind, phases["total"])
+            return
+
+        if not error:
+            latency = phases[self.latency_kind]
+        elif (self.timeout is not None and phases["total"] >= self.timeout * 0.95
+              and (self.latency_kind == "total" or self.first_byte_at is None)):
+            # 等待响应（流式请求为首个事件）时超时
+            latency = self.timeout
+        else:
+            latency = None
+        if latency is not None:
+            record_latency(self.provider_name, self.model, self.latency_kind, latency)
+
+
+def parse_usage(data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """从OpenAI兼容响应（或流式块）中提取usage字段
+
+    Returns:
+        包含prompt_tokens/completion_tokens/total_tokens的dict，响应中没有usage时返回None
+    """
+    usage = data.get("usage")
+    if not isinstance(usage, dict):
+        return None
+
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    completion_tokens = usage.get("completion_tokens") or 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": usage.get("total_tokens") or prompt_tokens + completion_tokens,
+    }
+
+
+async def iter_sse_json(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """解析OpenAI兼容的SSE流，逐个产出data事件的JSON对象
+
+    忽略注释行和无法解析的行，遇到[DONE]时结束
+    """
+    async for line in response.aiter_lines():
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+async def iter_as_completed(
+    awaitables: Dict[Hashable, Awaitable],
+    time_left_fn: Optional[Callable[[], Optional[float]]] = None
+) -> AsyncIterator[Tuple[Hashable, Any]]:
+    """按完成顺序逐个产出(key, result)
+
+    与asyncio.as_completed不同，产出结果时附带对应的key；
+    迭代器提前关闭时会取消尚未完成的任务
+
+    Args:
+        awaitables: key -> 待执行的协程
+        time_left_fn: 可选，每次等待前调用，返回还愿意等待的秒数；
+            None表示无限等待，<=0表示立即停止并取消剩余任务
+    """
+    tasks = {asyncio.ensure_future(aw): key for key, aw in awaitables.items()}
+    pending = set(tasks)
+
+    try:
+        while pending:
+            time_left = time_left_fn() if time_left_fn is not None else None
+            if time_left is not None and time_left <= 0:
+                break
+
+            done, pending = await asyncio.wait(
+                pending, timeout=time_left, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+
+            # 同一批完成的任务按提交顺序产出，保证结果稳定
+            for task in sorted(done, key=list(tasks).index):
+                yield tasks[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
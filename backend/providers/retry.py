@@ -0,0 +1,268 @@
+"""
+模型请求的重试策略
+注册表用它包装每个provider的query_model和stream_model（见__init__.py）：
+
+- 错误分类：连接错误、超时以及429/5xx等临时性状态码可以重试；认证失败、请求格式错误等其余错误直接失败
+- 重试：指数退避加全抖动，所有尝试共享一个截止时间；响应带Retry-After时至少等待该时长
+- 对冲（可选）：请求超过该模型的p95延迟仍未返回时，再发送一个相同的请求，采用先成功的结果
+- 流式请求只在产出第一个块之前重试，不做对冲
+"""
+import time
+import random
+import asyncio
+import functools
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Callable, AsyncIterator
+
+import httpx
+
+# 重试参数默认值，可在配置的"retry"段中覆盖
+DEFAULT_RETRY_CONFIG: Dict[str, Any] = {
+    "enabled": True,
+    "max_attempts": 3,
+    "base_delay": 0.5,
+    "max_delay": 8.0,
+    "deadline_seconds": 120.0,
+}
+
+DEFAULT_HEDGE_CONFIG: Dict[str, Any] = {
+    "enabled": False,
+    "percentile": 95,
+    "min_samples": 20,
+}
+
+# 剩余时间不足以完成一次尝试时不再重试
+MIN_ATTEMPT_SECONDS = 1.0
+
+# 可重试的4xx状态码：请求超时、冲突、过早和限流
+_RETRYABLE_CLIENT_STATUS = {408, 409, 425, 429}
+# 不可重试的5xx状态码：未实现、HTTP版本不支持
+_FATAL_SERVER_STATUS = {501, 505}
+
+
+def _get_retry_config() -> Dict[str, Any]:
+    """合并默认值与配置中的retry段"""
+    from ..config import get_retry_config
+
+    retry_config = get_retry_config()
+    return {
+        **DEFAULT_RETRY_CONFIG,
+        **retry_config,
+        "hedge": {**DEFAULT_HEDGE_CONFIG, **retry_config.get("hedge", {})},
+    }
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """判断错误是否可以重试
+
+    Args:
+        error: 模型请求抛出的异常
+
+    Returns:
+        可重试时返回原因（'timeout'、'connection'或'status_<code>'），不可重试时返回None
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status in _RETRYABLE_CLIENT_STATUS or (status >= 500 and status not in _FATAL_SERVER_STATUS):
+            return f"status_{status}"
+        return None
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    return None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """解析响应中的Retry-After头（秒数或HTTP日期），没有时返回None"""
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+
+    value = error.response.headers.get("retry-after")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """第attempt次重试前的等待时间：指数退避加全抖动"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+def _hedge_delay(provider_name: str, model: str, hedge_config: Dict[str, Any]) -> Optional[float]:
+    """发送对冲请求前的等待时间（该模型延迟的p95），未启用或样本不足时返回None"""
+    from ..latency import get_latency_tracker, percentile
+
+    if not hedge_config["enabled"]:
+        return None
+
+    samples = get_latency_tracker().samples(provider_name, model, "total")
+    if len(samples) < hedge_config["min_samples"]:
+        return None
+    return percentile(samples, hedge_config["percentile"])
+
+
+class _RetryState:
+    """一次调用的重试状态：截止时间、已尝试次数"""
+
+    def __init__(self, provider_name: str, model: str, timeout: Optional[float], config: Dict[str, Any]):
+        self.provider_name = provider_name
+        self.model = model
+        self.config = config
+        # 调用方指定的超时同时是所有尝试的截止时间
+        limit = timeout if timeout is not None else config["deadline_seconds"]
+        self.deadline = time.monotonic() + limit if limit is not None else None
+        self.attempts = 0
+
+    def attempt_timeout(self) -> Optional[float]:
+        """本次尝试的超时上限：截止前的剩余时间（调度器再从中扣除排队时间，见scheduler.schedule）"""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def next_delay(self, error: Exception) -> Optional[float]:
+        """记录一次失败，返回重试前的等待时间，不应重试时返回None"""
+        from ..metrics import MODEL_CALL_RETRIES
+
+        self.attempts += 1
+        reason = classify_error(error)
+        if reason is None or self.attempts >= self.config["max_attempts"]:
+            return None
+
+        delay = backoff_delay(self.attempts, self.config["base_delay"], self.config["max_delay"])
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if self.deadline is not None and time.monotonic() + delay + MIN_ATTEMPT_SECONDS > self.deadline:
+            return None
+
+        MODEL_CALL_RETRIES.inc(provider=self.provider_name, model=self.model, reason=reason)
+        print(f"Retrying model {self.model} in {delay:.1f}s ({reason}, attempt {self.attempts + 1})")
+        return delay
+
+
+async def _hedged(call: Callable, delay: float, provider_name: str, model: str) -> Dict[str, Any]:
+    """先发送一个请求，delay秒后仍未返回则再发送一个相同的请求，返回先成功的结果
+
+    两个请求都失败时抛出后失败的那个异常；返回前取消仍在进行的请求
+    """
+    from ..metrics import MODEL_CALL_HEDGES
+
+    primary = asyncio.ensure_future(call())
+    hedge = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = "primary" if task is primary else "hedge"
+                    MODEL_CALL_HEDGES.inc(provider=provider_name, model=model, winner=winner)
+                    return task.result()
+                error = task.exception()
+
+        MODEL_CALL_HEDGES.inc(provider=provider_name, model=model, winner="none")
+        raise error
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+def with_retry(provider_name: str, query_fn: Callable) -> Callable:
+    """为provider的query_model加上重试和对冲
+
+    包装后的函数不再抛出异常：重试用尽或遇到不可重试的错误时打印错误并返回None
+    """
+
+    @functools.wraps(query_fn)
+    async def query_model(
+        model: str,
+        messages,
+        api_url: str,
+        api_key: str,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        config = _get_retry_config()
+        if not config["enabled"]:
+            try:
+                return await query_fn(model, messages, api_url, api_key, timeout=timeout, **kwargs)
+            except Exception as e:
+                print(f"Error querying model {model}: {e}")
+                return None
+
+        state = _RetryState(provider_name, model, timeout, config)
+
+        def call():
+            return query_fn(model, messages, api_url, api_key, timeout=state.attempt_timeout(), **kwargs)
+
+        hedge_after = _hedge_delay(provider_name, model, config["hedge"])
+        while True:
+            try:
+                if hedge_after is not None:
+                    return await _hedged(call, hedge_after, provider_name, model)
+                return await call()
+            except Exception as e:
+                delay = state.next_delay(e)
+                if delay is None:
+                    print(f"Error querying model {model}: {e}")
+                    return None
+            await asyncio.sleep(delay)
+
+    return query_model
+
+
+def with_stream_retry(provider_name: str, stream_fn: Callable) -> Callable:
+    """为provider的stream_model加上重试
+
+    只有在产出第一个块之前失败才会重试；已经开始产出后出错，或重试用尽时，异常照常抛给调用方
+    """
+
+    @functools.wraps(stream_fn)
+    async def stream_model(
+        model: str,
+        messages,
+        api_url: str,
+        api_key: str,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        config = _get_retry_config()
+        if not config["enabled"]:
+            async for chunk in stream_fn(model, messages, api_url, api_key, timeout=timeout, **kwargs):
+                yield chunk
+            return
+
+        state = _RetryState(provider_name, model, timeout, config)
+        while True:
+            started = False
+            try:
+                async for chunk in stream_fn(
+                    model, messages, api_url, api_key, timeout=state.attempt_timeout(), **kwargs
+                ):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else state.next_delay(e)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    return stream_model
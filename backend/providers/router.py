@@ -0,0 +1,265 @@
+"""
+多后端路由与故障转移
+一个席位可以配置多个可互换的后端（provider与模型，例如同一个开源权重模型分别在SiliconFlow和OpenRouter上），
+路由为每次调用选择后端：
+
+- 排序：按预计耗时从小到大，即调度器中的等待（剩余速率额度、并发名额，见scheduler.py）加上该后端近期的延迟中位数
+  （见backend/latency.py），再除以近期的成功率
+- 熔断：连续失败达到failure_threshold次的后端在cooldown_seconds内排到最后，冷却结束后重新参与排序
+- 故障转移：后端失败（重试用尽）后改用排在下一位的后端；流式请求只在产出第一个块之前转移
+
+参数在配置的"router"段中设置
+"""
+import os
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional, AsyncIterator, Deque, Sequence, Tuple
+
+from .base import reasoning_text
+from .retry import MIN_ATTEMPT_SECONDS
+from .scheduler import estimate_wait
+from ..tokens import estimate_message_tokens
+
+# 路由参数默认值，可在配置的"router"段中覆盖
+DEFAULT_ROUTER_CONFIG: Dict[str, Any] = {
+    "error_window": 20,
+    "failure_threshold": 3,
+    "cooldown_seconds": 30.0,
+}
+
+# 成功率的下限，避免一直失败的后端预计耗时变成无穷大
+MIN_SUCCESS_RATE = 0.05
+
+# 后端：(provider名称, 模型)，如backend.config.ModelRef
+Backend = Tuple[str, str]
+
+
+def _get_router_config() -> Dict[str, Any]:
+    """合并默认值与配置中的router段"""
+    from ..config import get_router_config
+
+    return {**DEFAULT_ROUTER_CONFIG, **get_router_config()}
+
+
+class _BackendHealth:
+    """一个后端近期的调用结果与熔断状态"""
+
+    def __init__(self, window: int):
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def is_open(self, now: float) -> bool:
+        """是否处于熔断冷却期"""
+        return self.open_until > now
+
+    def record(self, ok: bool, config: Dict[str, Any]) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= config["failure_threshold"]:
+            self.open_until = time.monotonic() + config["cooldown_seconds"]
+
+
+# (provider名称, 模型) -> _BackendHealth
+_health: Dict[Backend, _BackendHealth] = {}
+
+
+def _get_health(backend: Backend, config: Dict[str, Any]) -> _BackendHealth:
+    key = (backend[0], backend[1])
+    health = _health.get(key)
+    if health is None:
+        health = _health[key] = _BackendHealth(config["error_window"])
+    return health
+
+
+def _typical_seconds(provider_name: str, model: str) -> Optional[float]:
+    """该后端近期请求耗时的中位数，没有样本时返回None"""
+    from ..latency import get_latency_tracker, percentile
+
+    samples = get_latency_tracker().samples(provider_name, model, "total")
+    return percentile(samples, 50) if samples else None
+
+
+def rank_backends(backends: Sequence[Backend], prompt_tokens: int) -> List[Backend]:
+    """按预计耗时给后端排序，熔断中的后端排在最后，预计耗时相同时保持配置顺序
+
+    Args:
+        backends: 可互换的后端
+        prompt_tokens: 估算的prompt token数，用于估算速率额度的等待
+
+    Returns:
+        排序后的后端列表
+    """
+    if len(backends) <= 1:
+        return list(backends)
+
+    config = _get_router_config()
+    now = time.monotonic()
+    typical = {backend: _typical_seconds(*backend) for backend in backends}
+    known = [seconds for seconds in typical.values() if seconds is not None]
+    # 没有延迟样本的后端按已知最快的后端估计，这样它也会被选中并积累样本
+    unknown_seconds = min(known) if known else 0.0
+
+    def expected_seconds(backend: Backend) -> Tuple[bool, float]:
+        provider_name, model = backend
+        call_seconds = typical[backend] if typical[backend] is not None else unknown_seconds
+        wait = estimate_wait(provider_name, model, prompt_tokens, call_seconds)
+        health = _get_health(backend, config)
+        success_rate = max(1.0 - health.error_rate(), MIN_SUCCESS_RATE)
+        return health.is_open(now), (wait + call_seconds) / success_rate
+
+    return sorted(backends, key=expected_seconds)
+
+
+def _record(backend: Backend, ok: bool) -> None:
+    config = _get_router_config()
+    _get_health(backend, config).record(ok, config)
+
+
+def _record_failover(failed: Backend, next_backend: Backend) -> None:
+    from ..metrics import MODEL_CALL_FAILOVERS
+
+    MODEL_CALL_FAILOVERS.inc(provider=failed[0], model=failed[1])
+    print(f"Model {failed[1]} on {failed[0]} failed, failing over to {next_backend[1]} on {next_backend[0]}")
+
+
+def _backend_call(provider_name: str) -> Tuple[Dict[str, Any], str, Optional[str]]:
+    """provider注册的函数集合、api_url和api_key"""
+    from . import get_provider
+    from ..config import get_provider_config
+
+    provider_config = get_provider_config(provider_name)
+    return get_provider(provider_name), provider_config["api_url"], os.getenv(provider_config["api_key_env"])
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def route_query(
+    backends: Sequence[Backend],
+    messages: List[Dict[str, str]],
+    timeout: Optional[float] = None,
+    **kwargs
+) -> Optional[Dict[str, Any]]:
+    """按路由顺序查询后端，失败时转移到下一个后端
+
+    Args:
+        backends: 可互换的后端
+        messages: 要发送的消息
+        timeout: 可选，所有后端共享的超时上限
+        **kwargs: 传给provider的query_model的其他参数
+
+    Returns:
+        响应dict，附带实际提供服务的'provider'和'model'；所有后端都失败时返回None
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    ranked = rank_backends(backends, estimate_message_tokens(messages))
+
+    for index, backend in enumerate(ranked):
+        provider_name, model = backend
+        provider, api_url, api_key = _backend_call(provider_name)
+        response = await provider["query_model"](
+            model=model,
+            messages=messages,
+            api_url=api_url,
+            api_key=api_key,
+            timeout=_remaining(deadline),
+            **kwargs
+        )
+        _record(backend, response is not None)
+        if response is not None:
+            return dict(response, provider=provider_name, model=model)
+
+        if index + 1 == len(ranked):
+            break
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining < MIN_ATTEMPT_SECONDS:
+            break
+        _record_failover(backend, ranked[index + 1])
+
+    return None
+
+
+async def route_stream(
+    backends: Sequence[Backend],
+    messages: List[Dict[str, str]],
+    timeout: Optional[float] = None,
+    **kwargs
+) -> AsyncIterator[Dict[str, Any]]:
+    """按路由顺序流式查询后端，在产出第一个块之前失败时转移到下一个后端
+
+    provider没有注册stream_model时退回普通查询，整个回答作为一个块产出
+
+    Args:
+        backends: 可互换的后端
+        messages: 要发送的消息
+        timeout: 可选，所有后端共享的超时上限
+        **kwargs: 传给provider的stream_model的其他参数
+
+    Yields:
+        provider产出的块，附带实际提供服务的'provider'和'model'；
+        已经开始产出后出错，或所有后端都失败时，抛出最后一个异常
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    ranked = rank_backends(backends, estimate_message_tokens(messages))
+
+    for index, backend in enumerate(ranked):
+        provider_name, model = backend
+        provider, api_url, api_key = _backend_call(provider_name)
+        call_args = dict(model=model, messages=messages, api_url=api_url, api_key=api_key, timeout=_remaining(deadline))
+        started = False
+        try:
+            if provider["stream_model"] is None:
+                response = await provider["query_model"](**call_args, **kwargs)
+                if response is None:
+                    raise RuntimeError(f"no response from {provider_name}")
+                started = True
+                yield dict(
+                    response,
+                    reasoning_details=reasoning_text(response.get('reasoning_details')),
+                    provider=provider_name,
+                    model=model
+                )
+            else:
+                async for chunk in provider["stream_model"](**call_args, **kwargs):
+                    started = True
+                    yield dict(chunk, provider=provider_name, model=model)
+        except Exception:
+            _record(backend, False)
+            remaining = _remaining(deadline)
+            if started or index + 1 == len(ranked) or (remaining is not None and remaining < MIN_ATTEMPT_SECONDS):
+                raise
+            _record_failover(backend, ranked[index + 1])
+            continue
+
+        _record(backend, True)
+        return
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """
+    各后端的路由状态
+
+    Returns:
+        provider -> {模型 -> {error_rate, consecutive_failures, open_seconds, typical_seconds}}
+    """
+    now = time.monotonic()
+    stats: Dict[str, Any] = {}
+    for (provider_name, model), health in _health.items():
+        typical = _typical_seconds(provider_name, model)
+        stats.setdefault(provider_name, {})[model] = {
+            "error_rate": round(health.error_rate(), 3),
+            "consecutive_failures": health.consecutive_failures,
+            "open_seconds": round(max(health.open_until - now, 0.0), 3),
+            "typical_seconds": round(typical, 3) if typical is not None else None,
+        }
+    return stats
@@ -0,0 +1,409 @@
+"""
+模型请求调度器
+位于council与provider函数之间，注册表把它包装在重试层之下，每次尝试都要经过调度：
+
+- 并发限制：按provider和按模型的并发上限
+- 速率限制：按provider和按模型的令牌桶，分别限制每分钟请求数（rpm）和每分钟token数（tpm）；
+  发送前按估算的prompt token预扣，完成后按服务端报告的用量（没有时按估算）补扣
+- Retry-After：收到带Retry-After头的429/503响应后，该模型的所有请求暂停到指定时间
+- 公平排队：等待并发名额和速率额度的请求按对话轮流放行，一个对话的大量请求不会饿死其他对话
+- 截止时间：调用方传入timeout时，排队不超过该时长，来不及放行时抛出AdmissionTimeout，重试层将其视为超时；
+  放行后请求只能使用剩余的时间，排队时间计入本次尝试的超时
+
+限制在各provider配置的"limits"段中设置，未设置的限制不生效
+"""
+import time
+import asyncio
+import functools
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable, AsyncIterator, Deque, Hashable, Tuple
+
+import httpx
+
+from .retry import retry_after_seconds
+from ..tokens import estimate_tokens, estimate_message_tokens
+
+# 当前请求所属的对话，由创建任务时的上下文继承
+_fair_share_key: ContextVar[Optional[str]] = ContextVar("scheduler_fair_share_key", default=None)
+
+# 触发暂停的状态码（需同时带Retry-After头）
+_PAUSE_STATUS = {429, 503}
+
+
+class AdmissionTimeout(httpx.TimeoutException):
+    """在调用方的超时内没有等到并发名额或速率额度"""
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+def set_fair_share_key(key: Optional[str]) -> None:
+    """设置当前请求上下文的公平排队键（通常为对话ID）"""
+    _fair_share_key.set(key)
+
+
+def _get_limits_config(provider_name: str) -> Dict[str, Any]:
+    """读取provider配置中的limits段"""
+    from ..config import get_config
+
+    provider_config = get_config().get("providers", {}).get(provider_name, {})
+    return provider_config.get("limits", {})
+
+
+class FairLimiter:
+    """容量有限的公平信号量
+
+    名额不足时，等待者按键（对话）分组排队，释放的名额在各键之间轮流分配
+
+    Args:
+        capacity: 同时持有的名额上限
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        # 键 -> 等待中的future，按轮转顺序排列
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        """排队中的请求数"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        """获取一个名额，名额不足时按key公平排队
+
+        Args:
+            key: 公平排队的键
+            timeout: 可选，最多等待的秒数
+
+        Returns:
+            是否获得了名额（只有超时才会返回False）
+        """
+        if self.active < self.capacity and not self._queues:
+            self.active += 1
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(future)
+        try:
+            done, _ = await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 名额已经转交过来，放弃时交给下一个等待者
+                self.release()
+            else:
+                self._discard(key, future)
+            raise
+        if not done:
+            self._discard(key, future)
+            return False
+        return True
+
+    def release(self) -> None:
+        """释放一个名额，直接转交给下一个键的第一个等待者"""
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, key: Hashable, future: asyncio.Future) -> None:
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[key]
+
+
+class TokenBucket:
+    """按分钟补充的令牌桶，容量为一分钟的额度
+
+    consume可以把余额扣成负数（实际用量超过预扣时），之后的请求等待补足
+
+    Args:
+        per_minute: 每分钟补充的令牌数
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """还需等待多少秒才有amount个令牌（amount超过容量时按容量计）"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0.0) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """扣除令牌"""
+        self._refill(time.monotonic())
+        self.tokens -= amount
+
+
+class _Scope:
+    """一个provider或一个模型的限制与当前状态"""
+
+    def __init__(self, limits: Dict[str, Any]):
+        max_concurrency = limits.get("max_concurrency")
+        self.slots = FairLimiter(max_concurrency) if max_concurrency else None
+        self.rpm = TokenBucket(limits["rpm"]) if limits.get("rpm") else None
+        self.tpm = TokenBucket(limits["tpm"]) if limits.get("tpm") else None
+        # 同一时间只有一个请求在等速率额度，等待者按对话轮流
+        self.gate = FairLimiter(1)
+        self.paused_until = 0.0
+
+    def wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        wait = self.paused_until - now
+        if self.rpm is not None:
+            wait = max(wait, self.rpm.wait_time(1, now))
+        if self.tpm is not None:
+            wait = max(wait, self.tpm.wait_time(tokens, now))
+        return wait
+
+    def consume(self, tokens: int) -> None:
+        if self.rpm is not None:
+            self.rpm.consume(1)
+        if self.tpm is not None:
+            self.tpm.consume(tokens)
+
+    async def admit(self, key: Hashable, tokens: int, deadline: Optional[float] = None) -> bool:
+        """等到暂停结束且速率额度足够，然后扣除本次请求的额度
+
+        Returns:
+            是否放行；deadline（time.monotonic()时间）之前等不到额度时立即返回False，不扣除额度
+        """
+        if self.rpm is None and self.tpm is None and self.paused_until <= time.monotonic():
+            return True
+
+        if not await self.gate.acquire(key, _remaining(deadline)):
+            return False
+        try:
+            while True:
+                wait = self.wait_time(tokens)
+                if wait <= 0:
+                    break
+                remaining = _remaining(deadline)
+                if remaining is not None and wait > remaining:
+                    return False
+                await asyncio.sleep(wait)
+            self.consume(tokens)
+            return True
+        finally:
+            self.gate.release()
+
+
+# provider名称 -> _Scope，(provider名称, 模型) -> _Scope
+_scopes: Dict[Hashable, _Scope] = {}
+
+
+def _get_scopes(provider_name: str, model: str) -> Tuple[_Scope, _Scope]:
+    """获取provider和模型的调度状态，首次使用时按配置创建"""
+    provider_scope = _scopes.get(provider_name)
+    if provider_scope is None:
+        provider_scope = _scopes[provider_name] = _Scope(_get_limits_config(provider_name))
+
+    model_scope = _scopes.get((provider_name, model))
+    if model_scope is None:
+        model_limits = _get_limits_config(provider_name).get("models", {}).get(model, {})
+        model_scope = _scopes[(provider_name, model)] = _Scope(model_limits)
+
+    return provider_scope, model_scope
+
+
+class _Ticket:
+    """一次被放行的请求，完成后按实际用量补扣tpm"""
+
+    def __init__(self, scopes: Tuple[_Scope, ...], reserved: int, deadline: Optional[float] = None):
+        self.scopes = scopes
+        self.reserved = reserved
+        self.deadline = deadline
+
+    def remaining(self) -> Optional[float]:
+        """调用方的超时扣除排队时间后剩余的秒数，没有超时时为None"""
+        return _remaining(self.deadline)
+
+    def settle(self, used_tokens: int) -> None:
+        extra = used_tokens - self.reserved
+        for scope in self.scopes:
+            if scope.tpm is not None:
+                scope.tpm.consume(extra)
+
+
+@asynccontextmanager
+async def schedule(
+    provider_name: str,
+    model: str,
+    prompt_tokens: int,
+    timeout: Optional[float] = None
+) -> AsyncIterator[_Ticket]:
+    """等待并发名额和速率额度，持有名额直到退出
+
+    Args:
+        provider_name: Provider名称
+        model: 模型标识
+        prompt_tokens: 估算的prompt token数，用于预扣tpm
+        timeout: 可选，排队最多等待的秒数，超过时抛出AdmissionTimeout
+    """
+    from ..metrics import SCHEDULER_WAIT_SECONDS
+
+    key = _fair_share_key.get()
+    provider_scope, model_scope = _get_scopes(provider_name, model)
+    started_at = time.monotonic()
+    deadline = started_at + timeout if timeout is not None else None
+
+    def expired() -> AdmissionTimeout:
+        return AdmissionTimeout(f"No scheduler admission for {model} on {provider_name} within {timeout:.1f}s")
+
+    # 先模型后provider，所有请求按同样的顺序获取，不会互相死锁
+    held = []
+    try:
+        for scope in (model_scope, provider_scope):
+            if scope.slots is not None:
+                if not await scope.slots.acquire(key, _remaining(deadline)):
+                    raise expired()
+                held.append(scope.slots)
+        for scope in (model_scope, provider_scope):
+            if not await scope.admit(key, prompt_tokens, deadline):
+                raise expired()
+        if deadline is not None and _remaining(deadline) <= 0:
+            raise expired()
+
+        SCHEDULER_WAIT_SECONDS.observe(time.monotonic() - started_at, provider=provider_name, model=model)
+        yield _Ticket((model_scope, provider_scope), prompt_tokens, deadline)
+    finally:
+        for slots in reversed(held):
+            slots.release()
+
+
+def _pause_on_retry_after(provider_name: str, model: str, error: Exception) -> None:
+    """429/503响应带Retry-After时，暂停该模型的所有请求"""
+    if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code not in _PAUSE_STATUS:
+        return
+
+    retry_after = retry_after_seconds(error)
+    if retry_after:
+        _, model_scope = _get_scopes(provider_name, model)
+        model_scope.paused_until = max(model_scope.paused_until, time.monotonic() + retry_after)
+
+
+def _used_tokens(prompt_tokens: int, usage: Optional[Dict[str, Any]], content: str) -> int:
+    """本次请求实际消耗的token：优先用服务端报告的用量"""
+    if usage and usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return prompt_tokens + estimate_tokens(content)
+
+
+def with_scheduler(provider_name: str, query_fn: Callable) -> Callable:
+    """为provider的query_model加上调度"""
+
+    @functools.wraps(query_fn)
+    async def query_model(model: str, messages, api_url: str, api_key: str, **kwargs) -> Dict[str, Any]:
+        prompt_tokens = estimate_message_tokens(messages)
+        async with schedule(provider_name, model, prompt_tokens, kwargs.get("timeout")) as ticket:
+            if ticket.deadline is not None:
+                kwargs["timeout"] = ticket.remaining()
+            try:
+                response = await query_fn(model, messages, api_url, api_key, **kwargs)
+            except Exception as e:
+                _pause_on_retry_after(provider_name, model, e)
+                raise
+            ticket.settle(_used_tokens(prompt_tokens, response.get('usage'), response.get('content') or ""))
+            return response
+
+    return query_model
+
+
+def with_stream_scheduler(provider_name: str, stream_fn: Callable) -> Callable:
+    """为provider的stream_model加上调度，名额持有到流结束"""
+
+    @functools.wraps(stream_fn)
+    async def stream_model(model: str, messages, api_url: str, api_key: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        prompt_tokens = estimate_message_tokens(messages)
+        async with schedule(provider_name, model, prompt_tokens, kwargs.get("timeout")) as ticket:
+            if ticket.deadline is not None:
+                kwargs["timeout"] = ticket.remaining()
+            content_parts = []
+            usage = None
+            try:
+                async for chunk in stream_fn(model, messages, api_url, api_key, **kwargs):
+                    if chunk.get('content'):
+                        content_parts.append(chunk['content'])
+                    if chunk.get('usage'):
+                        usage = chunk['usage']
+                    yield chunk
+            except Exception as e:
+                _pause_on_retry_after(provider_name, model, e)
+                raise
+            finally:
+                ticket.settle(_used_tokens(prompt_tokens, usage, "".join(content_parts)))
+
+    return stream_model
+
+
+def estimate_wait(provider_name: str, model: str, prompt_tokens: int, call_seconds: float) -> float:
+    """估算现在提交一个请求要在调度器中等待多久，供路由比较各后端剩余的额度
+
+    Args:
+        provider_name: Provider名称
+        model: 模型标识
+        prompt_tokens: 估算的prompt token数
+        call_seconds: 该模型一次请求的典型耗时，用于估算排队等待并发名额的时间
+
+    Returns:
+        等待秒数：暂停和速率额度的等待，加上并发名额已满时排在前面的请求所需的时间
+    """
+    wait = 0.0
+    for scope in _get_scopes(provider_name, model):
+        wait = max(wait, scope.wait_time(prompt_tokens))
+        slots = scope.slots
+        if slots is not None and slots.active >= slots.capacity:
+            wait = max(wait, call_seconds * (slots.waiting + 1) / slots.capacity)
+    return wait
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """
+    调度器当前状态
+
+    Returns:
+        provider -> {active, waiting, models: {模型 -> {active, waiting, paused_seconds}}}，
+        未设置并发上限时active和waiting为None
+    """
+    now = time.monotonic()
+
+    def describe(scope: _Scope) -> Dict[str, Any]:
+        return {
+            "active": scope.slots.active if scope.slots is not None else None,
+            "waiting": scope.slots.waiting if scope.slots is not None else None,
+            "paused_seconds": round(max(scope.paused_until - now, 0.0), 3),
+        }
+
+    stats: Dict[str, Any] = {}
+    for key, scope in _scopes.items():
+        if isinstance(key, tuple):
+            provider_name, model = key
+            stats.setdefault(provider_name, {"models": {}})["models"][model] = describe(scope)
+        else:
+            stats.setdefault(key, {"models": {}}).update(describe(scope))
+    return stats
@@ -2,26 +2,26 @@
 SiliconFlow Provider实现
 支持推理模型的特殊参数
 """
-import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 
+from .base import get_http_client, iter_sse_json, parse_usage, RequestTimer
 
-async def query_model(
-    model: str,
-    messages: List[Dict[str, str]],
-    api_url: str,
-    api_key: str,
-    timeout: float = 120.0,
-    enable_thinking: Optional[bool] = None,
-    thinking_budget: Optional[int] = None,
-    **kwargs
-) -> Optional[Dict[str, Any]]:
-    """查询单个模型，支持SiliconFlow特有参数"""
-    headers = {
+
+def _build_headers(api_key: str) -> Dict[str, str]:
+    """构造请求头"""
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
 
+
+def _build_payload(
+    model: str,
+    messages: List[Dict[str, str]],
+    enable_thinking: Optional[bool],
+    thinking_budget: Optional[int]
+) -> Dict[str, Any]:
+    """构造请求体，附加SiliconFlow特有参数"""
     payload = {
         "model": model,
         "messages": messages,
@@ -33,23 +33,120 @@ async def query_model(
     if thinking_budget is not None:
         payload["thinking_budget"] = thinking_budget
 
+    return payload
+
+
+async def query_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    api_url: str,
+    api_key: str,
+    timeout: Optional[float] = None,
+    enable_thinking: Optional[bool] = None,
+    thinking_budget: Optional[int] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """查询单个模型，支持SiliconFlow特有参数
+
+    出错时直接抛出异常，由注册表的重试层（见retry.py）判断是否重试
+    """
+    headers = _build_headers(api_key)
+    payload = _build_payload(model, messages, enable_thinking, thinking_budget)
+
+    timer = RequestTimer("siliconflow", model)
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(api_url, headers=headers, json=payload)
+        # 复用provider共享连接池，避免每次请求重新握手
+        client = get_http_client("siliconflow")
+        response = await client.post(
+            api_url,
+            headers=headers,
+            json=payload,
+            timeout=timer.request_timeout(timeout),
+            extensions={"trace": timer.trace}
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        message = data['choices'][0]['message']
+
+        # SiliconFlow使用reasoning_content字段
+        result = {
+            'content': message.get('content'),
+            'reasoning_details': message.get('reasoning_content'),
+            'usage': parse_usage(data)
+        }
+        timer.finish()
+        return result
+
+    except Exception:
+        timer.finish(error=True)
+        raise
+    finally:
+        # 被取消时（例如对冲中落败的请求）上面两处都不会执行
+        timer.finish(cancelled=True)
+
+
+async def stream_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    api_url: str,
+    api_key: str,
+    timeout: Optional[float] = None,
+    enable_thinking: Optional[bool] = None,
+    thinking_budget: Optional[int] = None,
+    **kwargs
+) -> AsyncIterator[Dict[str, Any]]:
+    """流式查询单个模型，逐块产出content/reasoning_details增量
+
+    服务端返回usage时额外产出{'usage': ...}块
+
+    出错时直接抛出异常，由调用方决定如何处理
+    """
+    headers = _build_headers(api_key)
+    payload = _build_payload(model, messages, enable_thinking, thinking_budget)
+    payload["stream"] = True
+
+    timer = RequestTimer("siliconflow", model)
+    client = get_http_client("siliconflow")
+    try:
+        async with client.stream(
+            "POST",
+            api_url,
+            headers=headers,
+            json=payload,
+            timeout=timer.request_timeout(timeout, stream=True),
+            extensions={"trace": timer.trace}
+        ) as response:
             response.raise_for_status()
 
-            data = response.json()
-            message = data['choices'][0]['message']
+            async for chunk in iter_sse_json(response):
+                timer.mark_first_byte()
 
-            # SiliconFlow使用reasoning_content字段
-            return {
-                'content': message.get('content'),
-                'reasoning_details': message.get('reasoning_content')
-            }
+                # usage通常出现在最后一个（choices为空的）块中
+                usage = parse_usage(chunk)
+                if usage is not None:
+                    yield {'content': None, 'reasoning_details': None, 'usage': usage}
 
-    except Exception as e:
-        print(f"Error querying model {model}: {e}")
-        return None
+                choices = chunk.get('choices') or []
+                if not choices:
+                    continue
+
+                # SiliconFlow使用reasoning_content字段
+                delta = choices[0].get('delta') or {}
+                content = delta.get('content')
+                reasoning = delta.get('reasoning_content')
+                if content or reasoning:
+                    yield {
+                        'content': content,
+                        'reasoning_details': reasoning
+                    }
+        timer.finish()
+    except Exception:
+        timer.finish(error=True)
+        raise
+    finally:
+        # 被取消（CancelledError）或调用方提前关闭流（GeneratorExit）时上面两处都不会执行
+        timer.finish(cancelled=True)
 
 
 async def query_models_parallel(
@@ -61,8 +158,11 @@ async def query_models_parallel(
     thinking_budget: Optional[int] = None,
     **kwargs
 ) -> Dict[str, Optional[Dict[str, Any]]]:
-    """并行查询多个模型"""
+    """并行查询多个模型，经过注册表中带重试和缓存的query_model，失败的模型结果为None"""
     import asyncio
+    from . import get_provider
+
+    query_model = get_provider("siliconflow")["query_model"]
 
     tasks = [
         query_model(
@@ -86,5 +186,6 @@ def register() -> None:
         name="siliconflow",
         query_fn=query_model,
         query_parallel_fn=query_models_parallel,
-        supports_reasoning=True
+        supports_reasoning=True,
+        stream_fn=stream_model
     )
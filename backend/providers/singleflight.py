@@ -0,0 +1,194 @@
+"""
+相同请求的合并（single-flight）
+注册表把它包装在响应缓存之下、重试之上：多个用户同时问同一个问题，或客户端重发SSE请求时，
+（provider、模型、规范化后的消息、采样参数）相同的并发请求只向上游发送一次，所有调用方共享结果
+
+- 普通请求：后到的调用方等待进行中的请求，得到结果的副本，标记'coalesced': True
+- 流式请求：上游流的每个块都会缓冲下来，后到的调用方先重放已收到的块，再跟随后续的块；
+  其产出的块同样标记'coalesced': True
+- 只有所有调用方都放弃（取消）后，上游请求才会被取消；已取消但尚未结束的请求不再接受新的调用方
+
+键与响应缓存相同（见backend/cache.py的make_cache_key），可以通过cache.coalesce: false关闭
+"""
+import asyncio
+import functools
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator
+
+from ..cache import make_cache_key
+
+# 键 -> 进行中的请求
+_query_flights: Dict[str, "_QueryFlight"] = {}
+_stream_flights: Dict[str, "_StreamFlight"] = {}
+
+
+def _is_enabled() -> bool:
+    from ..config import get_cache_config
+
+    return get_cache_config().get("coalesce", True)
+
+
+def _forget(flights: Dict[str, Any], key: str, flight: Any) -> None:
+    """请求结束后移除登记（只移除同一个请求）"""
+    if flights.get(key) is flight:
+        del flights[key]
+
+
+def _record_coalesced(provider_name: str, model: str, kind: str) -> None:
+    from ..metrics import COALESCED_CALLS
+
+    COALESCED_CALLS.inc(provider=provider_name, model=model, kind=kind)
+
+
+class _QueryFlight:
+    """一次进行中的普通请求及等待它的调用方数"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        # task.cancelled()要等任务真正结束才为True，取消后到结束前的新调用方靠这个标记另起请求
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.task.cancel()
+
+    async def wait(self) -> Optional[Dict[str, Any]]:
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if not self.task.done() and self.waiters == 1:
+                # 最后一个调用方放弃，上游请求不再有人需要
+                self.cancel()
+            raise
+        finally:
+            self.waiters -= 1
+
+
+class _StreamFlight:
+    """一次进行中的流式请求：后台任务读取上游流并缓冲所有块，供各调用方重放和跟随"""
+
+    def __init__(self, stream: AsyncIterator[Dict[str, Any]]):
+        self.chunks: List[Dict[str, Any]] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.subscribers = 0
+        # 同_QueryFlight.cancelled
+        self.cancelled = False
+        self._changed = asyncio.Condition()
+        self.task = asyncio.ensure_future(self._pump(stream))
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.task.cancel()
+
+    async def _pump(self, stream: AsyncIterator[Dict[str, Any]]) -> None:
+        try:
+            async for chunk in stream:
+                async with self._changed:
+                    self.chunks.append(chunk)
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            # 流被截断：跟随者按失败处理，不能当作正常结束
+            self.error = RuntimeError("coalesced stream was cancelled")
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def follow(self, coalesced: bool) -> AsyncIterator[Dict[str, Any]]:
+        """从头产出缓冲的块，再跟随新块直到上游流结束；上游出错时抛出同样的异常"""
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    while position >= len(self.chunks) and not self.done:
+                        await self._changed.wait()
+                    pending = self.chunks[position:]
+                    finished = self.done
+                position += len(pending)
+                for chunk in pending:
+                    yield dict(chunk, coalesced=True) if coalesced else chunk
+                if finished and position >= len(self.chunks):
+                    break
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.task.done():
+                self.cancel()
+
+
+def with_singleflight(provider_name: str, query_fn: Callable) -> Callable:
+    """为provider的query_model加上相同请求合并"""
+
+    @functools.wraps(query_fn)
+    async def query_model(
+        model: str,
+        messages: List[Dict[str, str]],
+        api_url: str,
+        api_key: str,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        if not _is_enabled():
+            return await query_fn(model, messages, api_url, api_key, **kwargs)
+
+        key = make_cache_key(provider_name, model, messages, kwargs)
+        flight = _query_flights.get(key)
+        if flight is not None and not flight.cancelled:
+            _record_coalesced(provider_name, model, "query")
+            result = await flight.wait()
+            return dict(result, coalesced=True) if result is not None else None
+
+        flight = _QueryFlight(asyncio.ensure_future(query_fn(model, messages, api_url, api_key, **kwargs)))
+        _query_flights[key] = flight
+        flight.task.add_done_callback(lambda _: _forget(_query_flights, key, flight))
+        return await flight.wait()
+
+    return query_model
+
+
+def with_stream_singleflight(provider_name: str, stream_fn: Callable) -> Callable:
+    """为provider的stream_model加上相同请求合并"""
+
+    @functools.wraps(stream_fn)
+    async def stream_model(
+        model: str,
+        messages: List[Dict[str, str]],
+        api_url: str,
+        api_key: str,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if not _is_enabled():
+            async for chunk in stream_fn(model, messages, api_url, api_key, **kwargs):
+                yield chunk
+            return
+
+        key = make_cache_key(provider_name, model, messages, kwargs)
+        flight = _stream_flights.get(key)
+        coalesced = flight is not None and not flight.cancelled
+        if coalesced:
+            _record_coalesced(provider_name, model, "stream")
+        else:
+            flight = _StreamFlight(stream_fn(model, messages, api_url, api_key, **kwargs))
+            _stream_flights[key] = flight
+            flight.task.add_done_callback(lambda _: _forget(_stream_flights, key, flight))
+
+        async for chunk in flight.follow(coalesced):
+            yield chunk
+
+    return stream_model
+
+
+def get_singleflight_stats() -> Dict[str, int]:
+    """
+    进行中的请求数
+
+    Returns:
+        包含进行中的普通请求数'queries'和流式请求数'streams'的dict
+    """
+    return {"queries": len(_query_flights), "streams": len(_stream_flights)}
@@ -0,0 +1,282 @@
+"""Semantic cache for full council results.
+
+Paraphrased questions miss the exact-match response cache. This cache embeds
+the user query locally, finds the most similar previously answered query in a
+vector index, and returns its stored stage1/stage2/stage3 bundle when the
+cosine similarity is above a threshold.
+
+Everything runs offline: the default embedding is a feature-hashed bag of
+words and character n-grams, and any other embedding function can be plugged
+in with set_embedding_function.
+
+The default embedding is lexical: it cannot tell that one changed word flips
+the meaning of a question ("sum of even numbers" vs "sum of odd numbers" still
+scores about 0.98). With it, a hit additionally requires the same word
+sequence, so only case, punctuation and whitespace variants are served.
+Paraphrase matching needs a real semantic embedding function.
+"""
+
+import re
+import math
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Callable, Sequence
+
+from .config import get_semantic_cache_config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure Python
+    np = None
+
+
+EmbeddingFn = Callable[[str], Sequence[float]]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize_text(text: str) -> str:
+    """Lowercase text and reduce it to its words separated by single spaces."""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def hashing_embedding(text: str, dim: int = 512) -> List[float]:
+    """
+    Embed text with feature hashing over words and character n-grams.
+
+    Character bigrams and trigrams keep the embedding useful for languages
+    written without spaces (e.g. Chinese) and for small spelling differences.
+
+    Args:
+        text: Text to embed
+        dim: Embedding dimension
+
+    Returns:
+        L2-normalized vector of length dim
+    """
+    vector = [0.0] * dim
+    normalized = _normalize_text(text)
+
+    features = normalized.split()
+    padded = f" {normalized} "
+    for n in (2, 3):
+        features += [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+    for feature in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if digest & 1 else -1.0
+        vector[(digest >> 1) % dim] += sign
+
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return vector
+    return [value / norm for value in vector]
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    """L2-normalize a vector so dot products are cosine similarities."""
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return list(vector)
+    return [value / norm for value in vector]
+
+
+class BruteForceIndex:
+    """Exact nearest-neighbour search over all stored vectors.
+
+    Uses a NumPy matrix when NumPy is installed, plain Python otherwise.
+    """
+
+    def __init__(self, dim: int, max_entries: int):
+        self.dim = dim
+        self._vectors: Dict[int, List[float]] = {}
+        self._matrix = None
+        self._keys: List[int] = []
+
+    def add(self, key: int, vector: List[float]) -> None:
+        self._vectors[key] = vector
+        self._matrix = None
+
+    def remove(self, key: int) -> None:
+        self._vectors.pop(key, None)
+        self._matrix = None
+
+    def search(self, vector: List[float]) -> Optional[Tuple[int, float]]:
+        if not self._vectors:
+            return None
+
+        if np is None:
+            return max(
+                ((key, sum(a * b for a, b in zip(vector, stored))) for key, stored in self._vectors.items()),
+                key=lambda item: item[1]
+            )
+
+        if self._matrix is None:
+            # Rebuild the matrix lazily after inserts/evictions
+            self._keys = list(self._vectors)
+            self._matrix = np.array([self._vectors[key] for key in self._keys], dtype=np.float32)
+
+        scores = self._matrix @ np.asarray(vector, dtype=np.float32)
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
+
+
+class HNSWIndex:
+    """Approximate nearest-neighbour search for large corpora (requires hnswlib)."""
+
+    def __init__(self, dim: int, max_entries: int):
+        try:
+            import hnswlib
+        except ImportError:
+            raise ValueError("Semantic cache index 'hnsw' requires the 'hnswlib' package")
+
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=max_entries, allow_replace_deleted=True)
+        self._size = 0
+
+    def add(self, key: int, vector: List[float]) -> None:
+        self._index.add_items([vector], [key], replace_deleted=True)
+        self._size += 1
+
+    def remove(self, key: int) -> None:
+        self._index.mark_deleted(key)
+        self._size -= 1
+
+    def search(self, vector: List[float]) -> Optional[Tuple[int, float]]:
+        if self._size == 0:
+            return None
+        labels, distances = self._index.knn_query([vector], k=1)
+        # Cosine distance is 1 - similarity
+        return int(labels[0][0]), 1.0 - float(distances[0][0])
+
+
+_INDEXES = {
+    "bruteforce": BruteForceIndex,
+    "hnsw": HNSWIndex,
+}
+
+
+class SemanticCache:
+    """Similarity-thresholded cache of full council result bundles.
+
+    Args:
+        embedding_fn: Embedding function; None uses hashing_embedding
+        threshold: Minimum cosine similarity for a hit
+        max_entries: Entries kept before the least recently used is evicted
+        index: Vector index name ("bruteforce" or "hnsw")
+        dim: Embedding dimension
+        exact_words: Also require the matched query to have the same words as
+            the new one; defaults to True for the lexical default embedding
+    """
+
+    def __init__(
+        self,
+        embedding_fn: Optional[EmbeddingFn] = None,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        index: str = "bruteforce",
+        dim: int = 512,
+        exact_words: Optional[bool] = None
+    ):
+        if index not in _INDEXES:
+            raise ValueError(f"Unknown semantic cache index '{index}'")
+
+        self.embedding_fn = embedding_fn or (lambda text: hashing_embedding(text, dim))
+        self.exact_words = embedding_fn is None if exact_words is None else exact_words
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._index = _INDEXES[index](dim, max_entries)
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_key = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def lookup(self, user_query: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a stored bundle for a semantically similar query.
+
+        Args:
+            user_query: The user's question
+
+        Returns:
+            Dict with 'bundle', 'similarity' and 'matched_query', or None
+        """
+        match = self._index.search(_normalize(self.embedding_fn(user_query)))
+        if match is None or match[1] < self.threshold:
+            self.stats["misses"] += 1
+            return None
+
+        key, similarity = match
+        entry = self._entries[key]
+        if self.exact_words and entry["words"] != _normalize_text(user_query):
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return {
+            "bundle": entry["bundle"],
+            "similarity": round(similarity, 4),
+            "matched_query": entry["query"]
+        }
+
+    def store(self, user_query: str, bundle: Tuple[List, List, Dict, Dict]) -> None:
+        """
+        Store a full council result for a query.
+
+        Args:
+            user_query: The user's question
+            bundle: (stage1_results, stage2_results, stage3_result, metadata)
+        """
+        vector = _normalize(self.embedding_fn(user_query))
+
+        # Evict before adding: the HNSW index is sized to max_entries and has
+        # no room for one more vector
+        while self._entries and len(self._entries) >= self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._index.remove(evicted)
+
+        key = self._next_key
+        self._next_key += 1
+
+        self._index.add(key, vector)
+        self._entries[key] = {"query": user_query, "words": _normalize_text(user_query), "bundle": bundle}
+        self.stats["stores"] += 1
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_embedding_fn: Optional[EmbeddingFn] = None
+
+
+def set_embedding_function(embedding_fn: Optional[EmbeddingFn]) -> None:
+    """Plug in a custom embedding function (None restores the default).
+
+    Resets the cache, since vectors from different embeddings do not mix.
+    """
+    global _embedding_fn, _semantic_cache
+    _embedding_fn = embedding_fn
+    _semantic_cache = None
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Get the configured semantic cache.
+
+    Returns:
+        SemanticCache instance, or None if disabled
+    """
+    global _semantic_cache
+
+    cache_config = get_semantic_cache_config()
+    if not cache_config.get("enabled", False):
+        return None
+
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            embedding_fn=_embedding_fn,
+            threshold=cache_config.get("threshold", 0.92),
+            max_entries=cache_config.get("max_entries", 1000),
+            index=cache_config.get("index", "bruteforce"),
+            dim=cache_config.get("dim", 512)
+        )
+
+    return _semantic_cache
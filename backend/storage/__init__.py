@@ -0,0 +1,225 @@
+"""Conversation storage.
+
+The module-level functions delegate to the backend selected by
+``storage.type`` in the configuration:
+
+- ``json``: one JSON file per conversation (default)
+- ``jsonl``: one append-only JSON-Lines log per conversation
+- ``sqlite``: a single SQLite database with append-only message inserts
+
+With ``storage.compact.enabled`` the stage texts of new messages go to a
+content-addressed blob store (see compact). Unless ``storage.cache.enabled``
+is false, the backend is wrapped in a bounded LRU cache of parsed
+conversations (see cached_backend).
+"""
+
+import os
+from typing import List, Dict, Any, Optional, Iterable
+
+from ..config import DATA_DIR, get_storage_config
+from .base import StorageBackend
+from .json_backend import JsonStorage
+from .jsonl_backend import JsonlStorage, DEFAULT_COMPACT_EVERY
+from .sqlite_backend import SqliteStorage
+from .cached_backend import CachedStorage, DEFAULT_MAX_CONVERSATIONS, DEFAULT_MAX_MEMORY_MB
+from .compact import BlobStore, CompactStorage, project_conversation, DEFAULT_MIN_BLOB_SIZE
+
+_backend: Optional[StorageBackend] = None
+_blob_store: Optional[BlobStore] = None
+
+
+def create_backend(storage_type: str, storage_config: Dict[str, Any]) -> StorageBackend:
+    """
+    Create a storage backend by type name.
+
+    Args:
+        storage_type: 'json', 'jsonl' or 'sqlite'
+        storage_config: The storage configuration section
+
+    Returns:
+        StorageBackend instance
+    """
+    data_dir = storage_config.get("data_dir", DATA_DIR)
+
+    if storage_type == "json":
+        return JsonStorage(data_dir)
+    if storage_type == "jsonl":
+        return JsonlStorage(
+            data_dir,
+            compact_every=storage_config.get("compact_every", DEFAULT_COMPACT_EVERY),
+            fsync=storage_config.get("fsync", True)
+        )
+    if storage_type == "sqlite":
+        path = storage_config.get("path", os.path.join(data_dir, "conversations.sqlite3"))
+        return SqliteStorage(path)
+
+    raise ValueError(f"Unknown storage type '{storage_type}'")
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Get the blob store for compact mode, creating it on first use.
+
+    It exists even with compact mode off, so messages stored while it was on
+    still resolve.
+    """
+    global _blob_store
+
+    if _blob_store is None:
+        storage_config = get_storage_config()
+        compact_config = storage_config.get("compact", {})
+        blob_dir = compact_config.get(
+            "blob_dir", os.path.join(storage_config.get("data_dir", DATA_DIR), "blobs")
+        )
+        _blob_store = BlobStore(
+            blob_dir,
+            compression=compact_config.get("compression", "gzip"),
+            level=compact_config.get("level")
+        )
+
+    return _blob_store
+
+
+def get_storage() -> StorageBackend:
+    """Get the configured storage backend, creating it on first use."""
+    global _backend
+
+    if _backend is None:
+        storage_config = get_storage_config()
+        backend = create_backend(storage_config.get("type", "json"), storage_config)
+
+        compact_config = storage_config.get("compact", {})
+        if compact_config.get("enabled", False):
+            backend = CompactStorage(
+                backend,
+                get_blob_store(),
+                min_size=compact_config.get("min_size", DEFAULT_MIN_BLOB_SIZE)
+            )
+
+        cache_config = storage_config.get("cache", {})
+        if cache_config.get("enabled", True):
+            backend = CachedStorage(
+                backend,
+                max_conversations=cache_config.get("max_conversations", DEFAULT_MAX_CONVERSATIONS),
+                max_bytes=int(cache_config.get("max_memory_mb", DEFAULT_MAX_MEMORY_MB) * 1024 * 1024)
+            )
+
+        _backend = backend
+
+    return _backend
+
+
+def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """
+    Create a new conversation.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        New conversation dict
+    """
+    return get_storage().create_conversation(conversation_id)
+
+
+def get_conversation(
+    conversation_id: str,
+    include: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a conversation from storage, with stage texts resolved.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+        include: Stages to keep in assistant messages (default: all)
+
+    Returns:
+        Conversation dict or None if not found
+    """
+    conversation = get_storage().get_conversation(conversation_id)
+    if conversation is None:
+        return None
+    return project_conversation(conversation, include, get_blob_store())
+
+
+def save_conversation(conversation: Dict[str, Any]):
+    """
+    Save a conversation to storage.
+
+    Args:
+        conversation: Conversation dict to save
+    """
+    get_storage().save_conversation(conversation)
+
+
+def list_conversations(
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+    before_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    List conversations (metadata only), newest first.
+
+    Args:
+        limit: Maximum number of conversations to return (None: all)
+        before: Cursor; only conversations created before this timestamp
+        before_id: With `before`, the id of the last conversation of the
+            previous page (see StorageBackend.list_conversations)
+
+    Returns:
+        List of conversation metadata dicts
+    """
+    return get_storage().list_conversations(limit=limit, before=before, before_id=before_id)
+
+
+def add_user_message(conversation_id: str, content: str):
+    """
+    Add a user message to a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        content: User message content
+    """
+    get_storage().add_user_message(conversation_id, content)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    usage: Optional[Dict[str, Any]] = None
+):
+    """
+    Add an assistant message with all 3 stages to a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        stage1: List of individual model responses
+        stage2: List of model rankings
+        stage3: Final synthesized response
+        usage: Aggregated token usage of the turn (metadata["usage"])
+    """
+    get_storage().add_assistant_message(conversation_id, stage1, stage2, stage3, usage)
+
+
+def update_conversation_title(conversation_id: str, title: str):
+    """
+    Update the title of a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        title: New title for the conversation
+    """
+    get_storage().update_conversation_title(conversation_id, title)
+
+
+def update_conversation_summary(conversation_id: str, summary: Dict[str, Any]):
+    """
+    Replace the rolling summary of a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        summary: Dict with the summary 'text' and the number of 'turns' it covers
+    """
+    get_storage().update_conversation_summary(conversation_id, summary)
@@ -0,0 +1,411 @@
+"""Async conversation storage for use on the event loop.
+
+Mirrors the module-level API of ``backend.storage`` with coroutines, so
+request handlers never touch the disk themselves:
+
+- Reads run on a dedicated thread pool.
+- Mutations (new messages, title and summary changes) go through a
+  write-behind queue.
+  They return as soon as the change is queued; a per-conversation flusher
+  writes all changes queued for that conversation as one batch through
+  ``StorageBackend.apply_changes``. With the JSON backend that is one
+  rewrite per batch instead of one per change. A batch that fails to write
+  stays queued and is retried with exponential backoff, and once more on
+  close; failures show up in the write-behind stats.
+
+Reads of a conversation flush its pending changes first, so callers always
+read their own writes. Every backend call for a conversation runs under that
+conversation's asyncio lock, so reads never interleave with a write of the
+same conversation and concurrent turns cannot lose each other's updates.
+"""
+
+import time
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from ..config import get_storage_config
+from ..metrics import record_storage
+from . import get_storage, get_blob_store
+from .base import StorageBackend, user_message, assistant_message
+from .cached_backend import CachedStorage
+from .compact import BlobStore, project_conversation
+
+DEFAULT_IO_THREADS = 4
+DEFAULT_FLUSH_DELAY_MS = 50
+# Backoff between attempts to write a batch that failed
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+
+class AsyncStorage:
+    """
+    Async wrapper around a storage backend with write-behind coalescing.
+
+    Args:
+        backend: Synchronous storage backend to wrap
+        io_threads: Size of the storage thread pool
+        flush_delay: Seconds to wait for more changes before writing a batch
+        blob_store: Store to resolve compacted stage texts from
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        io_threads: int = DEFAULT_IO_THREADS,
+        flush_delay: float = DEFAULT_FLUSH_DELAY_MS / 1000,
+        blob_store: Optional[BlobStore] = None
+    ):
+        self.backend = backend
+        self.blob_store = blob_store
+        self.flush_delay = flush_delay
+        self._executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="storage-io")
+        self._pending: Dict[str, List[Tuple[str, Any]]] = {}
+        self._flushers: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        # Dropped automatically once no coroutine holds or waits on a lock
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._stats = {"changes": 0, "written": 0, "batches": 0, "errors": 0}
+        # conversation_id -> consecutive failed writes; the batch stays queued
+        self._failures: Dict[str, int] = {}
+        self._last_error: Optional[str] = None
+        self._closed = False
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking backend call on the storage thread pool, timing it per operation."""
+        loop = asyncio.get_running_loop()
+        started_at = time.monotonic()
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            record_storage(fn.__name__.lstrip("_"), time.monotonic() - started_at)
+
+    def conversation_lock(self, conversation_id: str) -> asyncio.Lock:
+        """
+        Get the lock that serializes storage access to one conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Returns:
+            asyncio.Lock shared by every caller for this conversation
+        """
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[conversation_id] = lock
+        return lock
+
+    def _enqueue(self, conversation_id: str, change: Tuple[str, Any]):
+        self._pending.setdefault(conversation_id, []).append(change)
+        self._stats["changes"] += 1
+
+        if conversation_id not in self._flushers:
+            self._start_flusher(conversation_id, self.flush_delay)
+
+    def _start_flusher(self, conversation_id: str, delay: float):
+        self._wakeups[conversation_id] = asyncio.Event()
+        self._flushers[conversation_id] = asyncio.create_task(self._flush_loop(conversation_id, delay))
+
+    async def _flush_loop(self, conversation_id: str, delay: float):
+        """
+        Write queued changes for one conversation until none are left.
+
+        If a batch fails, it goes back to the front of the queue and a new
+        flusher retries it after a backoff delay (flush() wakes it early).
+        """
+        retry_delay = None
+        try:
+            try:
+                await asyncio.wait_for(self._wakeups[conversation_id].wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+            # Changes queued while a batch is being written form the next batch
+            while self._pending.get(conversation_id):
+                changes = self._pending.pop(conversation_id)
+                try:
+                    async with self.conversation_lock(conversation_id):
+                        await self._run(self.backend.apply_changes, conversation_id, changes)
+                except Exception as e:
+                    # Keep the batch ahead of the changes queued since
+                    self._pending[conversation_id] = changes + self._pending.get(conversation_id, [])
+                    failures = self._failures.get(conversation_id, 0) + 1
+                    self._failures[conversation_id] = failures
+                    self._stats["errors"] += 1
+                    self._last_error = f"{conversation_id}: {e}"
+                    retry_delay = min(RETRY_BASE_DELAY * 2 ** (failures - 1), RETRY_MAX_DELAY)
+                    print(f"Error writing conversation {conversation_id} (attempt {failures}, retrying in {retry_delay:.1f}s): {e}")
+                    break
+
+                self._failures.pop(conversation_id, None)
+                self._stats["batches"] += 1
+                self._stats["written"] += len(changes)
+        finally:
+            self._flushers.pop(conversation_id, None)
+            self._wakeups.pop(conversation_id, None)
+            if retry_delay is not None and not self._closed:
+                self._start_flusher(conversation_id, retry_delay)
+
+    async def flush(self, conversation_id: Optional[str] = None):
+        """
+        Write pending changes now and wait until they are on disk.
+
+        Args:
+            conversation_id: Only flush this conversation (default: all)
+        """
+        if conversation_id is None:
+            ids = list(self._flushers)
+        else:
+            ids = [conversation_id] if conversation_id in self._flushers else []
+
+        for id_ in ids:
+            self._wakeups[id_].set()
+
+        tasks = [self._flushers[id_] for id_ in ids]
+        if tasks:
+            await asyncio.gather(*(asyncio.shield(task) for task in tasks))
+
+    async def close(self):
+        """Flush everything, retrying failed batches once more, and stop the thread pool."""
+        self._closed = True
+        await self.flush()
+
+        unwritten = sum(len(changes) for changes in self._pending.values())
+        if unwritten:
+            print(f"Discarding {unwritten} unwritten changes to {len(self._pending)} conversations "
+                  f"(last error: {self._last_error})")
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Write-behind statistics.
+
+        Returns:
+            Dict with queued, total and written changes, batches, coalesced
+            (changes saved by batching), errors (failed writes), failing
+            (conversations whose last write failed and is being retried) and
+            last_error
+        """
+        return {
+            "queued": sum(len(changes) for changes in self._pending.values()),
+            **self._stats,
+            "coalesced": self._stats["written"] - self._stats["batches"],
+            "failing": len(self._failures),
+            "last_error": self._last_error
+        }
+
+    async def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Create a new conversation."""
+        async with self.conversation_lock(conversation_id):
+            return await self._run(self.backend.create_conversation, conversation_id)
+
+    def _load(self, conversation_id: str, include: Optional[Iterable[str]]) -> Optional[Dict[str, Any]]:
+        conversation = self.backend.get_conversation(conversation_id)
+        if conversation is None:
+            return None
+        return project_conversation(conversation, include, self.blob_store)
+
+    async def get_conversation(
+        self,
+        conversation_id: str,
+        include: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Load a conversation, including changes still in the write-behind queue."""
+        await self.flush(conversation_id)
+        async with self.conversation_lock(conversation_id):
+            return await self._run(self._load, conversation_id, include)
+
+    async def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """List conversations (metadata only), newest first."""
+        await self.flush()
+        return await self._run(self.backend.list_conversations, limit=limit, before=before, before_id=before_id)
+
+    async def add_user_message(self, conversation_id: str, content: str):
+        """Queue a user message."""
+        self._enqueue(conversation_id, ("message", user_message(content)))
+
+    async def add_assistant_message(
+        self,
+        conversation_id: str,
+        stage1: List[Dict[str, Any]],
+        stage2: List[Dict[str, Any]],
+        stage3: Dict[str, Any],
+        usage: Optional[Dict[str, Any]] = None
+    ):
+        """Queue an assistant message with all 3 stages and its token usage."""
+        self._enqueue(conversation_id, ("message", assistant_message(stage1, stage2, stage3, usage)))
+
+    async def update_conversation_title(self, conversation_id: str, title: str):
+        """Queue a title change."""
+        self._enqueue(conversation_id, ("title", title))
+
+    async def update_conversation_summary(self, conversation_id: str, summary: Dict[str, Any]):
+        """Queue a rolling summary update."""
+        self._enqueue(conversation_id, ("summary", summary))
+
+
+_async_storage: Optional[AsyncStorage] = None
+
+
+def get_async_storage() -> AsyncStorage:
+    """Get the async wrapper around the configured backend, creating it on first use."""
+    global _async_storage
+
+    if _async_storage is None:
+        storage_config = get_storage_config()
+        _async_storage = AsyncStorage(
+            get_storage(),
+            io_threads=storage_config.get("io_threads", DEFAULT_IO_THREADS),
+            flush_delay=storage_config.get("flush_delay_ms", DEFAULT_FLUSH_DELAY_MS) / 1000,
+            blob_store=get_blob_store()
+        )
+
+    return _async_storage
+
+
+async def close():
+    """Flush pending writes and release the thread pool."""
+    global _async_storage
+
+    if _async_storage is not None:
+        await _async_storage.close()
+        _async_storage = None
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Storage statistics.
+
+    Returns:
+        Dict with 'write_behind', 'conversation_cache' (None when disabled)
+        and 'blobs' stats
+    """
+    async_storage = get_async_storage()
+    backend = async_storage.backend
+    return {
+        "write_behind": async_storage.get_stats(),
+        "conversation_cache": backend.get_stats() if isinstance(backend, CachedStorage) else None,
+        "blobs": async_storage.blob_store.get_stats() if async_storage.blob_store is not None else None
+    }
+
+
+async def flush(conversation_id: Optional[str] = None):
+    """
+    Write pending changes now.
+
+    Args:
+        conversation_id: Only flush this conversation (default: all)
+    """
+    await get_async_storage().flush(conversation_id)
+
+
+async def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """
+    Create a new conversation.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        New conversation dict
+    """
+    return await get_async_storage().create_conversation(conversation_id)
+
+
+async def get_conversation(
+    conversation_id: str,
+    include: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a conversation from storage, with stage texts resolved.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+        include: Stages to keep in assistant messages (default: all); blobs
+            of other stages are not read
+
+    Returns:
+        Conversation dict or None if not found
+    """
+    return await get_async_storage().get_conversation(conversation_id, include)
+
+
+async def list_conversations(
+    limit: Optional[int] = None,
+    before: Optional[str] = None,
+    before_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    List conversations (metadata only), newest first.
+
+    Args:
+        limit: Maximum number of conversations to return (None: all)
+        before: Cursor; only conversations created before this timestamp
+        before_id: With `before`, the id of the last conversation of the
+            previous page (see StorageBackend.list_conversations)
+
+    Returns:
+        List of conversation metadata dicts
+    """
+    return await get_async_storage().list_conversations(limit=limit, before=before, before_id=before_id)
+
+
+async def add_user_message(conversation_id: str, content: str):
+    """
+    Queue a user message for a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        content: User message content
+    """
+    await get_async_storage().add_user_message(conversation_id, content)
+
+
+async def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    usage: Optional[Dict[str, Any]] = None
+):
+    """
+    Queue an assistant message with all 3 stages for a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        stage1: List of individual model responses
+        stage2: List of model rankings
+        stage3: Final synthesized response
+        usage: Aggregated token usage of the turn (metadata["usage"])
+    """
+    await get_async_storage().add_assistant_message(conversation_id, stage1, stage2, stage3, usage)
+
+
+async def update_conversation_title(conversation_id: str, title: str):
+    """
+    Queue a title change for a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        title: New title for the conversation
+    """
+    await get_async_storage().update_conversation_title(conversation_id, title)
+
+
+async def update_conversation_summary(conversation_id: str, summary: Dict[str, Any]):
+    """
+    Queue a rolling summary update for a conversation.
+
+    Args:
+        conversation_id: Conversation identifier
+        summary: Dict with the summary 'text' and the number of 'turns' it covers
+    """
+    await get_async_storage().update_conversation_summary(conversation_id, summary)
@@ -0,0 +1,233 @@
+"""Storage interface shared by all conversation storage backends."""
+
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+
+def write_atomic(path: str, text: Union[str, bytes], fsync: bool = True):
+    """
+    Replace a file's contents atomically.
+
+    The text goes to a temporary file in the same directory which is then
+    renamed over the target, so readers and crashes only ever see the old or
+    the new contents, never a truncated file.
+
+    Args:
+        path: File to write
+        text: New contents (str, or bytes for binary files)
+        fsync: Flush the data to disk before the rename
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+    try:
+        if isinstance(text, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(text)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def new_conversation(conversation_id: str) -> Dict[str, Any]:
+    """Build the dict for a freshly created, empty conversation."""
+    return {
+        "id": conversation_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "title": "New Conversation",
+        "messages": []
+    }
+
+
+def conversation_metadata(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the list-view metadata of a conversation."""
+    return {
+        "id": conversation["id"],
+        "created_at": conversation["created_at"],
+        "title": conversation.get("title", "New Conversation"),
+        "message_count": len(conversation["messages"])
+    }
+
+
+def user_message(content: str) -> Dict[str, Any]:
+    """Build a user message."""
+    return {
+        "role": "user",
+        "content": content
+    }
+
+
+def assistant_message(
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    usage: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build an assistant message holding all 3 stages and, if given, the turn's token usage."""
+    message = {
+        "role": "assistant",
+        "stage1": stage1,
+        "stage2": stage2,
+        "stage3": stage3
+    }
+    if usage is not None:
+        message["usage"] = usage
+    return message
+
+
+def apply_changes_to(conversation: Dict[str, Any], changes: List[Tuple[str, Any]]):
+    """Apply ("message" | "title" | "summary", value) changes to a conversation dict in place."""
+    for kind, value in changes:
+        if kind == "message":
+            conversation["messages"].append(value)
+        elif kind == "title":
+            conversation["title"] = value
+        elif kind == "summary":
+            conversation["summary"] = value
+        else:
+            raise ValueError(f"Unknown change type '{kind}'")
+
+
+class StorageBackend(ABC):
+    """
+    Conversation storage interface.
+
+    Backends must implement create/get/save/list. All mutations go through
+    apply_changes(), which defaults to a read-modify-write of the whole
+    conversation; backends that can append in place should override it.
+    """
+
+    # Whether apply_changes() writes only the changes; False means it
+    # rewrites the whole conversation, so wrappers that already hold it
+    # parsed can save it directly instead
+    appends_in_place = False
+
+    @abstractmethod
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Create and persist a new, empty conversation."""
+
+    @abstractmethod
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a full conversation, or None if not found."""
+
+    @abstractmethod
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """Persist a full conversation, replacing any stored version."""
+
+    @abstractmethod
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List conversation metadata (id, created_at, title, message_count), newest first.
+
+        Args:
+            limit: Maximum number of conversations to return (None: all)
+            before: Cursor; only conversations with created_at strictly
+                before this timestamp are returned
+            before_id: With `before`, the id of the last conversation of the
+                previous page; conversations created at exactly `before`
+                with a smaller id are returned too, so none are skipped
+                when several share a timestamp
+        """
+
+    def prepare_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a message to the form this backend stores.
+
+        Wrappers that cache stored data use this to keep their copy identical
+        to what was persisted. Must be idempotent.
+
+        Args:
+            message: Message dict
+
+        Returns:
+            Message as stored (the default stores it unchanged)
+        """
+        return message
+
+    def apply_changes(self, conversation_id: str, changes: List[Tuple[str, Any]]):
+        """
+        Apply a batch of changes to a conversation.
+
+        Each change is ("message", message_dict) to append a message,
+        ("title", title) to rename the conversation or ("summary",
+        summary_dict) to replace its rolling summary. The default loads the
+        conversation once, applies every change and saves it once; backends
+        that can append in place should override this.
+
+        Args:
+            conversation_id: Conversation identifier
+            changes: Changes to apply, in order
+        """
+        conversation = self.get_conversation(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        apply_changes_to(conversation, changes)
+        self.save_conversation(conversation)
+
+    def add_user_message(self, conversation_id: str, content: str):
+        """
+        Add a user message to a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+            content: User message content
+        """
+        self.apply_changes(conversation_id, [("message", user_message(content))])
+
+    def add_assistant_message(
+        self,
+        conversation_id: str,
+        stage1: List[Dict[str, Any]],
+        stage2: List[Dict[str, Any]],
+        stage3: Dict[str, Any],
+        usage: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Add an assistant message with all 3 stages to a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+            stage1: List of individual model responses
+            stage2: List of model rankings
+            stage3: Final synthesized response
+            usage: Aggregated token usage of the turn (metadata["usage"])
+        """
+        self.apply_changes(conversation_id, [("message", assistant_message(stage1, stage2, stage3, usage))])
+
+    def update_conversation_title(self, conversation_id: str, title: str):
+        """
+        Update the title of a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+            title: New title for the conversation
+        """
+        self.apply_changes(conversation_id, [("title", title)])
+
+    def update_conversation_summary(self, conversation_id: str, summary: Dict[str, Any]):
+        """
+        Replace the rolling summary of a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+            summary: Dict with the summary 'text', the number of 'turns' it covers and
+                the running 'usage' of the summarizer calls
+        """
+        self.apply_changes(conversation_id, [("summary", summary)])
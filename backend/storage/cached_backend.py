@@ -0,0 +1,185 @@
+"""Bounded in-memory cache of conversations in front of a storage backend.
+
+Hot conversations stay parsed in memory, so the several reads a council
+turn makes cost one load instead of one file parse each. Writes go through
+to the wrapped backend first and are then applied to the cached copy, so
+the cache never holds anything that is not on disk. Entries are evicted
+least-recently-used once either the entry limit or the memory budget is
+exceeded.
+
+The cache is per process: edit the data directory by hand only while the
+server is stopped.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from .base import StorageBackend, apply_changes_to
+
+DEFAULT_MAX_CONVERSATIONS = 128
+DEFAULT_MAX_MEMORY_MB = 64
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-compatible value, in bytes."""
+    return len(json.dumps(value))
+
+
+def _copy_conversation(conversation: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a conversation deep enough that callers can append messages or retitle it."""
+    return dict(conversation, messages=list(conversation["messages"]))
+
+
+class CachedStorage(StorageBackend):
+    """
+    LRU conversation cache with write-through persistence.
+
+    Conversations handed out are copies of the cached dict and its message
+    list; the message dicts themselves are shared and must not be mutated.
+
+    Args:
+        backend: Storage backend to wrap
+        max_conversations: Maximum number of cached conversations
+        max_bytes: Memory budget for cached conversations (estimated from
+            their JSON size)
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        max_conversations: int = DEFAULT_MAX_CONVERSATIONS,
+        max_bytes: int = DEFAULT_MAX_MEMORY_MB * 1024 * 1024
+    ):
+        self.backend = backend
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # conversation_id -> (conversation, estimated size)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _put(self, conversation: Dict[str, Any], size: Optional[int] = None):
+        """Insert or replace a cached conversation and evict to fit; caller holds the lock."""
+        if size is None:
+            size = _estimate_size(conversation)
+
+        previous = self._entries.pop(conversation["id"], None)
+        if previous is not None:
+            self._bytes -= previous[1]
+
+        # Larger than the whole budget: serve it from disk every time
+        if size > self.max_bytes:
+            return
+
+        self._entries[conversation["id"]] = (conversation, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_conversations or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Conversation cache statistics.
+
+        Returns:
+            Dict with hits, misses, hit_rate, evictions, entries and memory use
+        """
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_conversations,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Create a conversation and cache it."""
+        conversation = self.backend.create_conversation(conversation_id)
+        with self._lock:
+            self._put(_copy_conversation(conversation))
+        return conversation
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a conversation from the cache, falling back to the backend."""
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is not None:
+                self._entries.move_to_end(conversation_id)
+                self._stats["hits"] += 1
+                return _copy_conversation(entry[0])
+            self._stats["misses"] += 1
+
+        conversation = self.backend.get_conversation(conversation_id)
+        if conversation is None:
+            return None
+
+        with self._lock:
+            self._put(_copy_conversation(conversation))
+        return conversation
+
+    def prepare_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a message to the form the wrapped backend stores."""
+        return self.backend.prepare_message(message)
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """Save a conversation to the backend, then cache it as stored."""
+        conversation = dict(
+            conversation,
+            messages=[self.backend.prepare_message(m) for m in conversation["messages"]]
+        )
+        self.backend.save_conversation(conversation)
+        with self._lock:
+            self._put(_copy_conversation(conversation))
+
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """List conversations; metadata is served by the backend's own index."""
+        return self.backend.list_conversations(limit=limit, before=before, before_id=before_id)
+
+    def apply_changes(self, conversation_id: str, changes: List[Tuple[str, Any]]):
+        """
+        Write changes through to the backend, then apply them to the cached copy.
+
+        If the backend would rewrite the whole conversation anyway and it is
+        cached, the cached copy with the changes applied is saved directly,
+        so the stored file is not read and parsed again.
+        """
+        changes = [
+            (kind, self.backend.prepare_message(value) if kind == "message" else value)
+            for kind, value in changes
+        ]
+        added = sum(_estimate_size(value) for kind, value in changes if kind == "message")
+
+        if not self.backend.appends_in_place:
+            with self._lock:
+                entry = self._entries.get(conversation_id)
+            if entry is not None:
+                conversation = _copy_conversation(entry[0])
+                apply_changes_to(conversation, changes)
+                self.backend.save_conversation(conversation)
+                with self._lock:
+                    self._put(_copy_conversation(conversation), entry[1] + added)
+                return
+
+        self.backend.apply_changes(conversation_id, changes)
+
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return
+
+            conversation = _copy_conversation(entry[0])
+            apply_changes_to(conversation, changes)
+            self._put(conversation, entry[1] + added)
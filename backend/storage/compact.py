@@ -0,0 +1,279 @@
+"""Compact storage of stage texts in a content-addressed blob store.
+
+In compact mode the long texts of an assistant message (stage-1 responses,
+stage-2 rankings, the stage-3 answer) are written once to
+{blob_dir}/{sha[:2]}/{sha}.gz (or .zst) and the stored message keeps a
+reference ``{"$blob": sha}`` in their place. Identical texts share one blob,
+and rewriting a conversation only rewrites the references.
+
+References are resolved when a conversation is served, and only for the
+stages the caller asked for (see project_conversation).
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from .base import StorageBackend, write_atomic
+
+# Assistant message fields holding stage results
+STAGE_KEYS = ("stage1", "stage2", "stage3")
+
+# Text field of each stage result that goes to the blob store
+_BLOB_FIELDS = {"stage1": "response", "stage2": "ranking", "stage3": "response"}
+
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+DEFAULT_MIN_BLOB_SIZE = 256
+
+
+class BlobStore:
+    """
+    Content-addressed store of compressed texts.
+
+    Args:
+        blob_dir: Directory for the blobs
+        compression: 'gzip' or 'zstd' (requires the 'zstandard' package)
+        level: Compression level (default: the codec's default)
+    """
+
+    def __init__(self, blob_dir: str, compression: str = "gzip", level: Optional[int] = None):
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown blob compression '{compression}'")
+
+        self._zstd = None
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("Blob compression 'zstd' requires the 'zstandard' package")
+            self._zstd = zstandard
+
+        self.blob_dir = blob_dir
+        self.compression = compression
+        self.level = level
+        self._lock = threading.Lock()
+        self._stats = {"writes": 0, "deduplicated": 0, "bytes_in": 0, "bytes_stored": 0, "reads": 0}
+
+    def _path(self, digest: str, compression: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest + _EXTENSIONS[compression])
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            level = self.level if self.level is not None else 3
+            return self._zstd.ZstdCompressor(level=level).compress(data)
+        return gzip.compress(data, compresslevel=self.level if self.level is not None else 6)
+
+    def _decompress(self, data: bytes, compression: str) -> bytes:
+        if compression == "zstd":
+            if self._zstd is None:
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ValueError("Reading zstd blobs requires the 'zstandard' package")
+                self._zstd = zstandard
+            return self._zstd.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def put(self, text: str) -> str:
+        """
+        Store a text.
+
+        Args:
+            text: Text to store
+
+        Returns:
+            SHA-256 hex digest addressing the text
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            self._stats["bytes_in"] += len(data)
+            if any(os.path.exists(self._path(digest, c)) for c in _EXTENSIONS):
+                self._stats["deduplicated"] += 1
+                return digest
+
+        path = self._path(digest, self.compression)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = self._compress(data)
+        write_atomic(path, compressed)
+
+        with self._lock:
+            self._stats["writes"] += 1
+            self._stats["bytes_stored"] += len(compressed)
+
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Load a text by digest.
+
+        Args:
+            digest: Digest returned by put()
+
+        Returns:
+            The stored text
+        """
+        # Blobs written before a change of compression keep their old codec
+        for compression in (self.compression, *(c for c in _EXTENSIONS if c != self.compression)):
+            path = self._path(digest, compression)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = self._decompress(f.read(), compression)
+                with self._lock:
+                    self._stats["reads"] += 1
+                return data.decode("utf-8")
+
+        raise ValueError(f"Blob {digest} not found")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Blob store statistics for this process.
+
+        Returns:
+            Dict with writes, deduplicated puts, reads, bytes_in and bytes_stored
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and "$blob" in value
+
+
+def _map_stage_texts(message: Dict[str, Any], fn, stages: Iterable[str]) -> Dict[str, Any]:
+    """Copy an assistant message with fn applied to the text field of the given stages."""
+    message = dict(message)
+    for stage in stages:
+        value = message.get(stage)
+        if value is None:
+            continue
+        field = _BLOB_FIELDS[stage]
+        if isinstance(value, list):
+            message[stage] = [
+                dict(result, **{field: fn(result[field])}) if field in result else result
+                for result in value
+            ]
+        elif isinstance(value, dict) and field in value:
+            message[stage] = dict(value, **{field: fn(value[field])})
+    return message
+
+
+def project_conversation(
+    conversation: Dict[str, Any],
+    include: Optional[Iterable[str]] = None,
+    blob_store: Optional[BlobStore] = None
+) -> Dict[str, Any]:
+    """
+    Build the served view of a conversation.
+
+    Assistant messages keep only the stages in `include`, and blob references
+    in those stages are resolved; blobs of excluded stages are never read.
+
+    Args:
+        conversation: Conversation as stored
+        include: Stage keys to keep (default: all)
+        blob_store: Store to resolve blob references from
+
+    Returns:
+        New conversation dict; the stored one is not modified
+    """
+    if include is None:
+        stages = STAGE_KEYS
+    else:
+        wanted = set(include)
+        stages = tuple(stage for stage in STAGE_KEYS if stage in wanted)
+
+    def resolve(value):
+        if _is_ref(value):
+            if blob_store is None:
+                raise ValueError("Conversation references blobs but no blob store is configured")
+            return blob_store.get(value["$blob"])
+        return value
+
+    messages = []
+    for message in conversation["messages"]:
+        if message.get("role") == "assistant":
+            message = {
+                key: value for key, value in message.items()
+                if key not in STAGE_KEYS or key in stages
+            }
+            message = _map_stage_texts(message, resolve, stages)
+        messages.append(message)
+
+    return dict(conversation, messages=messages)
+
+
+class CompactStorage(StorageBackend):
+    """
+    Moves stage texts of stored messages into a blob store.
+
+    Conversations read through this backend contain blob references; use
+    project_conversation() to resolve them.
+
+    Args:
+        backend: Storage backend to wrap
+        blob_store: Where stage texts are stored
+        min_size: Texts shorter than this many bytes stay inline
+    """
+
+    def __init__(self, backend: StorageBackend, blob_store: BlobStore, min_size: int = DEFAULT_MIN_BLOB_SIZE):
+        self.backend = backend
+        self.blob_store = blob_store
+        self.min_size = min_size
+
+    @property
+    def appends_in_place(self) -> bool:
+        return self.backend.appends_in_place
+
+    def _to_ref(self, value: Any) -> Any:
+        if isinstance(value, str) and len(value.encode("utf-8")) >= self.min_size:
+            return {"$blob": self.blob_store.put(value)}
+        return value
+
+    def prepare_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace the long stage texts of a message with blob references.
+
+        Args:
+            message: Message as produced by the council
+
+        Returns:
+            Compacted copy (user messages are returned unchanged)
+        """
+        if message.get("role") != "assistant":
+            return message
+        return _map_stage_texts(message, self._to_ref, STAGE_KEYS)
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Create a new conversation."""
+        return self.backend.create_conversation(conversation_id)
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a conversation with blob references left unresolved."""
+        return self.backend.get_conversation(conversation_id)
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """Save a conversation, moving stage texts to the blob store."""
+        self.backend.save_conversation(
+            dict(conversation, messages=[self.prepare_message(m) for m in conversation["messages"]])
+        )
+
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """List conversations (metadata only)."""
+        return self.backend.list_conversations(limit=limit, before=before, before_id=before_id)
+
+    def apply_changes(self, conversation_id: str, changes: List[Tuple[str, Any]]):
+        """Apply changes, moving stage texts of new messages to the blob store."""
+        self.backend.apply_changes(conversation_id, [
+            (kind, self.prepare_message(value) if kind == "message" else value)
+            for kind, value in changes
+        ])
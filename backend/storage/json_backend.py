@@ -0,0 +1,246 @@
+"""JSON-based storage for conversations (one file per conversation)."""
+
+import json
+import os
+import bisect
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from pathlib import Path
+
+from .base import StorageBackend, new_conversation, conversation_metadata, write_atomic
+
+INDEX_FILENAME = "_index.jsonl"
+# The log is compacted once it has this many lines and at least
+# INDEX_COMPACT_FACTOR lines per conversation
+INDEX_COMPACT_MIN_LINES = 1000
+INDEX_COMPACT_FACTOR = 2
+
+
+def _read_json_metadata(path: str) -> Dict[str, Any]:
+    with open(path, 'r') as f:
+        return conversation_metadata(json.load(f))
+
+
+class MetadataIndex:
+    """
+    Conversation metadata kept in memory and persisted as a sidecar log.
+
+    Every metadata change appends one JSON line to {data_dir}/_index.jsonl,
+    so listing never has to open the (large) conversation files. On load the
+    log is replayed, reconciled against the conversation files on disk (only
+    files missing from the index are parsed), and compacted; it is compacted
+    again whenever superseded lines make up most of it.
+
+    Args:
+        data_dir: Directory holding the conversation files
+        suffix: Extension of conversation files ('{id}{suffix}')
+        read_metadata: Reads metadata from a conversation file the index does
+            not know yet (default: parse it as a whole JSON conversation)
+        filename: Name of the sidecar log; files starting with '_' are never
+            treated as conversations
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        suffix: str = ".json",
+        read_metadata: Optional[Callable[[str], Dict[str, Any]]] = None,
+        filename: str = INDEX_FILENAME
+    ):
+        self.data_dir = data_dir
+        self.suffix = suffix
+        self.read_metadata = read_metadata or _read_json_metadata
+        self.path = os.path.join(data_dir, filename)
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        # (created_at, id) pairs in ascending order for cursor pagination
+        self._order: List[Tuple[str, str]] = []
+        # Lines in the log file, including superseded ones
+        self._lines = 0
+
+    def _load(self):
+        entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        meta = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line from a crash mid-append
+                        continue
+                    entries[meta["id"]] = meta
+
+        on_disk = {
+            filename[:-len(self.suffix)]
+            for filename in os.listdir(self.data_dir)
+            if filename.endswith(self.suffix) and not filename.startswith('_')
+        }
+
+        # Drop entries whose file is gone, index files the log does not know
+        for conversation_id in set(entries) - on_disk:
+            del entries[conversation_id]
+        for conversation_id in on_disk - set(entries):
+            path = os.path.join(self.data_dir, f"{conversation_id}{self.suffix}")
+            entries[conversation_id] = self.read_metadata(path)
+
+        self._entries = entries
+        self._order = sorted((meta["created_at"], meta["id"]) for meta in entries.values())
+        self._compact()
+
+    def _compact(self):
+        """Rewrite the log with one line per conversation."""
+        write_atomic(
+            self.path,
+            "".join(json.dumps(meta) + "\n" for meta in self._entries.values()),
+            fsync=False
+        )
+        self._lines = len(self._entries)
+
+    def _ensure_loaded(self):
+        if self._entries is None:
+            self._load()
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of one conversation, or None if unknown."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get(conversation_id)
+
+    def update(self, meta: Dict[str, Any]):
+        """Record new metadata for a conversation."""
+        with self._lock:
+            self._ensure_loaded()
+
+            previous = self._entries.get(meta["id"])
+            if previous == meta:
+                return
+            if previous is None:
+                bisect.insort(self._order, (meta["created_at"], meta["id"]))
+
+            self._entries[meta["id"]] = meta
+            if self._lines >= max(INDEX_COMPACT_MIN_LINES, INDEX_COMPACT_FACTOR * len(self._entries)):
+                self._compact()
+                return
+
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(meta) + "\n")
+            self._lines += 1
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Metadata newest first, at most `limit` items.
+
+        Items are ordered by (created_at, id); the cursor is created strictly
+        before `before`, or with `before_id` strictly before (before, before_id).
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            if before is None:
+                end = len(self._order)
+            elif before_id is None:
+                end = bisect.bisect_left(self._order, (before,))
+            else:
+                end = bisect.bisect_left(self._order, (before, before_id))
+            start = 0 if limit is None else max(0, end - limit)
+            return [self._entries[conversation_id] for _, conversation_id in reversed(self._order[start:end])]
+
+
+class JsonStorage(StorageBackend):
+    """Stores each conversation as {data_dir}/{id}.json."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.index = MetadataIndex(data_dir)
+
+    def ensure_data_dir(self):
+        """Ensure the data directory exists."""
+        Path(self.data_dir).mkdir(parents=True, exist_ok=True)
+
+    def get_conversation_path(self, conversation_id: str) -> str:
+        """Get the file path for a conversation."""
+        return os.path.join(self.data_dir, f"{conversation_id}.json")
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Create a new conversation.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            New conversation dict
+        """
+        self.ensure_data_dir()
+
+        conversation = new_conversation(conversation_id)
+
+        # Save to file
+        path = self.get_conversation_path(conversation_id)
+        write_atomic(path, json.dumps(conversation, indent=2))
+
+        self.index.update(conversation_metadata(conversation))
+
+        return conversation
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation from storage.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict or None if not found
+        """
+        path = self.get_conversation_path(conversation_id)
+
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a conversation to storage.
+
+        Args:
+            conversation: Conversation dict to save
+        """
+        self.ensure_data_dir()
+
+        path = self.get_conversation_path(conversation['id'])
+        write_atomic(path, json.dumps(conversation, indent=2))
+
+        self.index.update(conversation_metadata(conversation))
+
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List conversations (metadata only) from the sidecar index.
+
+        Args:
+            limit: Maximum number of conversations to return
+            before: Only return conversations created before this timestamp
+            before_id: With `before`, also return conversations created at
+                exactly `before` whose id sorts before this one
+
+        Returns:
+            List of conversation metadata dicts, newest first
+        """
+        self.ensure_data_dir()
+
+        return self.index.page(limit=limit, before=before, before_id=before_id)
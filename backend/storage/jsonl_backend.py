@@ -0,0 +1,298 @@
+"""Append-only JSON-Lines storage for conversations.
+
+Each conversation is a log at {data_dir}/{id}.jsonl. The first record is a
+snapshot of the whole conversation; every later change (a new message, a
+title update) is one appended record:
+
+    {"op": "snapshot", "conversation": {...}}
+    {"op": "message", "message": {...}}
+    {"op": "title", "title": "..."}
+    {"op": "summary", "summary": {...}}
+
+Adding a message therefore writes only that message (plus one fsync) instead
+of rewriting the whole history. Reads replay the log. After `compact_every`
+appended records the log is folded back into a single snapshot.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from .base import StorageBackend, new_conversation, conversation_metadata, write_atomic
+from .json_backend import MetadataIndex
+
+INDEX_FILENAME = "_jsonl_index.jsonl"
+
+DEFAULT_COMPACT_EVERY = 50
+
+
+def replay_log(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild a conversation by replaying its log.
+
+    Args:
+        path: Path of the conversation log
+
+    Returns:
+        Conversation dict, or None if the log has no snapshot
+    """
+    conversation = None
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn record from a crash mid-append
+                continue
+
+            op = record.get("op")
+            if op == "snapshot":
+                conversation = record["conversation"]
+            elif conversation is None:
+                continue
+            elif op == "message":
+                conversation["messages"].append(record["message"])
+            elif op == "title":
+                conversation["title"] = record["title"]
+            elif op == "summary":
+                conversation["summary"] = record["summary"]
+
+    return conversation
+
+
+def records_since_snapshot(path: str) -> int:
+    """
+    Count the records appended to a log after its last snapshot.
+
+    Args:
+        path: Path of the conversation log
+
+    Returns:
+        Number of non-snapshot records after the last snapshot
+    """
+    count = 0
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            count = 0 if record.get("op") == "snapshot" else count + 1
+    return count
+
+
+def _read_log_metadata(path: str) -> Dict[str, Any]:
+    return conversation_metadata(replay_log(path))
+
+
+class JsonlStorage(StorageBackend):
+    """
+    Stores each conversation as an append-only log.
+
+    Args:
+        data_dir: Directory for the conversation logs
+        compact_every: Appended records after which a log is compacted
+        fsync: fsync after every append (durable across power loss)
+    """
+
+    appends_in_place = True
+
+    def __init__(self, data_dir: str, compact_every: int = DEFAULT_COMPACT_EVERY, fsync: bool = True):
+        self.data_dir = data_dir
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.index = MetadataIndex(
+            data_dir, suffix=".jsonl", read_metadata=_read_log_metadata, filename=INDEX_FILENAME
+        )
+        # Guards _locks; each conversation's log is written under its own lock
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        # Records appended since the last snapshot, per conversation; counted
+        # from the log the first time a conversation is appended to
+        self._appended: Dict[str, int] = {}
+
+    def ensure_data_dir(self):
+        """Ensure the data directory exists."""
+        Path(self.data_dir).mkdir(parents=True, exist_ok=True)
+
+    def get_conversation_path(self, conversation_id: str) -> str:
+        """Get the log path for a conversation."""
+        return os.path.join(self.data_dir, f"{conversation_id}.jsonl")
+
+    def conversation_lock(self, conversation_id: str) -> threading.Lock:
+        """
+        Get the lock that serializes writes to one conversation's log.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Returns:
+            threading.Lock shared by every writer of this conversation
+        """
+        with self._lock:
+            lock = self._locks.get(conversation_id)
+            if lock is None:
+                lock = self._locks[conversation_id] = threading.Lock()
+            return lock
+
+    def _write_snapshot(self, conversation: Dict[str, Any]):
+        """Atomically replace a log with a single snapshot record; caller holds the conversation lock."""
+        write_atomic(
+            self.get_conversation_path(conversation["id"]),
+            json.dumps({"op": "snapshot", "conversation": conversation}) + "\n",
+            fsync=self.fsync
+        )
+        self._appended[conversation["id"]] = 0
+
+    def _append(self, conversation_id: str, records: List[Dict[str, Any]]):
+        """Append records to a log, compacting it when due; caller holds the conversation lock."""
+        path = self.get_conversation_path(conversation_id)
+        if not os.path.exists(path):
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        if conversation_id not in self._appended:
+            # First append since startup: continue the count of the existing log
+            self._appended[conversation_id] = records_since_snapshot(path)
+
+        data = "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        with open(path, 'a+b') as f:
+            # Start on a fresh line if a previous append was torn
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+        appended = self._appended.get(conversation_id, 0) + len(records)
+        self._appended[conversation_id] = appended
+        if appended >= self.compact_every:
+            self._write_snapshot(replay_log(path))
+
+    def compact(self, conversation_id: str):
+        """
+        Fold a conversation's log into a single snapshot.
+
+        Args:
+            conversation_id: Conversation identifier
+        """
+        with self.conversation_lock(conversation_id):
+            path = self.get_conversation_path(conversation_id)
+            if not os.path.exists(path):
+                raise ValueError(f"Conversation {conversation_id} not found")
+            self._write_snapshot(replay_log(path))
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Create a new conversation.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            New conversation dict
+        """
+        self.ensure_data_dir()
+
+        conversation = new_conversation(conversation_id)
+
+        with self.conversation_lock(conversation_id):
+            self._write_snapshot(conversation)
+            self.index.update(conversation_metadata(conversation))
+
+        return conversation
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation by replaying its log.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict or None if not found
+        """
+        path = self.get_conversation_path(conversation_id)
+
+        if not os.path.exists(path):
+            return None
+
+        return replay_log(path)
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a full conversation, replacing its log with a snapshot.
+
+        Args:
+            conversation: Conversation dict to save
+        """
+        self.ensure_data_dir()
+
+        with self.conversation_lock(conversation["id"]):
+            self._write_snapshot(conversation)
+            self.index.update(conversation_metadata(conversation))
+
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List conversations (metadata only) from the sidecar index.
+
+        Args:
+            limit: Maximum number of conversations to return
+            before: Only return conversations created before this timestamp
+            before_id: With `before`, also return conversations created at
+                exactly `before` whose id sorts before this one
+
+        Returns:
+            List of conversation metadata dicts, newest first
+        """
+        self.ensure_data_dir()
+
+        return self.index.page(limit=limit, before=before, before_id=before_id)
+
+    def apply_changes(self, conversation_id: str, changes: List[Tuple[str, Any]]):
+        """
+        Append a batch of changes as records with a single write and fsync.
+
+        Args:
+            conversation_id: Conversation identifier
+            changes: ("message" | "title" | "summary", value) changes, in order
+        """
+        records = []
+        for kind, value in changes:
+            if kind == "message":
+                records.append({"op": "message", "message": value})
+            elif kind == "title":
+                records.append({"op": "title", "title": value})
+            elif kind == "summary":
+                records.append({"op": "summary", "summary": value})
+            else:
+                raise ValueError(f"Unknown change type '{kind}'")
+
+        with self.conversation_lock(conversation_id):
+            self._append(conversation_id, records)
+
+            meta = self.index.get(conversation_id)
+            if meta is not None:
+                meta = dict(meta)
+                for kind, value in changes:
+                    if kind == "message":
+                        meta["message_count"] += 1
+                    elif kind == "title":
+                        meta["title"] = value
+                self.index.update(meta)
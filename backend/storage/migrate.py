@@ -0,0 +1,75 @@
+"""Copy conversations between storage backends.
+
+Usage:
+    python -m backend.storage.migrate                          # json -> sqlite, paths from config
+    python -m backend.storage.migrate --from json --to sqlite
+    python -m backend.storage.migrate --from json --to jsonl
+    python -m backend.storage.migrate --data-dir data/conversations --path data/conversations.sqlite3
+    python -m backend.storage.migrate --overwrite              # replace conversations already in the target
+"""
+
+import argparse
+import sys
+
+from ..config import get_storage_config
+from .base import StorageBackend
+from . import create_backend
+
+
+def migrate(source: StorageBackend, target: StorageBackend, overwrite: bool = False) -> int:
+    """
+    Copy every conversation from source to target.
+
+    Args:
+        source: Backend to read from
+        target: Backend to write to
+        overwrite: Replace conversations that already exist in the target
+
+    Returns:
+        Number of conversations copied
+    """
+    existing = {item["id"] for item in target.list_conversations()}
+
+    copied = 0
+    for item in source.list_conversations():
+        if item["id"] in existing and not overwrite:
+            continue
+
+        conversation = source.get_conversation(item["id"])
+        if conversation is None:
+            continue
+
+        target.save_conversation(conversation)
+        copied += 1
+
+    return copied
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate conversations between storage backends.")
+    parser.add_argument("--from", dest="source", default="json", help="Source storage type (default: json)")
+    parser.add_argument("--to", dest="target", default="sqlite", help="Target storage type: json, jsonl or sqlite (default: sqlite)")
+    parser.add_argument("--data-dir", help="Override storage.data_dir")
+    parser.add_argument("--path", help="Override storage.path (database file for sqlite)")
+    parser.add_argument("--overwrite", action="store_true", help="Replace conversations already in the target")
+    args = parser.parse_args(argv)
+
+    if args.source == args.target:
+        parser.error("--from and --to must differ")
+
+    storage_config = dict(get_storage_config())
+    if args.data_dir:
+        storage_config["data_dir"] = args.data_dir
+    if args.path:
+        storage_config["path"] = args.path
+
+    source = create_backend(args.source, storage_config)
+    target = create_backend(args.target, storage_config)
+
+    copied = migrate(source, target, overwrite=args.overwrite)
+    print(f"Migrated {copied} conversation(s) from {args.source} to {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
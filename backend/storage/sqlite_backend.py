@@ -0,0 +1,272 @@
+"""SQLite-based storage for conversations.
+
+Conversations, messages and per-model stage results live in separate
+tables, so adding a message is an INSERT instead of a rewrite of the whole
+history. The database runs in WAL mode so readers never block the writer.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from .base import StorageBackend, new_conversation
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_created_at ON conversations(created_at);
+
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT,
+    data TEXT,
+    PRIMARY KEY (conversation_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS stage_results (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    stage INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (conversation_id, seq, stage, position),
+    FOREIGN KEY (conversation_id, seq) REFERENCES messages(conversation_id, seq) ON DELETE CASCADE
+);
+"""
+
+# Message fields stored as rows in stage_results rather than in messages.data
+_STAGE_FIELDS = {"stage1": 1, "stage2": 2}
+
+
+class SqliteStorage(StorageBackend):
+    """Stores conversations in a single SQLite database."""
+
+    appends_in_place = True
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+        # Databases created before rolling summaries lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(conversations)")}
+        if "summary" not in columns:
+            self._conn.execute("ALTER TABLE conversations ADD COLUMN summary TEXT")
+
+        self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Create a new conversation.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            New conversation dict
+        """
+        conversation = new_conversation(conversation_id)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO conversations (id, created_at, title, message_count) VALUES (?, ?, ?, 0)",
+                (conversation["id"], conversation["created_at"], conversation["title"])
+            )
+
+        return conversation
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation from storage.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict or None if not found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, created_at, title, summary FROM conversations WHERE id = ?",
+                (conversation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            message_rows = self._conn.execute(
+                "SELECT seq, role, content, data FROM messages WHERE conversation_id = ? ORDER BY seq",
+                (conversation_id,)
+            ).fetchall()
+            stage_rows = self._conn.execute(
+                "SELECT seq, stage, payload FROM stage_results WHERE conversation_id = ? ORDER BY seq, stage, position",
+                (conversation_id,)
+            ).fetchall()
+
+        stages: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        stage_names = {number: name for name, number in _STAGE_FIELDS.items()}
+        for seq, stage, payload in stage_rows:
+            stages.setdefault(seq, {}).setdefault(stage_names[stage], []).append(json.loads(payload))
+
+        messages = []
+        for seq, role, content, data in message_rows:
+            message: Dict[str, Any] = {"role": role}
+            if content is not None:
+                message["content"] = content
+            if role == "assistant":
+                message["stage1"] = stages.get(seq, {}).get("stage1", [])
+                message["stage2"] = stages.get(seq, {}).get("stage2", [])
+            if data is not None:
+                message.update(json.loads(data))
+            messages.append(message)
+
+        conversation = {
+            "id": row[0],
+            "created_at": row[1],
+            "title": row[2],
+            "messages": messages
+        }
+        if row[3] is not None:
+            conversation["summary"] = json.loads(row[3])
+
+        return conversation
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a full conversation, replacing any stored version.
+
+        Only needed for bulk imports; the message helpers append in place.
+
+        Args:
+            conversation: Conversation dict to save
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation["id"],))
+            self._conn.execute(
+                "INSERT INTO conversations (id, created_at, title, message_count, summary) VALUES (?, ?, ?, 0, ?)",
+                (
+                    conversation["id"],
+                    conversation["created_at"],
+                    conversation.get("title", "New Conversation"),
+                    json.dumps(conversation["summary"]) if conversation.get("summary") else None
+                )
+            )
+            for message in conversation["messages"]:
+                self._append_message(conversation["id"], message)
+
+    def list_conversations(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        before_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List conversations (metadata only).
+
+        Args:
+            limit: Maximum number of conversations to return
+            before: Only return conversations created before this timestamp
+            before_id: With `before`, also return conversations created at
+                exactly `before` whose id sorts before this one
+
+        Returns:
+            List of conversation metadata dicts, newest first
+        """
+        query = "SELECT id, created_at, title, message_count FROM conversations"
+        params: List[Any] = []
+        if before is not None and before_id is not None:
+            query += " WHERE created_at < ? OR (created_at = ? AND id < ?)"
+            params.extend([before, before, before_id])
+        elif before is not None:
+            query += " WHERE created_at < ?"
+            params.append(before)
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        return [
+            {"id": row[0], "created_at": row[1], "title": row[2], "message_count": row[3]}
+            for row in rows
+        ]
+
+    def _append_message(self, conversation_id: str, message: Dict[str, Any]):
+        """Insert one message and its stage rows; caller holds the lock and transaction."""
+        row = self._conn.execute(
+            "SELECT message_count FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        seq = row[0]
+
+        data = {
+            key: value for key, value in message.items()
+            if key not in ("role", "content") and key not in _STAGE_FIELDS
+        }
+        self._conn.execute(
+            "INSERT INTO messages (conversation_id, seq, role, content, data) VALUES (?, ?, ?, ?, ?)",
+            (conversation_id, seq, message["role"], message.get("content"), json.dumps(data) if data else None)
+        )
+
+        for field, stage in _STAGE_FIELDS.items():
+            self._conn.executemany(
+                "INSERT INTO stage_results (conversation_id, seq, stage, position, model, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (conversation_id, seq, stage, position, result.get("model", ""), json.dumps(result))
+                    for position, result in enumerate(message.get(field) or [])
+                ]
+            )
+
+        self._conn.execute(
+            "UPDATE conversations SET message_count = message_count + 1 WHERE id = ?",
+            (conversation_id,)
+        )
+
+    def apply_changes(self, conversation_id: str, changes: List[Tuple[str, Any]]):
+        """
+        Apply a batch of changes in a single transaction.
+
+        Args:
+            conversation_id: Conversation identifier
+            changes: ("message" | "title" | "summary", value) changes, in order
+        """
+        with self._lock, self._conn:
+            for kind, value in changes:
+                if kind == "message":
+                    self._append_message(conversation_id, value)
+                elif kind == "title":
+                    cursor = self._conn.execute(
+                        "UPDATE conversations SET title = ? WHERE id = ?", (value, conversation_id)
+                    )
+                    if cursor.rowcount == 0:
+                        raise ValueError(f"Conversation {conversation_id} not found")
+                elif kind == "summary":
+                    cursor = self._conn.execute(
+                        "UPDATE conversations SET summary = ? WHERE id = ?", (json.dumps(value), conversation_id)
+                    )
+                    if cursor.rowcount == 0:
+                        raise ValueError(f"Conversation {conversation_id} not found")
+                else:
+                    raise ValueError(f"Unknown change type '{kind}'")
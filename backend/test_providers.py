@@ -18,7 +18,7 @@ from typing import Optional
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.providers import list_providers, get_provider
+from backend.providers import list_providers, get_provider, close_http_clients
 from backend.config import get_config, get_provider_config
 
 
@@ -168,6 +168,9 @@ async def main():
     for name in providers_to_test:
         results[name] = await test_single_provider(name)
 
+    # 释放共享连接池
+    await close_http_clients()
+
     # 打印总结
     print("\n" + "=" * 60)
     print("测试总结")
@@ -0,0 +1,180 @@
+"""Local token estimation for prompt budgeting and usage accounting.
+
+Providers tokenize differently and we do not ship their tokenizers, so
+by default tokens are counted with a cheap estimate: about 4 characters per
+token for Latin text and code, and one token per CJK character. A real
+tokenizer can be plugged in with set_tokenizer.
+"""
+
+import re
+from typing import List, Dict, Any, Optional, Callable
+
+# Characters per token for non-CJK text
+_CHARS_PER_TOKEN = 4
+
+# Fixed per-message overhead of chat formatting (role markers etc.)
+_MESSAGE_OVERHEAD = 4
+
+# Function text -> token count, or None for the built-in estimate
+TokenizerFn = Callable[[str], int]
+
+_tokenizer: Optional[TokenizerFn] = None
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])")
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x4E00 <= code <= 0x9FFF      # CJK Unified Ideographs
+        or 0x3400 <= code <= 0x4DBF   # Extension A
+        or 0x3040 <= code <= 0x30FF   # Hiragana, Katakana
+        or 0xAC00 <= code <= 0xD7AF   # Hangul syllables
+        or 0x3000 <= code <= 0x303F   # CJK punctuation
+        or 0xFF00 <= code <= 0xFFEF   # Full-width forms
+    )
+
+
+def set_tokenizer(tokenizer: Optional[TokenizerFn]) -> None:
+    """Plug in a token counting function, e.g. one built on tiktoken (None restores the estimate).
+
+    Budgets still cut texts by characters, so a plugged-in tokenizer makes
+    the counts exact but the cuts only approximately sized.
+    """
+    global _tokenizer
+    _tokenizer = tokenizer
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    if _tokenizer is not None:
+        return _tokenizer(text)
+
+    cjk = sum(1 for char in text if _is_cjk(char))
+    other = len(text) - cjk
+    return cjk + -(-other // _CHARS_PER_TOKEN)
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    Estimate the prompt tokens of a chat message list.
+
+    Args:
+        messages: Chat messages with 'content'
+
+    Returns:
+        Estimated token count
+    """
+    return sum(estimate_tokens(message.get("content") or "") + _MESSAGE_OVERHEAD for message in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = "\n[...]") -> str:
+    """
+    Cut a text down to an estimated token budget.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget, including the marker
+        marker: Appended when the text was cut
+
+    Returns:
+        The text unchanged if it fits, otherwise its longest prefix that
+        fits followed by the marker
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = (max_tokens - estimate_tokens(marker)) * _CHARS_PER_TOKEN
+    if budget <= 0:
+        return ""
+
+    # Budget counted in non-CJK characters; a CJK character costs a whole token
+    for end, char in enumerate(text):
+        budget -= _CHARS_PER_TOKEN if _is_cjk(char) else 1
+        if budget < 0:
+            return text[:end].rstrip() + marker
+
+    return text
+
+
+def extract_to_tokens(text: str, max_tokens: int, marker: str = " [...]") -> str:
+    """
+    Shorten a text to an estimated token budget by dropping sentences.
+
+    The first sentence of every paragraph and line is kept first (they tend
+    to carry the point), then further sentences in reading order while the
+    budget lasts. Dropped runs are replaced by the marker, so the structure
+    of the text stays recognizable, unlike a plain prefix cut.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget, including markers
+        marker: Stands in for each run of dropped sentences
+
+    Returns:
+        The text unchanged if it fits, otherwise the extract
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # (paragraph, line, sentence) units in reading order
+    units = []
+    for p_index, paragraph in enumerate(_PARAGRAPH_BREAK.split(text.strip())):
+        for l_index, line in enumerate(paragraph.splitlines()):
+            sentences = [s.strip() for s in _SENTENCE_BREAK.split(line) if s.strip()]
+            for s_index, sentence in enumerate(sentences):
+                units.append((p_index, l_index, s_index, sentence))
+
+    # Lead sentences first, then the rest, each group in reading order
+    order = sorted(range(len(units)), key=lambda i: (units[i][2] > 0, i))
+    marker_cost = estimate_tokens(marker)
+    budget = max_tokens
+    chosen = set()
+    for i in order:
+        cost = estimate_tokens(units[i][3]) + marker_cost
+        if cost <= budget:
+            chosen.add(i)
+            budget -= cost
+
+    if not chosen:
+        return truncate_to_tokens(text, max_tokens)
+
+    paragraphs: List[str] = []
+    current = ""
+    previous = None
+    for i, (p_index, l_index, _, sentence) in enumerate(units):
+        if previous is None or p_index != previous[0]:
+            if current:
+                paragraphs.append(current)
+            current = ""
+        elif l_index != previous[1] and current and not current.endswith(marker):
+            current += "\n"
+        previous = (p_index, l_index)
+
+        if i in chosen:
+            if current and not current.endswith("\n"):
+                current += " "
+            current += sentence
+        elif not current.endswith(marker):
+            current += marker
+    if current:
+        paragraphs.append(current)
+
+    # Runs of entirely dropped paragraphs collapse into one marker
+    kept: List[str] = []
+    for paragraph in (p.strip() for p in paragraphs):
+        if paragraph == marker.strip() and kept and kept[-1] == paragraph:
+            continue
+        kept.append(paragraph)
+    return "\n\n".join(kept)
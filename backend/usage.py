@@ -0,0 +1,188 @@
+"""Token usage accounting for council runs.
+
+Every stage result carries a 'usage' dict for the model call that produced
+it, so usage is stored with each message. The provider-reported counts are
+used when the response includes them. Otherwise the counts fall back to the
+local estimate (tokens.py) and are flagged as estimated. Responses served
+from the response cache are flagged as cached: their tokens were paid for
+once, by the call that filled the cache. Likewise, responses shared with an
+identical call that was already in flight are flagged as coalesced. Each
+record also names the provider and model that served the call, which differ
+from the seat when the router picked another of its backends.
+
+aggregate_usage() sums the per-call records of a run into per-stage and
+per-model totals for the response metadata. Model calls outside the three
+stages (the conversation title, prompt digests, discarded speculative
+chairman runs) are passed as records grouped by line item; they are
+reported under 'overhead' and included in the totals. The rolling summary
+is updated after the response is sent, so its calls are summed into the
+summary record instead (see add_call_usage()).
+"""
+
+import copy
+from typing import List, Dict, Any, Optional
+
+from .tokens import estimate_tokens
+
+
+def call_usage(prompt_tokens: int, response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Token usage of one model call.
+
+    Args:
+        prompt_tokens: Local estimate of the prompt, made before sending
+        response: Provider response dict ('content', optional 'usage',
+            'cached', 'coalesced', 'provider' and 'model')
+
+    Returns:
+        Dict with prompt_tokens, completion_tokens, total_tokens, the local
+        estimated_prompt_tokens, the 'estimated', 'cached' and 'coalesced'
+        flags, and the serving 'provider' and 'model' (None if unknown)
+    """
+    reported = response.get('usage')
+    if reported:
+        usage = {
+            "prompt_tokens": reported.get("prompt_tokens", 0),
+            "completion_tokens": reported.get("completion_tokens", 0),
+            "total_tokens": reported.get("total_tokens", 0),
+            "estimated": False
+        }
+    else:
+        completion_tokens = estimate_tokens(response.get('content') or "")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "estimated": True
+        }
+
+    usage["estimated_prompt_tokens"] = prompt_tokens
+    usage["cached"] = bool(response.get('cached'))
+    usage["coalesced"] = bool(response.get('coalesced'))
+    usage["provider"] = response.get('provider')
+    usage["model"] = response.get('model')
+    return usage
+
+
+def as_cached(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of a stage result replayed without a model call.
+
+    Its usage record keeps the original counts but is flagged as cached, so
+    aggregate_usage() counts the call without adding its tokens.
+
+    Args:
+        result: Stage result with an optional 'usage' dict
+
+    Returns:
+        The result with a cached usage record (unchanged if it has none)
+    """
+    if not result.get("usage"):
+        return result
+    return dict(result, usage=dict(result["usage"], cached=True))
+
+
+def _empty_totals() -> Dict[str, int]:
+    return {
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "calls": 0,
+        "estimated_calls": 0,
+        "cached_calls": 0,
+        "coalesced_calls": 0
+    }
+
+
+def _add(totals: Dict[str, int], usage: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    if usage.get("estimated"):
+        totals["estimated_calls"] += 1
+    if usage.get("cached"):
+        # Served from the cache: no tokens were spent on this call
+        totals["cached_calls"] += 1
+        return
+    if usage.get("coalesced"):
+        # Shared with an identical call, which is counted with the tokens
+        totals["coalesced_calls"] += 1
+        return
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        totals[key] += usage.get(key, 0)
+
+
+def _add_results(
+    aggregate: Dict[str, Any],
+    group: Dict[str, Dict[str, int]],
+    name: str,
+    results: List[Dict[str, Any]]
+) -> None:
+    totals = group.setdefault(name, _empty_totals())
+    for result in results:
+        usage = result.get("usage")
+        if not usage:
+            continue
+        _add(aggregate["total"], usage)
+        _add(totals, usage)
+        _add(aggregate["models"].setdefault(result["model"], _empty_totals()), usage)
+
+
+def aggregate_usage(
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    stage3_result: Optional[Dict[str, Any]],
+    overhead: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
+    """
+    Sum the token usage of a council run.
+
+    Args:
+        stage1_results: Stage 1 results
+        stage2_results: Stage 2 results
+        stage3_result: Stage 3 result
+        overhead: Other model calls of the run by line item (e.g. 'title',
+            'digest', 'speculation'), each a list of dicts with 'model' and
+            'usage'
+
+    Returns:
+        Dict with 'total', per-stage ('stages'), per-line-item ('overhead')
+        and per-model ('models') totals of prompt, completion and total
+        tokens, plus call counts. Cached and coalesced calls are counted but
+        add no tokens.
+    """
+    aggregate: Dict[str, Any] = {"total": _empty_totals(), "stages": {}, "overhead": {}, "models": {}}
+
+    stage_results = {
+        "stage1": stage1_results,
+        "stage2": stage2_results,
+        "stage3": [stage3_result] if stage3_result else []
+    }
+    for stage, results in stage_results.items():
+        _add_results(aggregate, aggregate["stages"], stage, results)
+
+    return add_call_usage(aggregate, overhead or {})
+
+
+def add_call_usage(
+    aggregate: Optional[Dict[str, Any]],
+    overhead: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    Add model calls to a usage aggregate as 'overhead' line items.
+
+    Args:
+        aggregate: Result of aggregate_usage() (not modified), or None to
+            start from zero
+        overhead: Model calls by line item, each a list of dicts with
+            'model' and 'usage'
+
+    Returns:
+        A new aggregate that includes the calls
+    """
+    if aggregate is None:
+        aggregate = aggregate_usage([], [], None)
+    aggregate = copy.deepcopy(aggregate)
+    aggregate.setdefault("overhead", {})
+    for name, results in overhead.items():
+        if results:
+            _add_results(aggregate, aggregate["overhead"], name, results)
+    return aggregate
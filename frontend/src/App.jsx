@@ -4,6 +4,17 @@ import ChatInterface from './components/ChatInterface';
 import { api } from './api';
 import './App.css';
 
+/**
+ * Replace the last message of a conversation with update(lastMessage).
+ * State updaters must not mutate the previous state: StrictMode runs them
+ * twice in development, which would apply each streamed delta twice.
+ */
+function withLastMessage(conversation, update) {
+  const messages = [...conversation.messages];
+  messages[messages.length - 1] = update(messages[messages.length - 1]);
+  return { ...conversation, messages };
+}
+
 function App() {
   const [conversations, setConversations] = useState([]);
   const [currentConversationId, setCurrentConversationId] = useState(null);
@@ -101,6 +112,36 @@ function App() {
             });
             break;
 
+          case 'stage1_delta':
+            setCurrentConversation((prev) =>
+              withLastMessage(prev, (lastMsg) => {
+                const stage1 = [...(lastMsg.stage1 || [])];
+                const index = stage1.findIndex((r) => r.model === event.model);
+                if (index === -1) {
+                  stage1.push({ model: event.model, response: event.delta });
+                } else {
+                  stage1[index] = {
+                    ...stage1[index],
+                    response: stage1[index].response + event.delta,
+                  };
+                }
+                return { ...lastMsg, stage1 };
+              })
+            );
+            break;
+
+          case 'stage1_model_complete':
+            setCurrentConversation((prev) =>
+              withLastMessage(prev, (lastMsg) => ({
+                ...lastMsg,
+                stage1: [
+                  ...(lastMsg.stage1 || []).filter((r) => r.model !== event.data.model),
+                  event.data,
+                ],
+              }))
+            );
+            break;
+
           case 'stage1_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -120,6 +161,15 @@ function App() {
             });
             break;
 
+          case 'stage2_model_complete':
+            setCurrentConversation((prev) =>
+              withLastMessage(prev, (lastMsg) => ({
+                ...lastMsg,
+                stage2: [...(lastMsg.stage2 || []), event.data],
+              }))
+            );
+            break;
+
           case 'stage2_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -140,6 +190,18 @@ function App() {
             });
             break;
 
+          case 'stage3_delta':
+            setCurrentConversation((prev) =>
+              withLastMessage(prev, (lastMsg) => ({
+                ...lastMsg,
+                stage3: {
+                  model: event.model,
+                  response: (lastMsg.stage3?.response || '') + event.delta,
+                },
+              }))
+            );
+            break;
+
           case 'stage3_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -6,10 +6,21 @@ const API_BASE = 'http://localhost:8001';
 
 export const api = {
   /**
-   * List all conversations.
+   * List conversations, newest first.
+   * @param {Object} [options]
+   * @param {number} [options.limit] - Page size (all conversations if omitted)
+   * @param {string} [options.before] - created_at of the last item of the previous page
+   * @param {string} [options.beforeId] - id of the last item of the previous page
    */
-  async listConversations() {
-    const response = await fetch(`${API_BASE}/api/conversations`);
+  async listConversations({ limit, before, beforeId } = {}) {
+    const params = new URLSearchParams();
+    if (limit) params.set('limit', limit);
+    if (before) params.set('before', before);
+    if (beforeId) params.set('before_id', beforeId);
+    const query = params.toString();
+    const response = await fetch(
+      `${API_BASE}/api/conversations${query ? `?${query}` : ''}`
+    );
     if (!response.ok) {
       throw new Error('Failed to list conversations');
     }
@@ -91,13 +102,17 @@ export const api = {
 
     const reader = response.body.getReader();
     const decoder = new TextDecoder();
+    // Token delta events are small and frequent, so an event can be split
+    // across reads; keep the trailing partial line until the next chunk.
+    let buffer = '';
 
     while (true) {
       const { done, value } = await reader.read();
       if (done) break;
 
-      const chunk = decoder.decode(value);
-      const lines = chunk.split('\n');
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
 
       for (const line of lines) {
         if (line.startsWith('data: ')) {
@@ -0,0 +1,87 @@
+"""Tests for the response cache."""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import cache, council  # noqa: E402
+from backend.cache import MemoryCache, cached_query, cached_stream  # noqa: E402
+from backend.config import ModelRef, Seat  # noqa: E402
+from backend.providers import router  # noqa: E402
+from backend.providers.singleflight import with_singleflight  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Why is the sky blue?"}]
+
+
+class CoalescedResponseTest(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesced_flag_is_not_cached(self):
+        calls = []
+
+        async def query_fn(model, messages, api_url, api_key, **kwargs):
+            calls.append(model)
+            await asyncio.sleep(0.05)
+            return {"content": "Rayleigh scattering", "usage": {"total_tokens": 10}}
+
+        response_cache = MemoryCache()
+        query_model = cached_query("test-provider", with_singleflight("test-provider", query_fn))
+        with mock.patch.object(cache, "get_response_cache", return_value=response_cache):
+            leader, follower = await asyncio.gather(
+                query_model("m", MESSAGES, "http://x", "k"),
+                query_model("m", MESSAGES, "http://x", "k")
+            )
+            hit = await query_model("m", MESSAGES, "http://x", "k")
+
+        self.assertEqual(len(calls), 1)
+        self.assertNotIn("coalesced", leader)
+        self.assertTrue(follower["coalesced"])
+        self.assertTrue(hit["cached"])
+        self.assertNotIn("coalesced", hit)
+
+
+# A non-streaming OpenRouter response carries structured reasoning
+REASONING = [{"type": "reasoning.text", "text": "Short wavelengths "}, {"type": "reasoning.text", "text": "scatter more."}]
+SEAT = Seat("m", (ModelRef("test-provider", "m"),))
+
+
+async def _query_fn(model, messages, api_url, api_key, **kwargs):
+    return {"content": "Rayleigh scattering", "reasoning_details": REASONING, "usage": None}
+
+
+async def _stream_fn(model, messages, api_url, api_key, **kwargs):
+    yield {"content": "Rayleigh scattering", "reasoning_details": "Short wavelengths scatter more."}
+
+
+class StreamReplayTest(unittest.IsolatedAsyncioTestCase):
+    async def _stream_seat(self, provider):
+        deltas = []
+        with mock.patch.object(router, "_backend_call", return_value=(provider, "http://x", "k")):
+            result = await council._query_model_streaming(SEAT, MESSAGES, lambda model, text: deltas.append(text))
+        return result, deltas
+
+    async def test_cached_query_response_replays_through_stream(self):
+        response_cache = MemoryCache()
+        with mock.patch.object(cache, "get_response_cache", return_value=response_cache):
+            await cached_query("test-provider", _query_fn)("m", MESSAGES, "http://x", "k")
+            result, deltas = await self._stream_seat(
+                {"query_model": _query_fn, "stream_model": cached_stream("test-provider", _stream_fn)}
+            )
+
+        self.assertIsNotNone(result)
+        self.assertTrue(result["cached"])
+        self.assertEqual(result["reasoning_details"], "Short wavelengths scatter more.")
+        self.assertEqual(deltas, ["Rayleigh scattering"])
+
+    async def test_query_fallback_replays_through_stream(self):
+        result, deltas = await self._stream_seat({"query_model": _query_fn, "stream_model": None})
+
+        self.assertIsNotNone(result)
+        self.assertEqual(result["reasoning_details"], "Short wavelengths scatter more.")
+        self.assertEqual(deltas, ["Rayleigh scattering"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for the budgeted chairman prompt."""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import council  # noqa: E402
+
+LABELS = {"Response A": "m1", "Response B": "m2"}
+STAGE1 = [{"model": model, "response": f"Answer of {model}. " * 400} for model in LABELS.values()]
+STAGE2 = [
+    {
+        "model": model,
+        "ranking": "Response A is thorough. Response B is brief. " * 100 + "\nFINAL RANKING:\n1. Response A\n2. Response B",
+        "parsed_ranking": ["Response A", "Response B"]
+    }
+    for model in LABELS.values()
+]
+
+
+SHORT_STAGE2 = [dict(result, ranking="Response A is thorough.\nFINAL RANKING:\n1. Response A\n2. Response B") for result in STAGE2]
+
+
+class ChairmanBudgetTest(unittest.TestCase):
+    def _prepare(self, stage2=STAGE2, **budget):
+        config = dict({"enabled": True, "top_k": 2, "mode": "truncate"}, **budget)
+        with mock.patch.object(council, "get_chairman_prompt_config", return_value=config):
+            return asyncio.run(council.prepare_chairman_prompt("Which is better?", STAGE1, stage2, LABELS))
+
+    def test_critique_budget_is_capped_at_max_tokens(self):
+        prompt, selection = self._prepare(max_tokens=300, critique_tokens=1000)
+        capped_prompt, _ = self._prepare(max_tokens=300, critique_tokens=300)
+
+        self.assertEqual(prompt, capped_prompt)
+        self.assertEqual(selection["condensed"], ["m1", "m2"])
+
+    def test_responses_get_the_budget_critiques_leave_over(self):
+        prompt, _ = self._prepare(stage2=SHORT_STAGE2, max_tokens=2000, critique_tokens=1500)
+
+        # Short critiques leave most of the 2000 tokens to the two responses
+        self.assertGreater(prompt.count("Answer of m1"), 200)
+        self.assertGreater(prompt.count("Answer of m2"), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests for multi-turn conversation context."""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import context  # noqa: E402
+from backend.context import ConversationContext, completed_turns, turns_to_summarize  # noqa: E402
+
+
+def _conversation(*turns):
+    messages = []
+    for question, stage3 in turns:
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "stage1": [], "stage2": [], "stage3": stage3})
+    return {"messages": messages}
+
+
+CONVERSATION = _conversation(
+    ("Why is the sky blue?", {"model": "c", "response": "Rayleigh scattering."}),
+    ("And at sunset?", {"model": "c", "response": "Error: Unable to generate final synthesis.", "error": True}),
+    ("Why are clouds white?", {"model": "c", "response": "Mie scattering."})
+)
+
+
+class FailedTurnTest(unittest.TestCase):
+    def test_failed_turns_are_skipped(self):
+        self.assertEqual(completed_turns(CONVERSATION), [
+            ("Why is the sky blue?", "Rayleigh scattering."),
+            ("Why are clouds white?", "Mie scattering.")
+        ])
+
+    def test_failed_turns_are_not_summarized(self):
+        _, turns, covered = turns_to_summarize(CONVERSATION, ("Why is snow white?", "Scattering."))
+        self.assertNotIn("And at sunset?", [question for question, _ in turns])
+        self.assertEqual(covered, 3)
+
+    def test_failed_turns_are_not_in_the_context(self):
+        with mock.patch.object(context, "get_context_config", return_value={}):
+            packed = ConversationContext.from_conversation(CONVERSATION)
+        self.assertEqual(len(packed.turns), 2)
+
+
+class DefaultsTest(unittest.TestCase):
+    def test_summary_is_opt_in(self):
+        with mock.patch.object(context, "get_context_config", return_value={}):
+            self.assertTrue(context.is_context_enabled())
+            self.assertFalse(context.is_summary_enabled())
+        with mock.patch.object(context, "get_context_config", return_value={"summarize": True}):
+            self.assertTrue(context.is_summary_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
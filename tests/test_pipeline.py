@@ -0,0 +1,129 @@
+"""Tests for the pipelined Stage 2 / Stage 3 run."""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import council  # noqa: E402
+from backend.usage import aggregate_usage  # noqa: E402
+
+USAGE = {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+
+
+COUNCIL = ["m1", "m2", "m3"]
+LABELS = {"Response A": "m1", "Response B": "m2", "Response C": "m3"}
+STAGE1 = [{"model": model, "response": f"answer of {model}"} for model in COUNCIL]
+
+
+def _ranking(model, order):
+    return {"model": model, "ranking": "FINAL RANKING:\n" + "\n".join(order), "parsed_ranking": order, "usage": USAGE}
+
+
+# The first ranking puts m1 on top; the late ones keep it there or move m3 there
+SAME_TOP = ["Response A", "Response C", "Response B"]
+CHANGED_TOP = ["Response C", "Response B", "Response A"]
+
+
+async def _rankings(late_order):
+    yield _ranking("m1", ["Response A", "Response B", "Response C"])
+    await asyncio.sleep(0.05)
+    yield _ranking("m2", late_order)
+    yield _ranking("m3", late_order)
+
+
+async def _prepare_ranking_prompt(user_query, stage1_results, context=None):
+    return "ranking prompt", LABELS, None
+
+
+class PipelineTestCase(unittest.IsolatedAsyncioTestCase):
+    async def _run(self, query_seat, late_order=CHANGED_TOP, on_stage2_complete=None):
+        config = {"pipeline": {"enabled": True, "min_rankings": 1, "top_k": 1}}
+        with mock.patch.object(council, "COUNCIL_MODELS", COUNCIL), \
+                mock.patch.object(council, "get_council_config", return_value=config), \
+                mock.patch.object(council, "get_chairman_prompt_config", return_value={}), \
+                mock.patch.object(council, "prepare_ranking_prompt", _prepare_ranking_prompt), \
+                mock.patch.object(council, "stage2_iter_rankings", lambda prompt: _rankings(late_order)), \
+                mock.patch.object(council, "_query_seat", query_seat):
+            deltas = []
+            result = await council.run_pipelined_stages(
+                "Why is the sky blue?", STAGE1, on_stage2_complete=on_stage2_complete,
+                on_stage3_delta=lambda model, delta: deltas.append(delta)
+            )
+        return result, deltas
+
+
+class DiscardedSpeculationTest(PipelineTestCase):
+    async def test_cancelled_speculation_is_counted(self):
+        started = []
+
+        async def query_seat(seat, messages, on_delta=None, **kwargs):
+            started.append(seat.model)
+            if len(started) == 1:
+                on_delta(seat.model, "Rayleigh scattering makes ")
+                await asyncio.sleep(10)
+            return {"content": "Rayleigh scattering.", "usage": USAGE}
+
+        (_, _, _, stage3_result, pipeline_info, _), deltas = await self._run(query_seat)
+
+        self.assertFalse(pipeline_info["kept"])
+        self.assertEqual(deltas, [])
+        [call] = pipeline_info["calls"]
+        self.assertTrue(call["usage"]["estimated"])
+        self.assertGreater(call["usage"]["prompt_tokens"], 0)
+        self.assertGreater(call["usage"]["completion_tokens"], 0)
+
+        usage = aggregate_usage(STAGE1, [], stage3_result, council.overhead_calls(None, None, pipeline_info))
+        self.assertEqual(usage["overhead"]["speculation"]["calls"], 1)
+        self.assertEqual(usage["stages"]["stage3"]["total_tokens"], 150)
+
+    async def test_finished_speculation_is_counted(self):
+        async def query_seat(seat, messages, on_delta=None, **kwargs):
+            return {"content": "Rayleigh scattering.", "usage": USAGE}
+
+        (_, _, _, _, pipeline_info, _), _ = await self._run(query_seat)
+
+        self.assertFalse(pipeline_info["kept"])
+        self.assertEqual([call["usage"]["total_tokens"] for call in pipeline_info["calls"]], [150])
+
+
+class SpeculationOutcomeTest(PipelineTestCase):
+    async def test_failed_speculation_is_not_kept(self):
+        prompts = []
+
+        async def query_seat(seat, messages, on_delta=None, **kwargs):
+            prompts.append(messages[0]["content"])
+            if len(prompts) == 1:
+                return None
+            return {"content": "Rayleigh scattering.", "usage": USAGE}
+
+        (_, _, _, stage3_result, pipeline_info, _), _ = await self._run(query_seat, late_order=SAME_TOP)
+
+        self.assertEqual(len(prompts), 2)
+        self.assertFalse(pipeline_info["kept"])
+        self.assertNotIn("error", stage3_result)
+        self.assertEqual(stage3_result["response"], "Rayleigh scattering.")
+
+    async def test_failing_callback_cancels_speculation(self):
+        cancelled = asyncio.Event()
+
+        async def query_seat(seat, messages, on_delta=None, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        def on_stage2_complete(stage2_results, label_to_model, aggregate_rankings):
+            raise RuntimeError("client went away")
+
+        with self.assertRaises(RuntimeError):
+            await self._run(query_seat, late_order=SAME_TOP, on_stage2_complete=on_stage2_complete)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for the model request scheduler."""
+
+import asyncio
+import os
+import time
+import unittest
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend.providers import scheduler  # noqa: E402
+from backend.providers.retry import classify_error  # noqa: E402
+from backend.providers.scheduler import (  # noqa: E402
+    AdmissionTimeout, schedule, with_scheduler, with_stream_scheduler
+)
+
+PROVIDER = "test-provider"
+
+
+class AdmissionDeadlineTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._saved_scopes = dict(scheduler._scopes)
+
+    def tearDown(self):
+        scheduler._scopes.clear()
+        scheduler._scopes.update(self._saved_scopes)
+
+    def _limit(self, model, **limits):
+        scheduler._scopes[PROVIDER] = scheduler._Scope({})
+        scheduler._scopes[(PROVIDER, model)] = scheduler._Scope(limits)
+        return scheduler._scopes[(PROVIDER, model)]
+
+    async def _hold_slot(self, seconds):
+        async def hold():
+            async with schedule(PROVIDER, "m", 10):
+                await asyncio.sleep(seconds)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        return holder
+
+    async def test_slot_wait_is_bounded_by_timeout(self):
+        scope = self._limit("m", max_concurrency=1)
+        async with schedule(PROVIDER, "m", 10):
+            started = time.monotonic()
+            with self.assertRaises(AdmissionTimeout):
+                async with schedule(PROVIDER, "m", 10, timeout=0.05):
+                    pass
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(scope.slots.waiting, 0)
+
+        self.assertEqual(scope.slots.active, 0)
+        async with schedule(PROVIDER, "m", 10, timeout=0.05):
+            self.assertEqual(scope.slots.active, 1)
+
+    async def test_rate_wait_past_timeout_fails_fast(self):
+        scope = self._limit("m", rpm=1)
+        async with schedule(PROVIDER, "m", 10):
+            pass
+
+        started = time.monotonic()
+        with self.assertRaises(AdmissionTimeout):
+            async with schedule(PROVIDER, "m", 10, timeout=5):
+                pass
+        self.assertLess(time.monotonic() - started, 0.5)
+        # The rejected request took no quota
+        self.assertGreater(scope.rpm.tokens, -0.5)
+
+    async def test_without_timeout_waits_for_a_slot(self):
+        self._limit("m", max_concurrency=1)
+        holder = await self._hold_slot(0.05)
+        async with schedule(PROVIDER, "m", 10):
+            self.assertTrue(holder.done())
+
+    async def test_queue_time_is_charged_to_the_call_timeout(self):
+        self._limit("m", max_concurrency=1)
+        timeouts = []
+
+        async def query_fn(model, messages, api_url, api_key, timeout=None):
+            timeouts.append(timeout)
+            return {"content": "ok"}
+
+        query_model = with_scheduler(PROVIDER, query_fn)
+        holder = await self._hold_slot(0.2)
+        await query_model("m", [{"role": "user", "content": "hi"}], "http://x", "k", timeout=1.0)
+        await holder
+
+        self.assertLess(timeouts[0], 0.85)
+        self.assertGreater(timeouts[0], 0.5)
+
+    async def test_queue_time_is_charged_to_the_stream_timeout(self):
+        self._limit("m", max_concurrency=1)
+        timeouts = []
+
+        async def stream_fn(model, messages, api_url, api_key, timeout=None):
+            timeouts.append(timeout)
+            yield {"content": "ok"}
+
+        stream_model = with_stream_scheduler(PROVIDER, stream_fn)
+        holder = await self._hold_slot(0.2)
+        async for _ in stream_model("m", [{"role": "user", "content": "hi"}], "http://x", "k", timeout=1.0):
+            pass
+        await holder
+
+        self.assertLess(timeouts[0], 0.85)
+
+    def test_admission_timeout_is_retryable(self):
+        self.assertEqual(classify_error(AdmissionTimeout("no admission")), "timeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
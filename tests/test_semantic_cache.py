@@ -0,0 +1,143 @@
+"""Tests for the semantic cache's matching rules."""
+
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import council, semantic_cache  # noqa: E402
+from backend.semantic_cache import BruteForceIndex, SemanticCache, hashing_embedding  # noqa: E402
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def _bundle(answer):
+    return ([{"model": "m", "response": answer}], [], {"model": "m", "response": answer}, {})
+
+
+# Questions that share almost all their words but need different answers
+NEAR_MISSES = [
+    ("What is the sum of all even numbers from 1 to 100?",
+     "What is the sum of all odd numbers from 1 to 100?"),
+    ("How should I start investing for retirement at age 25?",
+     "How should I start investing for retirement at age 65?"),
+    ("How do I configure nginx as a reverse proxy for a Node.js app on port 3000?",
+     "How do I configure nginx as a reverse proxy for a Django app on port 8000?"),
+    ("How do I convert USD to EUR?",
+     "How do I convert EUR to USD?"),
+]
+
+
+class DefaultEmbeddingTest(unittest.TestCase):
+    def test_near_misses_do_not_hit(self):
+        for stored, asked in NEAR_MISSES:
+            with self.subTest(asked=asked):
+                cache = SemanticCache()
+                cache.store(stored, _bundle("answer"))
+                self.assertIsNone(cache.lookup(asked))
+
+    def test_near_misses_do_not_hit_at_threshold_zero(self):
+        cache = SemanticCache(threshold=0.0)
+        for stored, _ in NEAR_MISSES:
+            cache.store(stored, _bundle(stored))
+        for _, asked in NEAR_MISSES:
+            with self.subTest(asked=asked):
+                self.assertIsNone(cache.lookup(asked))
+
+    def test_formatting_variant_hits(self):
+        cache = SemanticCache()
+        cache.store("What is the sum of all even numbers from 1 to 100?", _bundle("2550"))
+
+        hit = cache.lookup("  what is the SUM of all even numbers from 1 to 100 ")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit["bundle"][2]["response"], "2550")
+
+    def test_custom_embedding_uses_threshold_only(self):
+        cache = SemanticCache(embedding_fn=hashing_embedding, threshold=0.9)
+        stored, asked = NEAR_MISSES[0]
+        cache.store(stored, _bundle("answer"))
+
+        self.assertFalse(cache.exact_words)
+        self.assertIsNotNone(cache.lookup(asked))
+
+
+class BoundedIndex(BruteForceIndex):
+    """Brute-force index that, like hnswlib, rejects vectors beyond its capacity."""
+
+    def __init__(self, dim, max_entries):
+        super().__init__(dim, max_entries)
+        self.max_entries = max_entries
+
+    def add(self, key, vector):
+        if len(self._vectors) >= self.max_entries:
+            raise RuntimeError("The number of elements exceeds the specified limit")
+        super().add(key, vector)
+
+
+class EvictionTest(unittest.TestCase):
+    def _fill_past_capacity(self, index):
+        cache = SemanticCache(max_entries=3, index=index)
+        for i in range(10):
+            cache.store(f"question {i}", _bundle(f"answer {i}"))
+        return cache
+
+    def _assert_keeps_newest(self, cache):
+        self.assertEqual(len(cache._entries), 3)
+        self.assertIsNone(cache.lookup("question 6"))
+        self.assertEqual(cache.lookup("question 9")["bundle"][2]["response"], "answer 9")
+
+    def test_full_bounded_index_accepts_new_entries(self):
+        with mock.patch.dict(semantic_cache._INDEXES, {"bounded": BoundedIndex}):
+            self._assert_keeps_newest(self._fill_past_capacity("bounded"))
+
+    @unittest.skipIf(hnswlib is None, "hnswlib is not installed")
+    def test_full_hnsw_index_accepts_new_entries(self):
+        self._assert_keeps_newest(self._fill_past_capacity("hnsw"))
+
+
+class CacheHitUsageTest(unittest.TestCase):
+    def test_hit_reports_no_token_spend(self):
+        usage = {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150, "estimated": False}
+        stage1 = [{"model": "m", "response": "Rayleigh scattering", "usage": usage}]
+        stage3 = {"model": "c", "response": "Rayleigh scattering.", "usage": usage}
+        metadata = {"usage": council.aggregate_usage(stage1, [], stage3)}
+
+        cache = SemanticCache()
+        cache.store("Why is the sky blue?", (stage1, [], stage3, metadata))
+        with mock.patch.object(council, "get_semantic_cache", return_value=cache):
+            _, _, _, hit_metadata = council.lookup_semantic_cache("why is the sky blue")
+
+        total = hit_metadata["usage"]["total"]
+        self.assertEqual((total["total_tokens"], total["calls"], total["cached_calls"]), (0, 2, 2))
+        # The stored run is left as it was
+        self.assertEqual(metadata["usage"]["total"]["total_tokens"], 300)
+        self.assertNotIn("cached", stage1[0]["usage"])
+
+
+class StoreResultTest(unittest.TestCase):
+    def _store(self, bundle):
+        cache = SemanticCache()
+        with mock.patch.object(council, "get_semantic_cache", return_value=cache):
+            council.store_semantic_cache("Why is the sky blue?", bundle, None)
+        return cache
+
+    def test_successful_run_is_stored(self):
+        self.assertEqual(self._store(_bundle("Rayleigh scattering")).stats["stores"], 1)
+
+    def test_chairman_failure_is_not_stored(self):
+        stage1, stage2, _, metadata = _bundle("Rayleigh scattering")
+        stage3 = {"model": "m", "response": "Error: Unable to generate final synthesis.", "error": True}
+        self.assertEqual(self._store((stage1, stage2, stage3, metadata)).stats["stores"], 0)
+
+    def test_empty_stage1_is_not_stored(self):
+        _, stage2, stage3, metadata = _bundle("Rayleigh scattering")
+        self.assertEqual(self._store(([], stage2, stage3, metadata)).stats["stores"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
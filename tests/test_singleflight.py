@@ -0,0 +1,84 @@
+"""Tests for coalescing identical in-flight requests."""
+
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend.providers.singleflight import with_singleflight, with_stream_singleflight  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Why is the sky blue?"}]
+
+
+class CancelledFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_new_caller_does_not_join_a_cancelled_query(self):
+        calls = []
+
+        async def query_fn(model, messages, api_url, api_key, **kwargs):
+            calls.append(model)
+            try:
+                await asyncio.sleep(0.1 if len(calls) > 1 else 10)
+            except asyncio.CancelledError:
+                # Slow cleanup: the task is still running after cancel()
+                await asyncio.sleep(0.1)
+                raise
+            return {"content": "Rayleigh scattering"}
+
+        query_model = with_singleflight("test-provider", query_fn)
+        leader = asyncio.create_task(query_model("m", MESSAGES, "http://x", "k"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+
+        result = await query_model("m", MESSAGES, "http://x", "k")
+        self.assertEqual(result, {"content": "Rayleigh scattering"})
+        self.assertEqual(len(calls), 2)
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+
+    async def test_new_caller_does_not_join_a_cancelled_stream(self):
+        calls = []
+
+        async def stream_fn(model, messages, api_url, api_key, **kwargs):
+            calls.append(model)
+            yield {"content": "Rayleigh "}
+            try:
+                await asyncio.sleep(0.1 if len(calls) > 1 else 10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.1)
+                raise
+            yield {"content": "scattering"}
+
+        stream_model = with_stream_singleflight("test-provider", stream_fn)
+
+        async def read():
+            return [chunk["content"] async for chunk in stream_model("m", MESSAGES, "http://x", "k")]
+
+        leader = asyncio.create_task(read())
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(await read(), ["Rayleigh ", "scattering"])
+        self.assertEqual(len(calls), 2)
+
+    async def test_cancelled_upstream_fails_followers(self):
+        async def stream_fn(model, messages, api_url, api_key, **kwargs):
+            yield {"content": "Rayleigh "}
+            await asyncio.sleep(0.05)
+            raise asyncio.CancelledError()
+
+        stream_model = with_stream_singleflight("test-provider", stream_fn)
+
+        async def read():
+            return [chunk["content"] async for chunk in stream_model("m", MESSAGES, "http://x", "k")]
+
+        results = await asyncio.gather(read(), read(), return_exceptions=True)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+"""Tests for conversation storage backends."""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend.storage import aio, json_backend, jsonl_backend  # noqa: E402
+from backend.storage.cached_backend import CachedStorage  # noqa: E402
+from backend.storage.compact import BlobStore, CompactStorage  # noqa: E402
+from backend.storage.base import new_conversation  # noqa: E402
+from backend.storage.json_backend import JsonStorage  # noqa: E402
+from backend.storage.jsonl_backend import JsonlStorage  # noqa: E402
+from backend.storage.sqlite_backend import SqliteStorage  # noqa: E402
+
+
+def _turn(storage, conversation_id):
+    """The storage calls of one council turn."""
+    storage.get_conversation(conversation_id)
+    storage.add_user_message(conversation_id, "Why is the sky blue?")
+    storage.add_assistant_message(
+        conversation_id,
+        [{"model": "m", "response": "Rayleigh scattering " * 100}],
+        [],
+        {"model": "m", "response": "Rayleigh scattering."}
+    )
+    storage.update_conversation_title(conversation_id, "Blue sky")
+    storage.get_conversation(conversation_id)
+
+
+class CachedJsonStorageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _count_loads(self, storage):
+        storage.create_conversation("c1")
+        with mock.patch.object(json_backend.json, "load", wraps=json.load) as load:
+            _turn(storage, "c1")
+        return load.call_count
+
+    def test_cached_turn_does_not_parse_the_file(self):
+        storage = CachedStorage(JsonStorage(self.data_dir))
+        self.assertEqual(self._count_loads(storage), 0)
+
+        stored = JsonStorage(self.data_dir).get_conversation("c1")
+        self.assertEqual(stored["title"], "Blue sky")
+        self.assertEqual([m["role"] for m in stored["messages"]], ["user", "assistant"])
+        self.assertEqual(storage.get_conversation("c1"), stored)
+
+    def test_cached_compact_turn_does_not_parse_the_file(self):
+        blob_store = BlobStore(os.path.join(self.data_dir, "blobs"))
+        storage = CachedStorage(CompactStorage(JsonStorage(self.data_dir), blob_store, min_size=64))
+        self.assertEqual(self._count_loads(storage), 0)
+
+        stored = JsonStorage(self.data_dir).get_conversation("c1")
+        self.assertIn("$blob", json.dumps(stored["messages"][1]["stage1"]))
+        self.assertEqual(storage.get_conversation("c1"), stored)
+
+    def test_uncached_conversation_is_parsed_once_per_batch(self):
+        JsonStorage(self.data_dir).create_conversation("c1")
+        storage = CachedStorage(JsonStorage(self.data_dir), max_conversations=0)
+        with mock.patch.object(json_backend.json, "load", wraps=json.load) as load:
+            storage.add_user_message("c1", "Why is the sky blue?")
+        self.assertEqual(load.call_count, 1)
+
+
+class ListConversationsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _backends(self):
+        return [JsonStorage(self.data_dir), SqliteStorage(os.path.join(self.data_dir, "db", "c.sqlite3"))]
+
+    def _page_all(self, storage, limit):
+        ids, before, before_id = [], None, None
+        while True:
+            page = storage.list_conversations(limit=limit, before=before, before_id=before_id)
+            if not page:
+                return ids
+            ids += [item["id"] for item in page]
+            before, before_id = page[-1]["created_at"], page[-1]["id"]
+
+    def test_pages_do_not_skip_conversations_sharing_a_timestamp(self):
+        for storage in self._backends():
+            with self.subTest(backend=type(storage).__name__):
+                for i, created_at in enumerate(["2026-01-01T00:00:00"] * 5 + ["2026-01-02T00:00:00"]):
+                    storage.save_conversation(dict(new_conversation(f"c{i}"), created_at=created_at))
+
+                self.assertEqual(self._page_all(storage, limit=2), ["c5", "c4", "c3", "c2", "c1", "c0"])
+
+    def test_index_log_is_compacted_past_threshold(self):
+        storage = JsonStorage(self.data_dir)
+        storage.create_conversation("c1")
+        with mock.patch.object(json_backend, "INDEX_COMPACT_MIN_LINES", 10):
+            for i in range(50):
+                storage.update_conversation_title("c1", f"title {i}")
+
+        with open(storage.index.path) as f:
+            lines = f.readlines()
+        self.assertLessEqual(len(lines), 10)
+        self.assertEqual(json.loads(lines[-1])["title"], "title 49")
+        # A fresh index replays the compacted log
+        self.assertEqual(json_backend.MetadataIndex(self.data_dir).get("c1")["title"], "title 49")
+
+
+USAGE = {"total": {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150, "calls": 2}}
+
+
+class AssistantUsageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _backends(self):
+        blob_store = BlobStore(os.path.join(self.data_dir, "blobs"))
+        return [
+            JsonStorage(os.path.join(self.data_dir, "json")),
+            SqliteStorage(os.path.join(self.data_dir, "db", "c.sqlite3")),
+            CompactStorage(JsonStorage(os.path.join(self.data_dir, "compact")), blob_store, min_size=64),
+            CachedStorage(JsonStorage(os.path.join(self.data_dir, "cached")))
+        ]
+
+    def test_usage_is_stored_on_the_assistant_message(self):
+        for storage in self._backends():
+            with self.subTest(backend=type(storage).__name__):
+                storage.create_conversation("c1")
+                storage.add_assistant_message("c1", [], [], {"model": "m", "response": "ok"}, USAGE)
+                storage.add_assistant_message("c1", [], [], {"model": "m", "response": "ok"})
+
+                first, second = storage.get_conversation("c1")["messages"]
+                self.assertEqual(first["usage"], USAGE)
+                self.assertNotIn("usage", second)
+
+
+class JsonlStorageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _log_lines(self, conversation_id):
+        with open(JsonlStorage(self.data_dir).get_conversation_path(conversation_id)) as f:
+            return f.readlines()
+
+    def test_compaction_count_survives_a_restart(self):
+        JsonlStorage(self.data_dir, compact_every=5).create_conversation("c1")
+        for i in range(3):
+            JsonlStorage(self.data_dir, compact_every=5).add_user_message("c1", f"question {i}")
+        self.assertEqual(len(self._log_lines("c1")), 4)
+
+        storage = JsonlStorage(self.data_dir, compact_every=5)
+        storage.add_user_message("c1", "question 3")
+        storage.add_user_message("c1", "question 4")
+
+        self.assertEqual(len(self._log_lines("c1")), 1)
+        self.assertEqual(len(storage.get_conversation("c1")["messages"]), 5)
+
+    def test_slow_append_does_not_block_other_conversations(self):
+        storage = JsonlStorage(self.data_dir)
+        storage.create_conversation("c1")
+        storage.create_conversation("c2")
+
+        entered, release = threading.Event(), threading.Event()
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            if threading.current_thread() is not threading.main_thread():
+                entered.set()
+                release.wait(5)
+            fsync(fd)
+
+        with mock.patch.object(jsonl_backend.os, "fsync", slow_fsync):
+            writer = threading.Thread(target=storage.add_user_message, args=("c1", "slow"))
+            writer.start()
+            try:
+                self.assertTrue(entered.wait(5))
+                storage.add_user_message("c2", "fast")
+                self.assertTrue(writer.is_alive())
+            finally:
+                release.set()
+                writer.join()
+
+        self.assertEqual(len(storage.get_conversation("c1")["messages"]), 1)
+        self.assertEqual(len(storage.get_conversation("c2")["messages"]), 1)
+
+
+class FlakyJsonStorage(JsonStorage):
+    """JsonStorage whose next `failures` saves raise OSError."""
+
+    failures = 0
+
+    def save_conversation(self, conversation):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super().save_conversation(conversation)
+
+
+class WriteBehindRetryTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.backend = FlakyJsonStorage(self._tmp.name)
+        self.backend.create_conversation("c1")
+        self.storage = aio.AsyncStorage(self.backend, flush_delay=0)
+
+    async def asyncTearDown(self):
+        await self.storage.close()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _stored_messages(self):
+        return [m["content"] for m in JsonStorage(self._tmp.name).get_conversation("c1")["messages"]]
+
+    async def test_failed_batch_is_retried_in_order(self):
+        self.backend.failures = 1
+        with mock.patch.object(aio, "RETRY_BASE_DELAY", 0.05):
+            await self.storage.add_user_message("c1", "first")
+            await self.storage.flush()
+
+            stats = self.storage.get_stats()
+            self.assertEqual((stats["errors"], stats["failing"], stats["queued"]), (1, 1, 1))
+            self.assertIn("disk full", stats["last_error"])
+
+            await self.storage.add_user_message("c1", "second")
+            await asyncio.sleep(0.2)
+
+        stats = self.storage.get_stats()
+        self.assertEqual((stats["failing"], stats["queued"], stats["written"]), (0, 0, 2))
+        self.assertEqual(self._stored_messages(), ["first", "second"])
+
+    async def test_close_retries_failed_batches(self):
+        self.backend.failures = 1
+        await self.storage.add_user_message("c1", "first")
+        await self.storage.flush()
+        self.assertEqual(self._stored_messages(), [])
+
+        await self.storage.close()
+        self.assertEqual(self._stored_messages(), ["first"])
+
+    async def test_queued_assistant_message_keeps_usage(self):
+        await self.storage.add_assistant_message("c1", [], [], {"model": "m", "response": "ok"}, USAGE)
+        await self.storage.flush()
+        self.assertEqual(JsonStorage(self._tmp.name).get_conversation("c1")["messages"][0]["usage"], USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
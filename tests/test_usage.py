@@ -0,0 +1,52 @@
+"""Tests for token usage accounting."""
+
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SILICONFLOW_API_KEY", "test")
+
+from backend import council  # noqa: E402
+from backend.usage import add_call_usage, aggregate_usage  # noqa: E402
+
+USAGE = {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+
+
+def _call(model):
+    return {"model": model, "usage": dict(USAGE, estimated=False)}
+
+
+class AggregateOverheadTest(unittest.TestCase):
+    def test_overhead_is_included_in_the_totals(self):
+        usage = aggregate_usage([_call("m")], [], _call("c"), {"digest": [_call("d")], "speculation": []})
+
+        self.assertEqual(usage["total"]["total_tokens"], 450)
+        self.assertEqual(usage["overhead"]["digest"]["calls"], 1)
+        self.assertNotIn("speculation", usage["overhead"])
+        self.assertEqual(usage["models"]["d"]["total_tokens"], 150)
+
+    def test_add_call_usage_returns_a_new_aggregate(self):
+        usage = aggregate_usage([_call("m")], [], None)
+        with_title = add_call_usage(usage, {"title": [_call("t")]})
+
+        self.assertEqual(with_title["total"]["total_tokens"], 300)
+        self.assertEqual(with_title["overhead"]["title"]["calls"], 1)
+        self.assertEqual(usage["total"]["total_tokens"], 150)
+        self.assertEqual(add_call_usage(None, {"summary": [_call("s")]})["total"]["calls"], 1)
+
+    def test_title_call_is_recorded(self):
+        async def query_seat(seat, messages, on_delta=None, **kwargs):
+            return {"content": "Blue sky", "usage": USAGE}
+
+        calls = []
+        with mock.patch.object(council, "_query_seat", query_seat):
+            title = asyncio.run(council.generate_conversation_title("Why is the sky blue?", calls))
+
+        self.assertEqual(title, "Blue sky")
+        self.assertEqual([call["usage"]["total_tokens"] for call in calls], [150])
+
+
+if __name__ == "__main__":
+    unittest.main()